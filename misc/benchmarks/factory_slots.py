@@ -0,0 +1,137 @@
+"""
+Benchmark memory and construction time of factory elements.
+
+Compares the slotted factory classes (`factory.Species`, `factory.Parameter`,
+`factory.Reaction`, `factory.AssignmentRule`) against the same classes without
+`__slots__`, i.e. the `__dict__`-backed layout used before the factory classes
+defined `__slots__`. The dict-backed classes are created from the source of
+`sbmlutils.factory` with all `__slots__` declarations removed, so both variants
+run the identical constructors.
+
+Usage:
+    python misc/benchmarks/factory_slots.py 100000
+"""
+import ast
+import gc
+import inspect
+import sys
+import time
+import tracemalloc
+from types import ModuleType
+from typing import Any, Dict, List
+
+from sbmlutils import factory as fac
+
+
+class _RemoveSlots(ast.NodeTransformer):
+    """Remove the `__slots__` declarations of all classes."""
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> ast.ClassDef:
+        node.body = [
+            stmt
+            for stmt in node.body
+            if not (
+                isinstance(stmt, ast.Assign)
+                and any(
+                    isinstance(t, ast.Name) and t.id == "__slots__"
+                    for t in stmt.targets
+                )
+            )
+        ] or [ast.Pass()]
+        return node
+
+
+def load_dict_factory() -> ModuleType:
+    """Load `sbmlutils.factory` without `__slots__` as `sbmlutils.factory_dict`."""
+    tree = _RemoveSlots().visit(ast.parse(inspect.getsource(fac)))
+    ast.fix_missing_locations(tree)
+    name = "sbmlutils.factory_dict"
+    module = ModuleType(name)
+    module.__file__ = fac.__file__
+    sys.modules[name] = module
+    exec(compile(tree, fac.__file__, "exec"), module.__dict__)  # type: ignore
+    return module
+
+
+def create_elements(factory: ModuleType, n: int) -> List[Any]:
+    """Create n replicated factory elements of the most common types."""
+    objects: List[Any] = []
+    for k in range(n):
+        objects.append(
+            factory.Species(
+                sid=f"S{k}",
+                compartment="c",
+                initialConcentration=1.0,
+                name=f"species {k}",
+                sboTerm=factory.SBO.SIMPLE_CHEMICAL,
+            )
+        )
+        objects.append(
+            factory.Parameter(
+                sid=f"p{k}",
+                value=1.0,
+                name=f"parameter {k}",
+                sboTerm=factory.SBO.KINETIC_CONSTANT,
+            )
+        )
+        objects.append(factory.AssignmentRule(variable=f"a{k}", value=f"2 * p{k}"))
+        objects.append(
+            factory.Reaction(
+                sid=f"R{k}",
+                equation=f"S{k} => S{k + 1}",
+                formula=f"p{k} * S{k}",
+                sboTerm=factory.SBO.BIOCHEMICAL_REACTION,
+            )
+        )
+    return objects
+
+
+def construction(factory: ModuleType, n: int) -> Dict[str, float]:
+    """Get time [s] and retained memory [MB] for creating the elements."""
+    gc.collect()
+    t_start = time.perf_counter()
+    create_elements(factory, n)
+    t_create = time.perf_counter() - t_start
+
+    gc.collect()
+    tracemalloc.start()
+    objects = create_elements(factory, n)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "n_elements": len(objects),
+        "create_s": t_create,
+        "memory_mb": memory / 1024**2,
+        "access_s": access_time(objects),
+    }
+
+
+def access_time(objects: List[Any]) -> float:
+    """Get time [s] for reading and writing the `sid` and `name` of all objects."""
+    t_start = time.perf_counter()
+    for obj in objects:
+        obj.name = obj.sid
+        obj.sid = obj.name
+    return time.perf_counter() - t_start
+
+
+def benchmark(n: int) -> Dict[str, Dict[str, float]]:
+    """Run benchmark for n replicates of the elements."""
+    factories = {"slots": fac, "dict": load_dict_factory()}
+    assert not hasattr(factories["slots"].Parameter(sid="p", value=1.0), "__dict__")
+    assert hasattr(factories["dict"].Parameter(sid="p", value=1.0), "__dict__")
+
+    results = {key: construction(factory, n) for key, factory in factories.items()}
+    for key, values in results.items():
+        print(
+            f"{key:5}: {values['n_elements']:.0f} elements, "
+            f"construction {values['create_s']:.3f} s, "
+            f"memory {values['memory_mb']:.1f} MB, "
+            f"attribute access {values['access_s']:.3f} s"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    benchmark(n)
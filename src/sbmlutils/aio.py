@@ -0,0 +1,313 @@
+"""Asyncio interface for reading, validating, writing, flattening and reporting SBML.
+
+The blocking libsbml operations run on a shared executor, so they do not block
+the event loop. By default a thread pool is used, a process pool (or any other
+executor) can be set via `configure`.
+
+Every call accepts a `timeout` in seconds. On timeout `asyncio.TimeoutError` is
+raised. Timeouts and cancellation of the awaiting task cancel calls which have
+not started yet. Calls which are already running in a worker cannot be
+interrupted, they finish in the background and the result is discarded.
+
+With a process pool all arguments and results are pickled. SBMLDocuments are
+transferred as SBML strings (the location of the document is not retained) and
+SBMLErrors of validation results are recreated from their error ids and
+details. The pickling of the libsbml objects is registered by `configure` for
+process pools; for process pools created elsewhere use `register_pickling` as
+initializer of the worker processes.
+"""
+import asyncio
+import copyreg
+import functools
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Optional, TextIO, Tuple, Union
+
+import libsbml
+
+from sbmlutils import io
+from sbmlutils.comp import flatten
+from sbmlutils.log import get_logger
+from sbmlutils.report.sbmlinfo import SBMLDocumentInfo
+from sbmlutils.validation import ValidationOptions, ValidationResult
+from sbmlutils.validation import validate_doc as _validate_doc
+
+
+logger = get_logger(__name__)
+
+_executor: Optional[Executor] = None
+# executor was created by `configure`
+_owns_executor: bool = False
+
+
+def configure(
+    executor: Optional[Executor] = None,
+    max_workers: Optional[int] = None,
+    processes: bool = False,
+) -> Executor:
+    """Configure the executor for the asynchronous calls.
+
+    The previous executor is shut down if it was created by `configure`.
+    Executors provided by the caller are never shut down.
+
+    :param executor: executor to use, if None an executor is created
+    :param max_workers: maximum number of workers of the created executor
+    :param processes: create process pool instead of thread pool
+    :return: executor
+    """
+    global _executor, _owns_executor
+    shutdown(wait=False)
+    _owns_executor = executor is None
+    if executor is None:
+        if processes:
+            register_pickling()
+            executor = ProcessPoolExecutor(
+                max_workers=max_workers, initializer=register_pickling
+            )
+        else:
+            executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="sbmlutils"
+            )
+    elif isinstance(executor, ProcessPoolExecutor):
+        register_pickling()
+    _executor = executor
+    return executor
+
+
+def get_executor() -> Executor:
+    """Get executor, creates thread pool if not configured."""
+    if _executor is None:
+        return configure()
+    return _executor
+
+
+def shutdown(wait: bool = True) -> None:
+    """Shutdown executor and cancel pending calls.
+
+    Executors provided by the caller are only released, not shut down.
+
+    :param wait: wait for running calls to finish
+    """
+    global _executor, _owns_executor
+    if _executor is not None and _owns_executor:
+        _executor.shutdown(wait=wait, cancel_futures=True)
+    _executor = None
+    _owns_executor = False
+
+
+async def run_in_executor(
+    func: Callable, *args: Any, timeout: Optional[float] = None, **kwargs: Any
+) -> Any:
+    """Run blocking function in the executor.
+
+    :param func: function to run, must be picklable for process pools
+    :param timeout: timeout in seconds
+    :return: result of function
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(
+        get_executor(), functools.partial(func, *args, **kwargs)
+    )
+    return await asyncio.wait_for(future, timeout=timeout)
+
+
+async def read_sbml(
+    source: Union[Path, str, bytes],
+    promote: bool = False,
+    validate: bool = False,
+    validation_options: Optional[ValidationOptions] = None,
+    timeout: Optional[float] = None,
+) -> libsbml.SBMLDocument:
+    """Read SBMLDocument, see `sbmlutils.io.read_sbml`."""
+    return await run_in_executor(
+        io.read_sbml,
+        source=source,
+        promote=promote,
+        validate=validate,
+        validation_options=validation_options,
+        timeout=timeout,
+    )
+
+
+async def write_sbml(
+    doc: libsbml.SBMLDocument,
+    filepath: Optional[Union[Path, BinaryIO, TextIO]] = None,
+    validate: bool = False,
+    validation_options: Optional[ValidationOptions] = None,
+    program_name: Optional[str] = None,
+    program_version: Optional[str] = None,
+    compression: Optional[io.Compression] = None,
+    timeout: Optional[float] = None,
+) -> Optional[str]:
+    """Write SBMLDocument, see `sbmlutils.io.write_sbml`."""
+    return await run_in_executor(
+        io.write_sbml,
+        doc=doc,
+        filepath=filepath,
+        validate=validate,
+        validation_options=validation_options,
+        program_name=program_name,
+        program_version=program_version,
+        compression=compression,
+        timeout=timeout,
+    )
+
+
+async def validate_doc(
+    doc: libsbml.SBMLDocument,
+    options: Optional[ValidationOptions] = None,
+    title: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> ValidationResult:
+    """Validate SBMLDocument, see `sbmlutils.validation.validate_doc`."""
+    return await run_in_executor(
+        _validate_doc, doc=doc, options=options, title=title, timeout=timeout
+    )
+
+
+async def validate_sbml(
+    source: Union[Path, str],
+    validation_options: Optional[ValidationOptions] = None,
+    title: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> ValidationResult:
+    """Validate SBML source, see `sbmlutils.io.validate_sbml`."""
+    return await run_in_executor(
+        _validate_sbml,
+        source=source,
+        validation_options=validation_options,
+        title=title,
+        timeout=timeout,
+    )
+
+
+def _validate_sbml(
+    source: Union[Path, str],
+    validation_options: Optional[ValidationOptions] = None,
+    title: Optional[str] = None,
+) -> ValidationResult:
+    """Validate SBML source with errors detached from the temporary document."""
+    doc = io.read_sbml(source, promote=False, validate=False)
+    result = _validate_doc(doc=doc, options=validation_options, title=title)
+    return ValidationResult(
+        errors=[_detach_error(e) for e in result.errors],
+        warnings=[_detach_error(e) for e in result.warnings],
+    )
+
+
+async def flatten_sbml(
+    sbml_path: Path,
+    sbml_flat_path: Path,
+    leave_ports: bool = True,
+    timeout: Optional[float] = None,
+) -> libsbml.SBMLDocument:
+    """Flatten SBML file, see `sbmlutils.comp.flatten.flatten_sbml`."""
+    return await run_in_executor(
+        flatten.flatten_sbml,
+        sbml_path=sbml_path,
+        sbml_flat_path=sbml_flat_path,
+        leave_ports=leave_ports,
+        timeout=timeout,
+    )
+
+
+async def flatten_sbml_doc(
+    doc: libsbml.SBMLDocument,
+    sbml_flat_path: Optional[Path] = None,
+    leave_ports: bool = True,
+    timeout: Optional[float] = None,
+) -> libsbml.SBMLDocument:
+    """Flatten SBMLDocument, see `sbmlutils.comp.flatten.flatten_sbml_doc`."""
+    return await run_in_executor(
+        flatten.flatten_sbml_doc,
+        doc=doc,
+        sbml_flat_path=sbml_flat_path,
+        leave_ports=leave_ports,
+        timeout=timeout,
+    )
+
+
+def _report_info(source: Union[Path, str]) -> Dict[str, Any]:
+    """Create report information for SBML source."""
+    return SBMLDocumentInfo.from_sbml(source=source).info
+
+
+async def report(
+    source: Union[Path, str], timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """Create report information (`SBMLDocumentInfo.info`) for SBML source."""
+    return await run_in_executor(_report_info, source, timeout=timeout)
+
+
+# --- Pickling of libsbml objects for process pools ---
+def _document_from_sbml(sbml: str) -> libsbml.SBMLDocument:
+    """Recreate SBMLDocument from SBML string."""
+    return libsbml.readSBMLFromString(sbml)
+
+
+def _reduce_document(doc: libsbml.SBMLDocument) -> Tuple[Callable, Tuple[str]]:
+    """Reduce SBMLDocument to SBML string."""
+    return _document_from_sbml, (libsbml.writeSBMLToString(doc),)
+
+
+# level and version in the reference of the error messages
+_ERROR_REFERENCE = re.compile(r"Reference: L(\d)V(\d)")
+
+
+def _sbml_error(
+    error_id: int,
+    level: int,
+    version: int,
+    message: str,
+    line: int,
+    column: int,
+    severity: int,
+    category: int,
+    package: str,
+) -> libsbml.SBMLError:
+    """Recreate SBMLError with the details of the message."""
+    args = (line, column, severity, category, package)
+    template = libsbml.SBMLError(error_id, level, version, "", *args).getMessage()
+    details = message[len(template) :] if message.startswith(template) else message
+    return libsbml.SBMLError(error_id, level, version, details.strip(), *args)
+
+
+def _error_args(error: libsbml.SBMLError) -> Tuple:
+    """Get arguments of `_sbml_error` for SBMLError."""
+    message = error.getMessage()
+    match = _ERROR_REFERENCE.search(message)
+    level, version = (int(match[1]), int(match[2])) if match else (3, 1)
+    return (
+        error.getErrorId(),
+        level,
+        version,
+        message,
+        error.getLine(),
+        error.getColumn(),
+        error.getSeverity(),
+        error.getCategory(),
+        error.getPackage(),
+    )
+
+
+def _detach_error(error: libsbml.SBMLError) -> libsbml.SBMLError:
+    """Copy SBMLError which is owned by the error log of a document.
+
+    Errors of the error log are only valid as long as the document exists.
+    """
+    return _sbml_error(*_error_args(error))
+
+
+def _reduce_error(error: libsbml.SBMLError) -> Tuple[Callable, Tuple]:
+    """Reduce SBMLError to its error id and details."""
+    return _sbml_error, _error_args(error)
+
+
+def register_pickling() -> None:
+    """Register pickling of SBMLDocument and SBMLError.
+
+    Required in the main process and the worker processes of process pools.
+    """
+    copyreg.pickle(libsbml.SBMLDocument, _reduce_document)
+    copyreg.pickle(libsbml.SBMLError, _reduce_error)
@@ -0,0 +1,546 @@
+"""Build runner for factory models.
+
+Model repositories consist of many Python modules which define a `factory.Model`
+on module level (e.g. `model = Model(...)`). Some of these modules import and merge
+the models of other modules or reference the SBML files of other models via
+`ExternalModelDefinition`.
+
+The build runner
+- discovers the model modules of a package,
+- resolves the dependencies between the models (imports of local modules and
+  `ExternalModelDefinition` sources),
+- hashes the inputs of every model and skips models which did not change since
+  the last build,
+- creates and validates the independent models in parallel worker processes.
+
+All models are written to a single output directory as `<model.sid>.xml`, so that
+relative `ExternalModelDefinition` sources resolve between the created models.
+
+Example:
+    results = build_models(package="sbmlutils.examples", output_dir=Path("models"))
+"""
+from __future__ import annotations
+
+import ast
+import hashlib
+import importlib
+import importlib.util
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sbmlutils import __version__
+from sbmlutils.dependency import CyclicDependencyError
+from sbmlutils.dependency import topological_order as dependency_order
+from sbmlutils.log import get_logger
+from sbmlutils.validation import ValidationOptions
+
+
+logger = get_logger(__name__)
+
+BUILD_STATE_FILENAME = ".sbmlutils_build.json"
+
+
+class BuildStatus(str, Enum):
+    """Status of a build target after the build."""
+
+    BUILT = "built"
+    CACHED = "cached"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+
+@dataclass
+class BuildTarget:
+    """Model defined on module level of a Python module.
+
+    The key of the target is `<module>:<attribute>`.
+    """
+
+    module: str
+    attribute: str
+    path: Path
+    imports: Set[str] = field(default_factory=set)
+    sid: Optional[str] = None
+    sources: List[str] = field(default_factory=list)
+    dependencies: Set[str] = field(default_factory=set)
+    input_hash: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        """Get unique key of target."""
+        return f"{self.module}:{self.attribute}"
+
+    @property
+    def filename(self) -> str:
+        """Get SBML filename of the created model."""
+        return f"{self.sid}.xml"
+
+
+@dataclass
+class BuildResult:
+    """Result of building a single target."""
+
+    key: str
+    status: BuildStatus
+    sbml_path: Optional[Path] = None
+    input_hash: Optional[str] = None
+    error_count: int = 0
+    warning_count: int = 0
+    error: Optional[str] = None
+    time: float = 0.0
+
+
+def _local_modules(package: str) -> Dict[str, Path]:
+    """Get all Python modules of the package (including subpackages)."""
+    spec = importlib.util.find_spec(package)
+    if spec is None or not spec.submodule_search_locations:
+        raise ValueError(f"'{package}' is not an importable package.")
+
+    modules: Dict[str, Path] = {}
+    for location in spec.submodule_search_locations:
+        base_path = Path(location)
+        for path in sorted(base_path.rglob("*.py")):
+            parts = list(path.relative_to(base_path).with_suffix("").parts)
+            if parts[-1] == "__init__":
+                parts = parts[:-1]
+            modules[".".join([package] + parts)] = path
+    return modules
+
+
+def _is_main_block(node: ast.stmt) -> bool:
+    """Check if statement is the `if __name__ == "__main__":` block."""
+    if not isinstance(node, ast.If) or not isinstance(node.test, ast.Compare):
+        return False
+    test = node.test
+    return (
+        isinstance(test.left, ast.Name)
+        and test.left.id == "__name__"
+        and len(test.comparators) == 1
+        and isinstance(test.comparators[0], ast.Constant)
+        and test.comparators[0].value == "__main__"
+    )
+
+
+def _is_model_call(node: Optional[ast.expr]) -> bool:
+    """Check if expression is `Model(...)` or `Model.merge_models(...)`."""
+    if not isinstance(node, ast.Call):
+        return False
+    func = node.func
+    if isinstance(func, ast.Name):
+        return func.id == "Model"
+    if isinstance(func, ast.Attribute):
+        return func.attr in {"Model", "merge_models"}
+    return False
+
+
+def _model_attributes(tree: ast.Module) -> List[str]:
+    """Get names of the module level models."""
+    attributes: List[str] = []
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and _is_model_call(node.value):
+            attributes.extend(t.id for t in node.targets if isinstance(t, ast.Name))
+        elif (
+            isinstance(node, ast.AnnAssign)
+            and isinstance(node.target, ast.Name)
+            and _is_model_call(node.value)
+        ):
+            attributes.append(node.target.id)
+    return attributes
+
+
+def _local_imports(
+    module: str, path: Path, tree: ast.Module, local_modules: Dict[str, Path]
+) -> Set[str]:
+    """Get the local modules imported by the module.
+
+    Imports in the `__main__` block are not dependencies of the module.
+    """
+    is_package = path.name == "__init__.py"
+    imports: Set[str] = set()
+    for statement in tree.body:
+        if _is_main_block(statement):
+            continue
+        for node in ast.walk(statement):
+            names: List[str] = []
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom):
+                if node.level:
+                    parts = module.split(".")
+                    if not is_package:
+                        parts = parts[:-1]
+                    if node.level > 1:
+                        parts = parts[: -(node.level - 1)]
+                    if node.module:
+                        parts.append(node.module)
+                    base = ".".join(parts)
+                else:
+                    base = node.module if node.module else ""
+                # `from package import submodule` imports the submodule
+                names = [base] + [f"{base}.{alias.name}" for alias in node.names]
+
+            for name in names:
+                if name in local_modules and name != module:
+                    imports.add(name)
+    return imports
+
+
+def discover_models(package: str) -> Dict[str, BuildTarget]:
+    """Discover the module level models of the package.
+
+    The modules are only parsed, not imported.
+
+    :param package: importable package name, e.g. `sbmlutils.examples`
+    :return: dictionary of targets by key
+    """
+    local_modules = _local_modules(package)
+    targets: Dict[str, BuildTarget] = {}
+    for module, path in local_modules.items():
+        tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+        attributes = _model_attributes(tree)
+        if not attributes:
+            continue
+        imports = _local_imports(module, path, tree, local_modules)
+        for attribute in attributes:
+            target = BuildTarget(
+                module=module, attribute=attribute, path=path, imports=imports
+            )
+            targets[target.key] = target
+
+    return targets
+
+
+def _import_closure(
+    module: str, module_imports: Dict[str, Set[str]], local_modules: Dict[str, Path]
+) -> Set[str]:
+    """Get the module and all local modules it imports directly or indirectly.
+
+    The imports of packages (`__init__` modules) are not followed. Packages often
+    import all their submodules, which would make every module depend on all
+    other modules of the package.
+    """
+    closure: Set[str] = set()
+    stack = [module]
+    while stack:
+        name = stack.pop()
+        if name in closure:
+            continue
+        closure.add(name)
+        if name != module and local_modules[name].name == "__init__.py":
+            continue
+        if name not in module_imports:
+            path = local_modules[name]
+            tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+            module_imports[name] = _local_imports(name, path, tree, local_modules)
+        stack.extend(module_imports[name])
+    return closure
+
+
+def _inspect_target(
+    module: str, attribute: str, sys_paths: List[str]
+) -> Tuple[str, List[str]]:
+    """Get model id and ExternalModelDefinition sources (executed in worker process)."""
+    _extend_sys_path(sys_paths)
+    from sbmlutils.factory import Model
+
+    model = getattr(importlib.import_module(module), attribute)
+    if not isinstance(model, Model):
+        raise ValueError(f"'{module}:{attribute}' is not a `Model`: '{type(model)}'")
+    sources = [emd.source for emd in model.external_model_definitions if emd.source]
+    return model.sid, sources
+
+
+def _extend_sys_path(sys_paths: List[str]) -> None:
+    """Make the modules of the parent process importable in the worker process."""
+    for sys_path in reversed(sys_paths):
+        if sys_path not in sys.path:
+            sys.path.insert(0, sys_path)
+
+
+def resolve_dependencies(
+    package: str, targets: Dict[str, BuildTarget], executor: Executor
+) -> None:
+    """Resolve the dependencies between the targets.
+
+    Imports the model modules in the executor to get the model ids and the
+    sources of the `ExternalModelDefinitions`. A target depends on
+    - all targets whose modules it imports (directly or via other local modules),
+    - all targets whose created SBML file is an `ExternalModelDefinition` source.
+
+    Errors of the import are stored in the `error` of the target.
+
+    :param package: importable package name
+    :param targets: targets from `discover_models`, updated in place
+    :param executor: executor for importing the model modules
+    """
+    local_modules = _local_modules(package)
+    module_imports: Dict[str, Set[str]] = {
+        t.module: t.imports for t in targets.values()
+    }
+
+    sys_paths = [p for p in sys.path if p]
+    futures = {
+        key: executor.submit(_inspect_target, t.module, t.attribute, sys_paths)
+        for key, t in targets.items()
+    }
+    for key, future in futures.items():
+        try:
+            targets[key].sid, targets[key].sources = future.result()
+        except Exception as err:
+            targets[key].error = repr(err)
+            logger.error(f"Import of '{key}' failed: {targets[key].error}")
+
+    targets_by_module: Dict[str, List[str]] = {}
+    targets_by_filename: Dict[str, str] = {}
+    for key, target in targets.items():
+        targets_by_module.setdefault(target.module, []).append(key)
+        if target.error is not None:
+            continue
+        if target.filename in targets_by_filename:
+            raise ValueError(
+                f"Models '{targets_by_filename[target.filename]}' and '{key}' are "
+                f"both written to '{target.filename}'."
+            )
+        targets_by_filename[target.filename] = key
+
+    for key, target in targets.items():
+        dependencies: Set[str] = set()
+        closure = _import_closure(target.module, module_imports, local_modules)
+        for module in closure - {target.module}:
+            dependencies.update(targets_by_module.get(module, []))
+        for source in target.sources:
+            source_key = targets_by_filename.get(Path(source).name)
+            if source_key is None:
+                logger.warning(
+                    f"ExternalModelDefinition source '{source}' of '{key}' is not "
+                    f"created by the build."
+                )
+            else:
+                dependencies.add(source_key)
+        dependencies.discard(key)
+        target.dependencies = dependencies
+
+        # hash of all inputs: sources of the module and of all imported modules
+        h = hashlib.sha256()
+        h.update(f"{__version__}:{key}".encode("utf-8"))
+        for module in sorted(closure):
+            h.update(module.encode("utf-8"))
+            h.update(local_modules[module].read_bytes())
+        target.input_hash = h.hexdigest()
+
+
+def topological_order(targets: Dict[str, BuildTarget]) -> List[str]:
+    """Get target keys in dependency order.
+
+    :raises ValueError: for cyclic dependencies
+    """
+    try:
+        return dependency_order(
+            {key: target.dependencies for key, target in targets.items()}
+        )
+    except CyclicDependencyError as err:
+        raise ValueError(f"Cyclic dependencies between models: {err.cycle}") from err
+
+
+def _build_target(
+    module: str,
+    attribute: str,
+    key: str,
+    sbml_path: Path,
+    validate: bool,
+    validation_options: Optional[ValidationOptions],
+    sys_paths: List[str],
+) -> BuildResult:
+    """Create and validate SBML for target (executed in worker process)."""
+    _extend_sys_path(sys_paths)
+    from sbmlutils.factory import create_model
+    from sbmlutils.io import validate_sbml
+
+    t_start = time.time()
+    try:
+        model = getattr(importlib.import_module(module), attribute)
+        create_model(model=model, filepath=sbml_path, validate=False)
+        result = BuildResult(key=key, status=BuildStatus.BUILT, sbml_path=sbml_path)
+        if validate:
+            vresult = validate_sbml(
+                source=sbml_path,
+                validation_options=validation_options,
+                title=key,
+            )
+            result.error_count = vresult.error_count
+            result.warning_count = vresult.warning_count
+            if vresult.error_count > 0:
+                result.status = BuildStatus.FAILED
+                result.error = f"{vresult.error_count} validation errors"
+    except Exception as err:
+        result = BuildResult(key=key, status=BuildStatus.FAILED, error=repr(err))
+
+    result.time = time.time() - t_start
+    return result
+
+
+def _read_build_state(output_dir: Path) -> Dict[str, str]:
+    """Read hashes of the last successful builds."""
+    state_path = output_dir / BUILD_STATE_FILENAME
+    if not state_path.exists():
+        return {}
+    with open(state_path, "r") as f_state:
+        state: Dict[str, str] = json.load(f_state)
+    return state
+
+
+def _write_build_state(output_dir: Path, state: Dict[str, str]) -> None:
+    """Write hashes of the successful builds."""
+    with open(output_dir / BUILD_STATE_FILENAME, "w") as f_state:
+        json.dump(state, f_state, indent=2, sort_keys=True)
+
+
+def build_models(
+    package: str,
+    output_dir: Path,
+    keys: Optional[Iterable[str]] = None,
+    workers: Optional[int] = None,
+    validate: bool = True,
+    validation_options: Optional[ValidationOptions] = None,
+    force: bool = False,
+) -> Dict[str, BuildResult]:
+    """Build all models of the package.
+
+    Unchanged models (same input hash as in the last build and existing SBML
+    file) are not rebuilt. Models are built in parallel in `workers` processes
+    as soon as all their dependencies are built. Targets depending on a failed
+    target are skipped.
+
+    The worker processes are spawned (not forked), so that they always import
+    the current sources of the model modules.
+
+    :param package: importable package name, e.g. `sbmlutils.examples`
+    :param output_dir: directory for the SBML files and the build state
+    :param keys: optional subset of target keys to build (with dependencies)
+    :param workers: number of worker processes, defaults to the number of CPUs
+    :param validate: validate the created SBML
+    :param validation_options: options for the validation
+    :param force: rebuild all models
+    :return: dictionary of build results by target key
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    targets = discover_models(package)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        resolve_dependencies(package, targets, executor=executor)
+        order = topological_order(targets)
+        if keys is not None:
+            order = _with_dependencies(order, targets, keys)
+
+        state = {} if force else _read_build_state(output_dir)
+        # changes propagate to the dependents via the hashes of the dependencies
+        for key in order:
+            target = targets[key]
+            h = hashlib.sha256(str(target.input_hash).encode("utf-8"))
+            for dependency in sorted(target.dependencies):
+                h.update(str(targets[dependency].input_hash).encode("utf-8"))
+            h.update(f"{validate}:{validation_options}".encode("utf-8"))
+            target.input_hash = h.hexdigest()
+
+        results: Dict[str, BuildResult] = {}
+        pending: List[str] = []
+        for key in order:
+            sbml_path = output_dir / targets[key].filename
+            if targets[key].error is not None:
+                results[key] = BuildResult(
+                    key=key, status=BuildStatus.FAILED, error=targets[key].error
+                )
+                state.pop(key, None)
+            elif state.get(key) == targets[key].input_hash and sbml_path.exists():
+                results[key] = BuildResult(
+                    key=key,
+                    status=BuildStatus.CACHED,
+                    sbml_path=sbml_path,
+                    input_hash=targets[key].input_hash,
+                )
+            else:
+                pending.append(key)
+        logger.info(
+            f"Build {len(pending)} of {len(order)} models with {workers} worker(s)."
+        )
+
+        sys_paths = [p for p in sys.path if p]
+        running: Dict[Future, str] = {}
+        while pending or running:
+            for key in list(pending):
+                dependencies = targets[key].dependencies
+                if any(
+                    results[d].status in {BuildStatus.FAILED, BuildStatus.SKIPPED}
+                    for d in dependencies
+                    if d in results
+                ):
+                    pending.remove(key)
+                    results[key] = BuildResult(
+                        key=key, status=BuildStatus.SKIPPED, error="dependency failed"
+                    )
+                    state.pop(key, None)
+                elif all(d in results for d in dependencies):
+                    pending.remove(key)
+                    future = executor.submit(
+                        _build_target,
+                        targets[key].module,
+                        targets[key].attribute,
+                        key,
+                        output_dir / targets[key].filename,
+                        validate,
+                        validation_options,
+                        sys_paths,
+                    )
+                    running[future] = key
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = running.pop(future)
+                result = future.result()
+                result.input_hash = targets[key].input_hash
+                results[key] = result
+                if result.status == BuildStatus.BUILT:
+                    state[key] = str(result.input_hash)
+                else:
+                    state.pop(key, None)
+                    logger.error(f"Build of '{key}' failed: {result.error}")
+
+    _write_build_state(output_dir, state)
+    return {key: results[key] for key in order}
+
+
+def _with_dependencies(
+    order: List[str], targets: Dict[str, BuildTarget], keys: Iterable[str]
+) -> List[str]:
+    """Restrict the build order to the given keys and their dependencies."""
+    selected: Set[str] = set()
+    stack = list(keys)
+    while stack:
+        key = stack.pop()
+        if key not in targets:
+            raise ValueError(f"Unknown build target: '{key}'")
+        if key not in selected:
+            selected.add(key)
+            stack.extend(targets[key].dependencies)
+    return [key for key in order if key in selected]
@@ -5,3 +5,4 @@ from .comp import (
     create_ports,
 )
 from .flatten import flatten_sbml, flatten_sbml_doc
+from .resolver import disable_resolver_cache, enable_resolver_cache
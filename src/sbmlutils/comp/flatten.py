@@ -1,8 +1,12 @@
-"""Helpers for model flattening."""
-import os
+"""Helpers for model flattening.
+
+Relative sources of ExternalModelDefinitions are resolved by libsbml
+against the location URI of the SBMLDocument, so no change of the
+working directory is required and flattening can run concurrently.
+"""
 import time
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
 import libsbml
 
@@ -26,23 +30,12 @@ def flatten_sbml(
 
     :return: flattened SBMLDocument
     """
-    # FIXME: not working with relative paths,
-    # necessary to change the working directory to the sbml file directory
-    # to resolve relative links to external model definitions.
-    if not isinstance(sbml_path, Path):
-        sbml_path = Path(sbml_path)
-
-    working_dir = os.getcwd()
-    os.chdir(str(sbml_path.parent))
-
+    sbml_path = Path(sbml_path).resolve()
     doc = read_sbml(source=sbml_path)
     flat_doc = flatten_sbml_doc(
-        doc, leave_ports=leave_ports, sbml_flat_path=sbml_flat_path
+        doc, leave_ports=leave_ports, sbml_flat_path=sbml_flat_path, base_uri=sbml_path
     )
 
-    # change back the working dir
-    os.chdir(working_dir)
-
     return flat_doc
 
 
@@ -50,6 +43,8 @@ def flatten_sbml_doc(
     doc: libsbml.SBMLDocument,
     sbml_flat_path: Optional[Path] = None,
     leave_ports: bool = True,
+    base_uri: Optional[Union[Path, str]] = None,
+    perform_validation: bool = True,
 ) -> libsbml.SBMLDocument:
     """Flatten SBMLDocument.
 
@@ -57,12 +52,23 @@ def flatten_sbml_doc(
     of the flattening routine.
     If an output path is provided the file is written to the output path.
 
+    Relative sources of ExternalModelDefinitions are resolved against the
+    location of the document. The location is set when reading from file,
+    for documents created in memory the `base_uri` must be provided.
+
     :param doc: SBMLDocument to flatten.
     :param sbml_flat_path: Path to write flattended SBMLDocument to
     :param leave_ports: flag to leave ports
+    :param base_uri: location of the document, i.e. path of the SBML file,
+        directory or URI to resolve relative sources against
+    :param perform_validation: flag to validate the document in the flattening
+        converter, the flattening is aborted for invalid documents
 
     :return: SBMLDocument
     """
+    if base_uri is not None:
+        doc.setLocationURI(location_uri(base_uri))
+
     error_count = doc.getNumErrors()
     if error_count > 0:
         if doc.getError(0).getErrorId() == libsbml.XMLFileUnreadable:
@@ -80,6 +86,7 @@ def flatten_sbml_doc(
     props.addOption("flatten comp", True)  # Invokes CompFlatteningConverter
     props.addOption("leave_ports", leave_ports)  # Indicates whether to leave ports
     props.addOption("abortIfUnflattenable", "none")
+    props.addOption("performValidation", perform_validation)
 
     # flatten
     current = time.perf_counter()
@@ -110,6 +117,24 @@ def flatten_sbml_doc(
     return doc
 
 
+def location_uri(base_uri: Union[Path, str]) -> str:
+    """Get location URI for resolving relative sources.
+
+    :param base_uri: path of SBML file, directory or URI
+    :return: location URI
+    """
+    if isinstance(base_uri, str):
+        if "://" in base_uri or base_uri.startswith("file:"):
+            return base_uri
+        base_uri = Path(base_uri)
+
+    base_uri = base_uri.resolve()
+    uri = base_uri.as_uri()
+    if base_uri.is_dir():
+        uri += "/"
+    return uri
+
+
 def flatten_external_model_definitions(
     doc: libsbml.SBMLDocument, validate: bool = False
 ) -> libsbml.SBMLDocument:
@@ -119,8 +144,16 @@ def flatten_external_model_definitions(
     and directly included in the top model. The resulting
     comp model consists than only of a single file.
 
-    The model refs in the submodel do not change in the process,
-    so no need to update the submodels.
+    ExternalModelDefinitions of the external models are converted
+    recursively and the ModelDefinitions of the external models are
+    included in the top model.
+    The ModelDefinitions get the ids of the ExternalModelDefinitions,
+    so no need to update the submodels. Included ModelDefinitions of the
+    external models with the id of a different model definition are renamed
+    to `<emd_id>__<md_id>`.
+
+    External documents are resolved via the libsbml resolvers, see
+    `enable_resolver_cache` for caching of the parsed external documents.
 
     :param doc: SBMLDocument
     :param validate: validation flag
@@ -128,11 +161,6 @@ def flatten_external_model_definitions(
     """
     logger.debug("* flattenExternalModelDefinitions")
 
-    # FIXME: handle multiple levels of hierarchies. Recursively to handle the ExternalModelDefinitions of submodels
-    logger.warning(
-        "flattenExternalModelDefinitions is experimental and does not work recursively!"
-    )
-
     comp_doc = doc.getPlugin("comp")
     if comp_doc is None:
         logger.warning("Model is not a comp model, no ExternalModelDefinitions")
@@ -142,38 +170,105 @@ def flatten_external_model_definitions(
         # no ExternalModelDefinitions
         logger.warning("Model does not contain any ExternalModelDefinitions")
         return doc
-    else:
-        emd_ids = []
-        for emd in emd_list:
-            logger.debug(emd)
-            emd_ids.append(emd.getId())
-
-            # get the model definition from the model
-            ref_model = emd.getReferencedModel()
-
-            ref_doc = ref_model.getSBMLDocument()
-            # print(ref_model)
-            for k in range(ref_doc.getNumPlugins()):
-                plugin = ref_doc.getPlugin(k)
-                # print(k, plugin)
 
-                # enable the package on the main SBMLDocument
-                uri = plugin.getURI()
-                prefix = plugin.getPrefix()
-                doc.enablePackage(uri, prefix, True)
-
-            # print("\n")
-
-            # add model definition for model
-            md = libsbml.ModelDefinition(ref_model)
-            comp_doc.addModelDefinition(md)
-
-        # remove the emds afterwards
-        for emd_id in emd_ids:
-            # remove the emd from the model
-            comp_doc.removeExternalModelDefinition(emd_id)
+    emd_ids = []
+    for emd in emd_list:
+        logger.debug(emd)
+        emd_ids.append(emd.getId())
+
+        # get the model definition from the model
+        ref_model = emd.getReferencedModel()
+        if ref_model is None:
+            raise ValueError(
+                f"ExternalModelDefinition '{emd.getId()}' could not be resolved: "
+                f"'{emd.getSource()}'"
+            )
+        ref_doc = ref_model.getSBMLDocument()
+        ref_comp_doc = ref_doc.getPlugin("comp")
+        if ref_comp_doc and ref_comp_doc.getNumExternalModelDefinitions() > 0:
+            flatten_external_model_definitions(ref_doc)
+
+        for k in range(ref_doc.getNumPlugins()):
+            plugin = ref_doc.getPlugin(k)
+            # enable the package on the main SBMLDocument
+            doc.enablePackage(plugin.getURI(), plugin.getPrefix(), True)
+
+        # add model definitions of the external model
+        if ref_comp_doc:
+            for md_id in [
+                md.getId() for md in ref_comp_doc.getListOfModelDefinitions()
+            ]:
+                ref_md = ref_comp_doc.getModelDefinition(md_id)
+                existing_md = comp_doc.getModelDefinition(md_id)
+                if existing_md is not None and existing_md.toSBML() == ref_md.toSBML():
+                    logger.debug(f"ModelDefinition exists: '{md_id}'")
+                    continue
+                if (
+                    existing_md is not None
+                    or comp_doc.getExternalModelDefinition(md_id) is not None
+                ):
+                    # different model with same id
+                    new_id = _unique_model_definition_id(
+                        comp_doc, ref_comp_doc, f"{emd.getId()}__{md_id}"
+                    )
+                    logger.warning(
+                        f"ModelDefinition '{md_id}' of '{emd.getSource()}' exists, "
+                        f"renamed to '{new_id}'."
+                    )
+                    _rename_model_definition(ref_doc, md_id, new_id)
+                    ref_md = ref_comp_doc.getModelDefinition(new_id)
+                comp_doc.addModelDefinition(ref_md)
+
+        # add model definition for model
+        md = libsbml.ModelDefinition(ref_model)
+        md.setId(emd.getId())
+        comp_doc.addModelDefinition(md)
+
+    # remove the emds afterwards
+    for emd_id in emd_ids:
+        # the removed object of `removeExternalModelDefinition` is invalid
+        # for resolved ExternalModelDefinitions
+        comp_doc.getExternalModelDefinition(emd_id).removeFromParentAndDelete()
 
     # validate
     if validate:
         validate_doc(doc)
     return doc
+
+
+def _unique_model_definition_id(
+    comp_doc: libsbml.CompSBMLDocumentPlugin,
+    ref_comp_doc: libsbml.CompSBMLDocumentPlugin,
+    md_id: str,
+) -> str:
+    """Get ModelDefinition id which is not used in both documents."""
+
+    def is_used(sid: str) -> bool:
+        return any(
+            d.getModelDefinition(sid) is not None
+            or d.getExternalModelDefinition(sid) is not None
+            for d in (comp_doc, ref_comp_doc)
+        )
+
+    new_id = md_id
+    k = 1
+    while is_used(new_id):
+        new_id = f"{md_id}_{k}"
+        k += 1
+    return new_id
+
+
+def _rename_model_definition(
+    doc: libsbml.SBMLDocument, md_id: str, new_id: str
+) -> None:
+    """Rename ModelDefinition and update the references of the submodels."""
+    comp_doc: libsbml.CompSBMLDocumentPlugin = doc.getPlugin("comp")
+    comp_doc.getModelDefinition(md_id).setId(new_id)
+    models = [doc.getModel()] + list(comp_doc.getListOfModelDefinitions())
+    for model in models:
+        comp_model = model.getPlugin("comp") if model is not None else None
+        if comp_model is None:
+            continue
+        for submodel in comp_model.getListOfSubmodels():
+            if submodel.getModelRef() == md_id:
+                submodel.setModelRef(new_id)
@@ -0,0 +1,140 @@
+"""Resolving of external SBML documents for comp.
+
+libsbml resolves the sources of ExternalModelDefinitions via the resolvers
+registered in the `SBMLResolverRegistry`. The default file resolver parses the
+external files on every resolution, i.e. every flattening parses all
+referenced files again.
+
+The `CachingSBMLResolver` caches the parsed external documents keyed by
+absolute path and modification time. It is registered before the other
+resolvers via `enable_resolver_cache`, so all comp operations of libsbml
+(flattening, `getReferencedModel`, validation) share the cache.
+"""
+import atexit
+from pathlib import Path
+from typing import List, Optional
+
+import libsbml
+
+from sbmlutils.io.sbml import SBMLDocumentCache
+from sbmlutils.log import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class CachingSBMLResolver(libsbml.SBMLResolver):
+    """SBMLResolver for files with cache of parsed documents.
+
+    Resolved documents are clones of the cached documents. URIs which are not
+    files are left to the other registered resolvers.
+    """
+
+    def __init__(self, cache: Optional[SBMLDocumentCache] = None) -> None:
+        """Initialize resolver with document cache."""
+        super().__init__()
+        self.cache: SBMLDocumentCache = (
+            cache if cache is not None else SBMLDocumentCache()
+        )
+        self._file_resolver = libsbml.SBMLFileResolver()
+
+    def resolveUri(self, uri: str, baseUri: str = "") -> Optional[libsbml.SBMLUri]:
+        """Resolve URI relative to the base URI."""
+        return self._file_resolver.resolveUri(uri, baseUri)
+
+    def resolve(self, uri: str, baseUri: str = "") -> Optional[libsbml.SBMLDocument]:
+        """Resolve document for URI relative to the base URI.
+
+        The returned document is owned by libsbml.
+        """
+        sbml_uri = self.resolveUri(uri, baseUri)
+        if sbml_uri is None or sbml_uri.getScheme() != "file":
+            return None
+        path = Path(sbml_uri.getPath())
+        if not path.is_file():
+            return None
+
+        doc = self.read(path)
+        doc.thisown = False
+        return doc
+
+    def read(self, path: Path) -> libsbml.SBMLDocument:
+        """Read document for path from cache or file."""
+        key = self.cache.key(path, promote=False)
+        doc = self.cache.get(key)
+        if doc is None:
+            doc = libsbml.readSBMLFromFile(key[0])
+            if doc.getNumErrors(libsbml.LIBSBML_SEV_ERROR) == 0:
+                self.cache.put(key, doc)
+            logger.debug(f"External document parsed: '{path}'")
+        return doc
+
+    def clone(self) -> "CachingSBMLResolver":
+        """Clone resolver sharing the cache, the clone is owned by libsbml."""
+        resolver = CachingSBMLResolver(cache=self.cache)
+        resolver.__disown__()
+        return resolver
+
+
+_resolver: Optional[CachingSBMLResolver] = None
+
+
+def enable_resolver_cache(max_size: int = 512 * 1024**2) -> SBMLDocumentCache:
+    """Enable cache of parsed external documents for comp resolution.
+
+    Registers a `CachingSBMLResolver` before all other resolvers.
+
+    :param max_size: memory budget in bytes of SBML files
+    :return: the document cache
+    """
+    global _resolver
+    disable_resolver_cache()
+
+    registry = libsbml.SBMLResolverRegistry.getInstance()
+    resolvers: List[libsbml.SBMLResolver] = [
+        registry.getResolverByIndex(k).clone()
+        for k in range(registry.getNumResolvers())
+    ]
+    while registry.getNumResolvers() > 0:
+        registry.removeResolver(0)
+
+    _resolver = CachingSBMLResolver(cache=SBMLDocumentCache(max_size=max_size))
+    registry.addResolver(_resolver)
+    for resolver in resolvers:
+        registry.addResolver(resolver)
+
+    return _resolver.cache
+
+
+def disable_resolver_cache() -> None:
+    """Disable and clear cache of parsed external documents."""
+    global _resolver
+    if _resolver is not None:
+        index = _registered_index(_resolver)
+        if index is None:
+            logger.warning("CachingSBMLResolver is not registered.")
+        else:
+            libsbml.SBMLResolverRegistry.getInstance().removeResolver(index)
+        _resolver.cache.clear()
+    _resolver = None
+
+
+def _registered_index(resolver: CachingSBMLResolver) -> Optional[int]:
+    """Get index of resolver in the registry.
+
+    The registry contains clones of the added resolvers, the clones of a
+    `CachingSBMLResolver` share its cache.
+    """
+    registry = libsbml.SBMLResolverRegistry.getInstance()
+    for k in range(registry.getNumResolvers()):
+        registered = registry.getResolverByIndex(k)
+        if (
+            isinstance(registered, CachingSBMLResolver)
+            and registered.cache is resolver.cache
+        ):
+            return k
+    return None
+
+
+# the registered resolvers must be removed before the interpreter shuts down
+atexit.register(disable_resolver_cache)
@@ -0,0 +1,154 @@
+"""C code of SBML math.
+
+Creates C expressions (C99 with math.h) from ASTNodes. All numbers are
+doubles, i.e. `1/2` is `0.5`. Booleans are `1.0` and `0.0`, and
+piecewise functions use the conditional operator.
+"""
+from typing import Callable, Dict, List, Optional
+
+import libsbml
+
+
+_FUNCTIONS: Dict[int, str] = {
+    libsbml.AST_FUNCTION_ABS: "fabs",
+    libsbml.AST_FUNCTION_CEILING: "ceil",
+    libsbml.AST_FUNCTION_FLOOR: "floor",
+    libsbml.AST_FUNCTION_EXP: "exp",
+    libsbml.AST_FUNCTION_LN: "log",
+    libsbml.AST_FUNCTION_SIN: "sin",
+    libsbml.AST_FUNCTION_COS: "cos",
+    libsbml.AST_FUNCTION_TAN: "tan",
+    libsbml.AST_FUNCTION_ARCSIN: "asin",
+    libsbml.AST_FUNCTION_ARCCOS: "acos",
+    libsbml.AST_FUNCTION_ARCTAN: "atan",
+    libsbml.AST_FUNCTION_SINH: "sinh",
+    libsbml.AST_FUNCTION_COSH: "cosh",
+    libsbml.AST_FUNCTION_TANH: "tanh",
+    libsbml.AST_FUNCTION_ARCSINH: "asinh",
+    libsbml.AST_FUNCTION_ARCCOSH: "acosh",
+    libsbml.AST_FUNCTION_ARCTANH: "atanh",
+}
+
+_RELATIONAL: Dict[int, str] = {
+    libsbml.AST_RELATIONAL_EQ: "==",
+    libsbml.AST_RELATIONAL_NEQ: "!=",
+    libsbml.AST_RELATIONAL_LT: "<",
+    libsbml.AST_RELATIONAL_GT: ">",
+    libsbml.AST_RELATIONAL_LEQ: "<=",
+    libsbml.AST_RELATIONAL_GEQ: ">=",
+}
+
+_CONSTANTS: Dict[int, str] = {
+    libsbml.AST_CONSTANT_E: "2.718281828459045",
+    libsbml.AST_CONSTANT_PI: "3.141592653589793",
+    libsbml.AST_CONSTANT_TRUE: "1.0",
+    libsbml.AST_CONSTANT_FALSE: "0.0",
+    libsbml.AST_NAME_AVOGADRO: "6.02214076e+23",
+}
+
+
+def c_formula(
+    astnode: libsbml.ASTNode, symbols: Optional[Dict[str, str]] = None
+) -> str:
+    """Create C expression from ASTNode.
+
+    :param astnode: ASTNode
+    :param symbols: C expressions of symbols, e.g. {"k1": "p[2]"}, other
+        symbols are used as variables; the symbol of time is `t`
+    :return: C expression
+    :raises ValueError: if the math is not supported
+    """
+    if symbols is None:
+        symbols = {}
+    return _c_formula(astnode, symbols)
+
+
+def _number(value: float) -> str:
+    """Create C double literal."""
+    if value != value:
+        return "NAN"
+    if value in {float("inf"), float("-inf")}:
+        return "INFINITY" if value > 0 else "(-INFINITY)"
+    formula = repr(float(value))
+    return f"({formula})" if value < 0 else formula
+
+
+def _c_formula(node: libsbml.ASTNode, symbols: Dict[str, str]) -> str:
+    """Create C expression from node (recursive)."""
+    ast_type = node.getType()
+    args: List[str] = [
+        _c_formula(node.getChild(k), symbols) for k in range(node.getNumChildren())
+    ]
+
+    def join(operator: str, default: str) -> str:
+        if not args:
+            return default
+        return f"({f' {operator} '.join(args)})"
+
+    def chain(combine: Callable[[str, str], str], operator: str) -> str:
+        """Pairwise combination of arguments, e.g. `a < b < c`."""
+        pairs = [combine(args[k], args[k + 1]) for k in range(len(args) - 1)]
+        return pairs[0] if len(pairs) == 1 else f"({f' {operator} '.join(pairs)})"
+
+    if ast_type == libsbml.AST_INTEGER:
+        return _number(node.getInteger())
+    elif ast_type in {libsbml.AST_REAL, libsbml.AST_REAL_E}:
+        return _number(node.getReal())
+    elif ast_type == libsbml.AST_RATIONAL:
+        return f"({_number(node.getNumerator())} / {_number(node.getDenominator())})"
+    elif ast_type == libsbml.AST_NAME:
+        return symbols.get(node.getName(), node.getName())
+    elif ast_type == libsbml.AST_NAME_TIME:
+        return "t"
+    elif ast_type in _CONSTANTS:
+        return _CONSTANTS[ast_type]
+
+    elif ast_type == libsbml.AST_PLUS:
+        return join("+", "0.0")
+    elif ast_type == libsbml.AST_MINUS:
+        return f"(-{args[0]})" if len(args) == 1 else f"({args[0]} - {args[1]})"
+    elif ast_type == libsbml.AST_TIMES:
+        return join("*", "1.0")
+    elif ast_type == libsbml.AST_DIVIDE:
+        return f"({args[0]} / {args[1]})"
+    elif ast_type in {libsbml.AST_POWER, libsbml.AST_FUNCTION_POWER}:
+        return f"pow({args[0]}, {args[1]})"
+
+    elif ast_type in _RELATIONAL and len(args) > 1:
+        operator = _RELATIONAL[ast_type]
+        return chain(lambda a, b: f"({a} {operator} {b})", "&&")
+    elif ast_type == libsbml.AST_LOGICAL_AND:
+        return join("&&", "1.0")
+    elif ast_type == libsbml.AST_LOGICAL_OR:
+        return join("||", "0.0")
+    elif ast_type == libsbml.AST_LOGICAL_XOR:
+        if not args:
+            return "0.0"
+        xor = f"({args[0]} != 0)"
+        for arg in args[1:]:
+            xor = f"({xor} != ({arg} != 0))"
+        return xor
+    elif ast_type == libsbml.AST_LOGICAL_NOT:
+        return f"(!{args[0]})"
+
+    elif ast_type == libsbml.AST_FUNCTION_PIECEWISE:
+        formula = args[-1] if len(args) % 2 == 1 else "NAN"
+        for k in reversed(range(0, len(args) - 1, 2)):
+            formula = f"({args[k + 1]} ? {args[k]} : {formula})"
+        return formula
+    elif ast_type in _FUNCTIONS and len(args) == 1:
+        return f"{_FUNCTIONS[ast_type]}({args[0]})"
+    elif ast_type == libsbml.AST_FUNCTION_ROOT:
+        if len(args) == 1:
+            return f"sqrt({args[0]})"
+        return f"pow({args[1]}, 1.0 / {args[0]})"
+    elif ast_type == libsbml.AST_FUNCTION_LOG:
+        if len(args) == 1:
+            return f"log10({args[0]})"
+        return f"(log({args[1]}) / log({args[0]}))"
+    elif ast_type == libsbml.AST_FUNCTION_FACTORIAL:
+        return f"tgamma({args[0]} + 1.0)"
+
+    raise ValueError(
+        f"Math not supported in C code: '{libsbml.formulaToL3String(node)}'"
+    )
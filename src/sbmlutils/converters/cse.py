@@ -0,0 +1,288 @@
+"""Optimization of SBML math for code generation.
+
+Constant subexpressions, i.e. math without symbols like `1/1000 * 60`, are
+folded into numbers. Common subexpressions which occur repeatedly in the math,
+e.g. `Vmax/Km` or the conditions of piecewise functions, are replaced by
+temporary variables which are evaluated only once.
+
+The math is not changed, all functions work on copies of the ASTNodes.
+"""
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+
+import libsbml
+
+from sbmlutils.converters.mathml import compileMathML
+from sbmlutils.dependency import math_symbols, topological_order
+
+
+# math which is not constant
+_NOT_CONSTANT_TYPES = {
+    libsbml.AST_NAME,
+    libsbml.AST_NAME_TIME,
+    libsbml.AST_FUNCTION,
+    libsbml.AST_FUNCTION_DELAY,
+    libsbml.AST_FUNCTION_RATE_OF,
+    libsbml.AST_LAMBDA,
+}
+
+# nodes in pre order: (astnode, position of parent, index in parent)
+_Nodes = List[Tuple[libsbml.ASTNode, int, int]]
+
+
+def _pre_order(astnode: libsbml.ASTNode) -> Tuple[_Nodes, List[List[int]]]:
+    """Get nodes of math in pre order and the positions of their children.
+
+    Parents come before their children, i.e. iterating in reverse order
+    visits the children before their parents.
+    """
+    nodes: _Nodes = []
+    children: List[List[int]] = []
+    stack = [(astnode, -1, 0)]
+    while stack:
+        node, parent, index = stack.pop()
+        position = len(nodes)
+        nodes.append((node, parent, index))
+        children.append([])
+        if parent >= 0:
+            children[parent].append(position)
+        for k in reversed(range(node.getNumChildren())):
+            stack.append((node.getChild(k), position, k))
+    return nodes, children
+
+
+def _replace(
+    nodes: _Nodes, position: int, astnode: libsbml.ASTNode, root: libsbml.ASTNode
+) -> libsbml.ASTNode:
+    """Replace node at position with astnode, returns the new root."""
+    _, parent, index = nodes[position]
+    if parent < 0:
+        return astnode
+    nodes[parent][0].replaceChild(index, astnode, True)
+    return root
+
+
+def fold_constants(astnode: libsbml.ASTNode) -> libsbml.ASTNode:
+    """Fold constant subexpressions of math into numbers.
+
+    Subexpressions are folded if they do not contain symbols and evaluate to
+    a finite number.
+
+    :param astnode: ASTNode
+    :return: copy of astnode with folded constants
+    """
+    root = astnode.deepCopy()
+    nodes, children = _pre_order(root)
+
+    constant = [False] * len(nodes)
+    for k in reversed(range(len(nodes))):
+        constant[k] = nodes[k][0].getType() not in _NOT_CONSTANT_TYPES and all(
+            constant[j] for j in children[k]
+        )
+
+    folded = [False] * len(nodes)
+    for k, (node, parent, _) in enumerate(nodes):
+        if folded[k] or (parent >= 0 and folded[parent]):
+            folded[k] = True
+            continue
+        if not constant[k] and node.getType() in {libsbml.AST_PLUS, libsbml.AST_TIMES}:
+            _fold_leading_constants(nodes, children[k], constant, folded)
+        if not constant[k] or not children[k]:
+            continue
+        value = _evaluate(node)
+        if value is not None:
+            number = libsbml.ASTNode(libsbml.AST_REAL)
+            number.setValue(value)
+            root = _replace(nodes, k, number, root)
+            folded[k] = True
+
+    return root
+
+
+def _fold_leading_constants(
+    nodes: _Nodes, children: List[int], constant: List[bool], folded: List[bool]
+) -> None:
+    """Fold leading constant arguments of sum or product, e.g. `2 * 3 * x`.
+
+    The arguments are evaluated from left to right, so folding the leading
+    arguments does not change the result.
+    """
+    m = 0
+    while m < len(children) and constant[children[m]]:
+        m += 1
+    if m < 2:
+        return
+    node = nodes[children[0]][1]
+    astnode: libsbml.ASTNode = nodes[node][0]
+    leading = libsbml.ASTNode(astnode.getType())
+    for j in children[:m]:
+        leading.addChild(nodes[j][0].deepCopy())
+    value = _evaluate(leading)
+    if value is None:
+        return
+
+    for j in children[:m]:
+        folded[j] = True
+    number = libsbml.ASTNode(libsbml.AST_REAL)
+    number.setValue(value)
+    astnode.replaceChild(0, number, True)
+    for _ in range(m - 1):
+        astnode.removeChild(1)
+    # indices of remaining arguments
+    for j in children[m:]:
+        child, parent, index = nodes[j]
+        nodes[j] = (child, parent, index - m + 1)
+
+
+def _evaluate(astnode: libsbml.ASTNode) -> Optional[float]:
+    """Evaluate constant math, None if not a finite number."""
+    try:
+        value = compileMathML(astnode)()
+    except (ArithmeticError, ValueError, TypeError, NameError, SyntaxError):
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    value = float(value)
+    if value != value or value in {float("inf"), float("-inf")}:
+        return None
+    return value
+
+
+class _Subexpressions:
+    """Structural identifiers of subexpressions.
+
+    Equal subexpressions have the same identifier.
+    """
+
+    def __init__(self) -> None:
+        self.ids: Dict[Tuple[Any, ...], int] = {}
+
+    def identify(self, nodes: _Nodes, children: List[List[int]]) -> List[int]:
+        """Get identifiers of nodes."""
+        ids = [0] * len(nodes)
+        for k in reversed(range(len(nodes))):
+            node = nodes[k][0]
+            key: Tuple[Any, ...]
+            if not children[k]:
+                key = (node.getType(), libsbml.formulaToL3String(node))
+            else:
+                name = node.getName() if node.getType() == libsbml.AST_FUNCTION else ""
+                key = (node.getType(), name, tuple(ids[j] for j in children[k]))
+            ids[k] = self.ids.setdefault(key, len(self.ids))
+        return ids
+
+
+def _hoistable(nodes: _Nodes, children: List[List[int]], position: int) -> bool:
+    """Check if node is hoisted to a temporary variable if repeated.
+
+    Leafs and negative leafs like `-x` are not hoisted.
+    """
+    if not children[position]:
+        return False
+    if len(children[position]) == 1 and not children[children[position][0]]:
+        return nodes[position][0].getType() != libsbml.AST_MINUS
+    return True
+
+
+def eliminate_common_subexpressions(
+    math: Mapping[str, libsbml.ASTNode],
+    reserved: Optional[Set[str]] = None,
+    prefix: str = "cse",
+) -> Tuple[Dict[str, libsbml.ASTNode], Dict[str, libsbml.ASTNode]]:
+    """Replace common subexpressions in math with temporary variables.
+
+    Subexpressions which occur more than once in the math are assigned to
+    temporary variables `{prefix}{k}`. The math of the temporary variables
+    can depend on other temporary variables.
+
+    :param math: { variable: astnode } dictionary
+    :param reserved: ids which cannot be used for temporary variables
+    :param prefix: prefix of temporary variables
+    :return: math with temporary variables, temporary variables in
+        dependency order { tid: astnode }
+    """
+    if reserved is None:
+        reserved = set()
+    reserved = reserved | set(math.keys())
+    subexpressions = _Subexpressions()
+
+    # count subexpressions
+    counts: Dict[int, int] = {}
+    for astnode in math.values():
+        nodes, children = _pre_order(astnode)
+        ids = subexpressions.identify(nodes, children)
+        for k, sid in enumerate(ids):
+            if _hoistable(nodes, children, k):
+                counts[sid] = counts.get(sid, 0) + 1
+    common = {sid for sid, count in counts.items() if count > 1}
+
+    # replace common subexpressions with temporary variables
+    tids: Dict[int, str] = {}
+    temporaries: Dict[str, libsbml.ASTNode] = {}
+    pending: List[str] = []
+
+    def replace(astnode: libsbml.ASTNode, skip_root: bool) -> libsbml.ASTNode:
+        root = astnode.deepCopy()
+        nodes, children = _pre_order(root)
+        ids = subexpressions.identify(nodes, children)
+        replaced = [False] * len(nodes)
+        for k, (node, parent, _) in enumerate(nodes):
+            if parent >= 0 and replaced[parent]:
+                replaced[k] = True
+                continue
+            if ids[k] not in common or (skip_root and k == 0):
+                continue
+            if ids[k] not in tids:
+                tid = f"__{prefix}{len(tids):08d}__"
+                tids[ids[k]] = tid
+                temporaries[tid] = node.deepCopy()
+                pending.append(tid)
+            symbol = libsbml.ASTNode(libsbml.AST_NAME)
+            symbol.setName(tids[ids[k]])
+            root = _replace(nodes, k, symbol, root)
+            replaced[k] = True
+        return root
+
+    result = {key: replace(astnode, skip_root=False) for key, astnode in math.items()}
+    while pending:
+        tid = pending.pop()
+        temporaries[tid] = replace(temporaries[tid], skip_root=True)
+
+    # inline temporary variables which are used only once, e.g. subexpressions
+    # which occur only in other common subexpressions
+    graph = {tid: math_symbols(astnode) for tid, astnode in temporaries.items()}
+    uses: Dict[str, int] = {tid: 0 for tid in temporaries}
+    for astnode in list(result.values()) + list(temporaries.values()):
+        nodes, _ = _pre_order(astnode)
+        for node, _, _ in nodes:
+            if node.getType() == libsbml.AST_NAME and node.getName() in uses:
+                uses[node.getName()] += 1
+    inlined = {tid for tid, count in uses.items() if count < 2}
+
+    def inline(astnode: libsbml.ASTNode) -> libsbml.ASTNode:
+        for tid in math_symbols(astnode) & inlined:
+            if astnode.getType() == libsbml.AST_NAME:
+                astnode = temporaries[tid].deepCopy()
+            else:
+                astnode.replaceArgument(tid, temporaries[tid])
+        return astnode
+
+    order = topological_order(graph)
+    for tid in order:
+        temporaries[tid] = inline(temporaries[tid])
+    result = {key: inline(astnode) for key, astnode in result.items()}
+
+    # ids of temporary variables in dependency order
+    tid_map: Dict[str, str] = {}
+    index = 0
+    for tid in order:
+        if tid in inlined:
+            continue
+        while f"{prefix}{index}" in reserved:
+            index += 1
+        tid_map[tid] = f"{prefix}{index}"
+        index += 1
+    for astnode in list(result.values()) + list(temporaries.values()):
+        for tid in math_symbols(astnode) & tid_map.keys():
+            astnode.renameSIdRefs(tid, tid_map[tid])
+
+    return result, {tid_map[tid]: temporaries[tid] for tid in tid_map}
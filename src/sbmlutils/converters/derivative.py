@@ -0,0 +1,173 @@
+"""Symbolic differentiation of SBML math.
+
+Derivatives of ASTNodes are created as SBML L3 formula strings. Zero
+derivatives are `None`, which allows to create the sparsity pattern of
+Jacobians from the structure of the math.
+
+Supported are the arithmetic operators, powers and roots, exp, ln, log,
+abs, the trigonometric functions sin, cos and tan and piecewise functions.
+Relational and logical operators, floor and ceiling are piecewise constant,
+i.e., have a zero derivative.
+"""
+from typing import Optional
+
+import libsbml
+
+from sbmlutils.dependency import math_symbols
+
+
+# piecewise constant math (derivative zero)
+_ZERO_TYPES = {
+    libsbml.AST_FUNCTION_FLOOR,
+    libsbml.AST_FUNCTION_CEILING,
+    libsbml.AST_NAME_TIME,
+    libsbml.AST_NAME_AVOGADRO,
+}
+
+
+def derivative(astnode: libsbml.ASTNode, variable: str) -> Optional[str]:
+    """Get derivative of math with respect to variable.
+
+    All other names in the math are treated as constants.
+
+    :param astnode: ASTNode
+    :param variable: name of variable
+    :return: formula of derivative or None if the derivative is zero
+    :raises ValueError: if the derivative of the math is not supported
+    """
+    if variable not in math_symbols(astnode):
+        return None
+    return _derivative(astnode, variable)
+
+
+def _derivative(node: libsbml.ASTNode, variable: str) -> Optional[str]:
+    """Get derivative of node (recursive)."""
+    if node.getType() == libsbml.AST_NAME:
+        return "1" if node.getName() == variable else None
+    if (
+        node.isNumber()
+        or node.isConstant()
+        or node.isRelational()
+        or node.isLogical()
+        or node.getType() in _ZERO_TYPES
+        or variable not in math_symbols(node)
+    ):
+        return None
+
+    ast_type = node.getType()
+    children = [node.getChild(k) for k in range(node.getNumChildren())]
+    d = [derivative(child, variable) for child in children]
+    f = [_formula(child) for child in children]
+
+    if ast_type == libsbml.AST_PLUS:
+        return _sum(*d)
+
+    elif ast_type == libsbml.AST_MINUS:
+        if len(children) == 1:
+            return _product("-1", d[0])
+        return _sum(d[0], _product("-1", d[1]))
+
+    elif ast_type == libsbml.AST_TIMES:
+        # product rule
+        return _sum(
+            *[
+                _product(*f[:k], d[k], *f[k + 1 :])
+                for k in range(len(children))
+                if d[k] is not None
+            ]
+        )
+
+    elif ast_type == libsbml.AST_DIVIDE:
+        # quotient rule: f'/g - f*g'/g^2
+        return _sum(
+            _product(d[0], f"1/{f[1]}"),
+            _product("-1", f[0], d[1], f"1/{f[1]}^2"),
+        )
+
+    elif ast_type in {libsbml.AST_POWER, libsbml.AST_FUNCTION_POWER}:
+        if d[1] is None:
+            return _product(f[1], f"{f[0]}^({f[1]} - 1)", d[0])
+        # f^g * (g' * ln(f) + g * f'/f)
+        return _product(
+            f"{f[0]}^{f[1]}",
+            _sum(
+                _product(d[1], f"ln({f[0]})"),
+                _product(f[1], d[0], f"1/{f[0]}"),
+            ),
+        )
+
+    elif ast_type == libsbml.AST_FUNCTION_ROOT:
+        if len(children) == 1:
+            return _product(d[0], f"1/(2 * sqrt({f[0]}))")
+        if d[0] is not None:
+            raise ValueError(
+                f"Derivative of root degree not supported: '{_formula(node)}'"
+            )
+        return _product(f"1/{f[0]}", f"{f[1]}^(1/{f[0]} - 1)", d[1])
+
+    elif ast_type == libsbml.AST_FUNCTION_EXP:
+        return _product(f"exp({f[0]})", d[0])
+
+    elif ast_type == libsbml.AST_FUNCTION_LN:
+        return _product(d[0], f"1/{f[0]}")
+
+    elif ast_type == libsbml.AST_FUNCTION_LOG:
+        base = f[0] if len(children) == 2 else "10"
+        if len(children) == 2 and d[0] is not None:
+            raise ValueError(
+                f"Derivative of log base not supported: '{_formula(node)}'"
+            )
+        return _product(d[-1], f"1/({f[-1]} * ln({base}))")
+
+    elif ast_type == libsbml.AST_FUNCTION_ABS:
+        return _product(d[0], f"piecewise(1, {f[0]} >= 0, -1)")
+
+    elif ast_type == libsbml.AST_FUNCTION_SIN:
+        return _product(f"cos({f[0]})", d[0])
+
+    elif ast_type == libsbml.AST_FUNCTION_COS:
+        return _product("-1", f"sin({f[0]})", d[0])
+
+    elif ast_type == libsbml.AST_FUNCTION_TAN:
+        return _product(f"1/cos({f[0]})^2", d[0])
+
+    elif ast_type == libsbml.AST_FUNCTION_PIECEWISE:
+        # derivatives of the pieces, the conditions are unchanged
+        if all(d[k] is None for k in range(0, len(children), 2)):
+            return None
+        args = [
+            (d[k] if d[k] is not None else "0") if k % 2 == 0 else f[k]
+            for k in range(len(children))
+        ]
+        if len(children) % 2 == 0:
+            # no otherwise, undefined values are zero
+            args.append("0")
+        return f"piecewise({', '.join(args)})"
+
+    raise ValueError(f"Derivative not supported for math: '{_formula(node)}'")
+
+
+def _formula(node: libsbml.ASTNode) -> str:
+    """Get formula of node in parentheses."""
+    formula: str = libsbml.formulaToL3String(node)
+    if node.isName() or (node.isNumber() and not formula.startswith("-")):
+        return formula
+    return f"({formula})"
+
+
+def _sum(*terms: Optional[str]) -> Optional[str]:
+    """Get sum of terms, None terms are zero."""
+    nonzero = [t for t in terms if t is not None]
+    if not nonzero:
+        return None
+    return " + ".join(nonzero) if len(nonzero) == 1 else f"({' + '.join(nonzero)})"
+
+
+def _product(*factors: Optional[str]) -> Optional[str]:
+    """Get product of factors, None factors are zero."""
+    if any(f is None for f in factors):
+        return None
+    factors_str = [f for f in factors if f != "1"]  # type: ignore
+    if not factors_str:
+        return "1"
+    return " * ".join(f"({f})" for f in factors_str)
@@ -5,11 +5,30 @@ In this namespace all the possible names occuring in formula strings have to be
 In build in python are
     *, /, +, -
     and, or, not
+
+Math which is evaluated repeatedly should be compiled once via `compileMathML`.
+The compiled math is evaluated with values for its symbols, either for single
+values or vectorized for numpy arrays of values (e.g. parameter grids).
 """
+import keyword
+import re
+from dataclasses import dataclass
 from math import *
-from typing import Any, Dict, Optional, Tuple
+from math import log as math_log
+from types import CodeType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
 
 import libsbml
+import numpy as np
+
+
+# names of constants in formula strings
+true = True
+false = False
+exponentiale = e
+avogadro = 6.02214076e23
+INF = inf
+NaN = nan
 
 
 def product(*args: float) -> float:
@@ -26,8 +45,18 @@ def sqr(x: float) -> float:
 
 
 def root(a: float, b: float) -> float:
-    """Root calculation."""
-    return float(a ** (1.0 / b))
+    """Root calculation, root(degree, x)."""
+    return float(b ** (1.0 / a))
+
+
+def log(a: float, b: float) -> float:
+    """Logarithm calculation, log(base, x)."""
+    return float(ln(b) / ln(a))
+
+
+def ln(x: float) -> float:
+    """Natural logarithm calculation."""
+    return float(math_log(x))
 
 
 def xor(*args: float) -> int:
@@ -117,39 +146,228 @@ def f_or(*args):
 """
 
 
-def evaluableMathML(astnode: libsbml.ASTNode, variables: Optional[Dict] = None) -> str:
-    """Create evaluable python formula string from ASTNode."""
-    if variables is None:
-        variables = {}
-    # replace variables with provided values
-    for key, value in variables.items():
-        astnode.replaceArgument(key, libsbml.parseFormula(str(value)))
-
-    # parse formula
+def _vectorized_piecewise(*args: Any) -> Any:
+    """Piecewise calculation for arrays."""
+    conditions = [np.asarray(c, dtype=bool) for c in args[1::2]]
+    values = list(args[0 : 2 * len(conditions) : 2])
+    default = args[-1] if len(args) % 2 == 1 else np.nan
+    return np.select(
+        np.broadcast_arrays(*conditions), np.broadcast_arrays(*values), default
+    )
+
+
+# namespace for evaluation of elementwise formula strings with numpy arrays
+_VECTORIZED_NAMESPACE: Dict[str, Any] = {
+    "abs": np.abs,
+    "ceil": np.ceil,
+    "floor": np.floor,
+    "exp": np.exp,
+    "ln": np.log,
+    "log10": np.log10,
+    "log": lambda a, b: np.log(b) / np.log(a),
+    "sqrt": np.sqrt,
+    "root": lambda a, b: np.power(b, 1.0 / np.asarray(a)),
+    "sqr": np.square,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "asin": np.arcsin,
+    "acos": np.arccos,
+    "atan": np.arctan,
+    "sinh": np.sinh,
+    "cosh": np.cosh,
+    "tanh": np.tanh,
+    "asinh": np.arcsinh,
+    "acosh": np.arccosh,
+    "atanh": np.arctanh,
+    "piecewise": _vectorized_piecewise,
+    "logical_and": lambda *args: np.logical_and.reduce(np.broadcast_arrays(*args)),
+    "logical_or": lambda *args: np.logical_or.reduce(np.broadcast_arrays(*args)),
+    "logical_xor": lambda *args: np.logical_xor.reduce(np.broadcast_arrays(*args)),
+    "logical_not": np.logical_not,
+    "pi": pi,
+    "true": True,
+    "false": False,
+    "exponentiale": e,
+    "avogadro": avogadro,
+    "INF": inf,
+    "NaN": nan,
+}
+
+# logical operators as functions for elementwise math
+_LOGICAL_FUNCTIONS: Dict[int, str] = {
+    libsbml.AST_LOGICAL_AND: "logical_and",
+    libsbml.AST_LOGICAL_OR: "logical_or",
+    libsbml.AST_LOGICAL_XOR: "logical_xor",
+    libsbml.AST_LOGICAL_NOT: "logical_not",
+}
+
+
+def elementwise_logic(astnode: libsbml.ASTNode) -> None:
+    """Replace logical operators with functions in astnode (in place).
+
+    The functions `logical_and`, `logical_or`, `logical_xor` and `logical_not`
+    evaluate the logic elementwise for arrays.
+    """
+    stack = [astnode]
+    while stack:
+        node = stack.pop()
+        name = _LOGICAL_FUNCTIONS.get(node.getType(), None)
+        if name is not None:
+            node.setType(libsbml.AST_FUNCTION)
+            node.setName(name)
+        stack.extend(node.getChild(k) for k in range(node.getNumChildren()))
+
+
+def _formula_settings() -> libsbml.L3ParserSettings:
+    """Get settings for formula strings."""
     settings: libsbml.L3ParserSettings = libsbml.L3ParserSettings()
     settings.setParseUnits(False)
     settings.setParseCollapseMinus(True)
-    formula: str = libsbml.formulaToL3StringWithSettings(astnode, settings)
+    return settings
+
+
+def evaluableMathML(astnode: libsbml.ASTNode, variables: Optional[Dict] = None) -> str:
+    """Create evaluable python formula string from ASTNode.
+
+    The astnode is not changed, the variables are replaced in a copy.
+    """
+    if variables:
+        # replace variables with provided values
+        astnode = astnode.deepCopy()
+        for key, value in variables.items():
+            astnode.replaceArgument(key, libsbml.parseFormula(str(value)))
+
+    # parse formula
+    formula: str = libsbml.formulaToL3StringWithSettings(astnode, _formula_settings())
 
     # <replacements>
     formula = formula.replace("&&", "and")
     formula = formula.replace("||", "or")
+    formula = re.sub(r"!(?!=)", "not ", formula)
     formula = formula.replace("^", "**")
 
     return formula
 
 
+@dataclass(frozen=True)
+class CompiledMath:
+    """Compiled math of an ASTNode.
+
+    The math is evaluated with values for its symbols, i.e. the names in
+    the math, via a compiled python function with the symbols as arguments.
+    """
+
+    formula: str
+    symbols: Tuple[str, ...]
+    code: CodeType
+    function: Callable[..., Any]
+    vectorized_function: Callable[..., Any]
+
+    def __call__(self, variables: Optional[Mapping[str, Any]] = None) -> Any:
+        """Evaluate math with values of symbols.
+
+        :param variables: dictionary of symbol : value
+        :return: value of evaluated math
+        """
+        if variables is None:
+            variables = {}
+        return self.function(*[variables[sid] for sid in self.symbols])
+
+    def vectorized(self, variables: Optional[Mapping[str, Any]] = None) -> np.ndarray:
+        """Evaluate math elementwise for arrays of values of symbols.
+
+        The arrays are broadcasted against each other, e.g. arrays with the
+        same shape for many assignments of the symbols or a grid via
+        `numpy.meshgrid`.
+
+        :param variables: dictionary of symbol : array of values
+        :return: array of values of evaluated math (broadcasted shape)
+        """
+        if variables is None:
+            variables = {}
+        values = [np.asarray(variables[sid]) for sid in self.symbols]
+        result = np.asarray(self.vectorized_function(*values))
+        if not values:
+            return result
+        return np.broadcast_arrays(result, *values)[0]
+
+
+# cache of compiled math {L3 formula: CompiledMath}
+_COMPILED_MATH: Dict[str, CompiledMath] = {}
+_COMPILED_MATH_SIZE = 1024
+
+
+def compileMathML(astnode: libsbml.ASTNode) -> CompiledMath:
+    """Compile math of ASTNode for repeated evaluation.
+
+    Compiled math is cached by the formula of the astnode, the astnode is
+    not changed.
+
+    :param astnode: astnode of math
+    :return: compiled math
+    :raises ValueError: if a symbol is not a valid python name
+    """
+    key: str = libsbml.formulaToL3StringWithSettings(astnode, _formula_settings())
+    compiled = _COMPILED_MATH.get(key, None)
+    if compiled is None:
+        compiled = _compile_math(astnode)
+        if len(_COMPILED_MATH) >= _COMPILED_MATH_SIZE:
+            # remove oldest entry
+            del _COMPILED_MATH[next(iter(_COMPILED_MATH))]
+        _COMPILED_MATH[key] = compiled
+    return compiled
+
+
+def _compile_math(astnode: libsbml.ASTNode) -> CompiledMath:
+    """Compile math of ASTNode."""
+    symbols = set()
+    stack = [astnode]
+    while stack:
+        node = stack.pop()
+        if node.getType() in {libsbml.AST_NAME, libsbml.AST_NAME_TIME}:
+            symbols.add(node.getName())
+        stack.extend(node.getChild(k) for k in range(node.getNumChildren()))
+    for sid in symbols:
+        if not sid.isidentifier() or keyword.iskeyword(sid):
+            raise ValueError(f"Symbol '{sid}' in math is not a valid python name.")
+    args = ", ".join(sorted(symbols))
+
+    formula = evaluableMathML(astnode)
+    code = compile(f"lambda {args}: {formula}", filename="<mathml>", mode="eval")
+
+    astnode_elementwise = astnode.deepCopy()
+    elementwise_logic(astnode_elementwise)
+    formula_elementwise = evaluableMathML(astnode_elementwise)
+    code_elementwise = compile(
+        f"lambda {args}: {formula_elementwise}", filename="<mathml>", mode="eval"
+    )
+
+    return CompiledMath(
+        formula=formula,
+        symbols=tuple(sorted(symbols)),
+        code=code,
+        function=eval(code, globals()),
+        vectorized_function=eval(code_elementwise, dict(_VECTORIZED_NAMESPACE)),
+    )
+
+
 def evaluateMathML(astnode: libsbml.ASTNode, variables: Optional[Dict] = None) -> Any:
     """Evaluate MathML string with given set of variable and parameter values.
 
+    Numerical values are evaluated with the compiled math, other values
+    (e.g. formula strings) are replaced in the math before evaluation.
+
     :param astnode: astnode of MathML string
     :param variables: dictionary of var : value
     :return: value of evaluated MathML
     """
     if variables is None:
         variables = {}
+    if not any(isinstance(value, str) for value in variables.values()):
+        return compileMathML(astnode)(variables)
+
     formula = evaluableMathML(astnode, variables=variables)
-    print(formula)
     # return the evaluated formula
     return eval(formula)
 
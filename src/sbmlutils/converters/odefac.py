@@ -4,15 +4,23 @@ This allows easy integration with existing workflows by rendering respective cod
 
 Currently supported code generation:
 - python: scipy
+- python: scipy with vectorized right hand side (sparse stoichiometric matrix)
+- python: scipy for ensembles of parameter sets (2D states and parameters)
+- C: native right hand side with python loader (ctypes)
 - R: desolve
 - R: dmod
 
+The python, C and R code contains the analytic Jacobian of the odes (`f_jac`) and
+its sparsity pattern (`jac_sparsity`), see `SBML2ODE.jacobian`.
+
+With `SBML2ODE(doc, optimize=True)` constants are folded and common
+subexpressions are evaluated once via temporary variables in all templates.
+
 The following SBML core constructs are currently NOT supported:
 - ConversionFactors
 - FunctionDefinitions
 - InitialAssignments
 - Events
-- Piecewise functions
 - Dynamical changing compartments
 - Species with AssignmentRules
 """
@@ -22,7 +30,7 @@ from __future__ import annotations
 import re
 from collections import defaultdict
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
 import jinja2
 import libsbml
@@ -31,7 +39,9 @@ import numpy as np
 # template location (for language templates)
 from sbmlutils import RESOURCES_DIR
 from sbmlutils.console import console
-from sbmlutils.converters.mathml import evaluableMathML
+from sbmlutils.converters import ccode, cse, derivative, rcode
+from sbmlutils.converters.mathml import elementwise_logic, evaluableMathML
+from sbmlutils.dependency import math_dependency_graph, math_symbols, topological_order
 from sbmlutils.log import get_logger
 from sbmlutils.report.units import udef_to_string
 
@@ -47,12 +57,15 @@ class SBML2ODE:
     integrators like scipy odeint or R desolve.
     """
 
-    def __init__(self, doc: libsbml.SBMLDocument):
+    def __init__(self, doc: libsbml.SBMLDocument, optimize: bool = False):
         """Init with SBMLDocument.
 
         :param doc: SBMLDocument
+        :param optimize: fold constants and eliminate common subexpressions
+            in the math, see `SBML2ODE.optimize_math`
         """
         self.doc: libsbml.SBMLDocument = doc
+        self.optimize: bool = optimize
 
         self.units: Dict[str, Optional[str]] = {}  # model units
         self.x0: Dict = {}  # initial amounts/concentrations
@@ -66,7 +79,13 @@ class SBML2ODE:
         self.p_units: Dict = {}  # parameter units
         self.y_ast: Dict = {}  # assigned variables
         self.yids_ordered: List[str]  # yids in order of math dependencies
+        self.cse_ids: List[str] = []  # temporary variables (subexpressions)
         self.y_units: Dict = {}  # y units
+        self.rids: List[str] = []  # reaction ids
+        # stoichiometric coefficients {(sid, rid): coefficient}
+        self.stoichiometry: Dict[Tuple[str, str], float] = {}
+        # factors of reaction rates {sid: (conversion factor, compartment)}
+        self.x_factors: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
         self.names: Dict[str, str] = {}
 
         # create name dictionary
@@ -96,10 +115,10 @@ class SBML2ODE:
         console.print(f"{self.yids_ordered=}")
 
     @classmethod
-    def from_file(cls, sbml_file: Path) -> SBML2ODE:
+    def from_file(cls, sbml_file: Path, optimize: bool = False) -> SBML2ODE:
         """Create converter from SBML file."""
         doc: libsbml.SBMLDocument = libsbml.readSBMLFromFile(str(sbml_file))
-        return cls(doc)
+        return cls(doc, optimize=optimize)
 
     def _create_odes(self) -> None:
         """Create information of ODE system from SBMLDocument."""
@@ -263,6 +282,7 @@ class SBML2ODE:
                 astnode = klaw.getMath()
             self.y_ast[rid] = astnode
             self.y_units[rid] = f"{self.units['extent']}/{self.units['time']}"
+            self.rids.append(rid)
 
             # create astnode for dx_ast
             reactant: libsbml.SpeciesReference
@@ -282,8 +302,47 @@ class SBML2ODE:
                 astnode = libsbml.parseL3FormulaWithModel(astnode, model)
                 self.dx_ast[key] = astnode
 
+        if self.optimize:
+            self.optimize_math()
+
         # check which math depends on other math (build tree of dependencies)
         self.yids_ordered = self._ordered_yids()
+        _, self._yids_idx, self._xids_idx = self._indices(index_offset=0)
+
+    def optimize_math(self) -> None:
+        """Fold constants and eliminate common subexpressions in the math.
+
+        Common subexpressions of the assignments y and odes dx are assigned to
+        temporary variables which are evaluated once, e.g. `Vmax/Km`. The
+        temporary variables are part of y, so all templates evaluate them.
+        Only constant numbers are folded, parameters p can change.
+        """
+        math = {
+            key: cse.fold_constants(astnode)
+            for key, astnode in {**self.y_ast, **self.dx_ast}.items()
+            if isinstance(astnode, libsbml.ASTNode)
+        }
+        reserved: Set[str] = {
+            sbase.getId()
+            for sbase in self.doc.getListOfAllElements()
+            if sbase.isSetId()
+        }
+        for astnode in math.values():
+            reserved.update(math_symbols(astnode))
+
+        math, temporaries = cse.eliminate_common_subexpressions(
+            math, reserved=reserved
+        )
+        for key, astnode in math.items():
+            if key in self.y_ast:
+                self.y_ast[key] = astnode
+            else:
+                self.dx_ast[key] = astnode
+        for tid, astnode in temporaries.items():
+            self.y_ast[tid] = astnode
+            self.names[tid] = "common subexpression"
+        self.cse_ids = list(temporaries.keys())
+        logger.info(f"Common subexpressions: {len(self.cse_ids)}")
 
     def _add_reaction_formula(
         self,
@@ -309,8 +368,7 @@ class SBML2ODE:
         if species.isSetConversionFactor():
             cf = species.getConversionFactor()
 
-        if cf != "":
-            cf = f"{cf}*"
+        cf_str = f"{cf}*" if cf else ""
 
         # stoichiometry prefix
         if abs(stoichiometry - 1.0) < 1e-10:
@@ -325,10 +383,16 @@ class SBML2ODE:
             # check if only substance units
             in_amount = species.getHasOnlySubstanceUnits()
             if in_amount:
-                self.dx_ast[sid] += f" {sign}{stoichiometry_str}{cf}{rid}"
+                self.dx_ast[sid] += f" {sign}{stoichiometry_str}{cf_str}{rid}"
             else:
                 # in concentration, dividing by the volume
-                self.dx_ast[sid] += f" {sign}{stoichiometry_str}{cf}{rid}/{vid}"
+                self.dx_ast[sid] += f" {sign}{stoichiometry_str}{cf_str}{rid}/{vid}"
+
+            # stoichiometric matrix for vectorized odes
+            coefficient = -stoichiometry if sign == "-" else stoichiometry
+            key = (sid, rid)
+            self.stoichiometry[key] = self.stoichiometry.get(key, 0.0) + coefficient
+            self.x_factors[sid] = (cf if cf else None, None if in_amount else vid)
 
         # FIXME: handle variable compartments (see SBML specification for details)
 
@@ -342,80 +406,75 @@ class SBML2ODE:
         :param filtered_ids: ids which are defined elsewhere and not part of dependency tree
         :return:
         """
-
-        def add_dependency_edges(
-            g: Dict[str, Set], variable: str, astnode: libsbml.ASTNode
-        ) -> None:
-            """Add the dependency edges to the graph."""
-            # handle terminal nodes
-            if astnode.getType() == libsbml.AST_NAME:
-                # add to dependency graph if id is not a defined parameter or state variable
-                sid = astnode.getName()
-                if sid not in filtered_ids:
-                    g[variable].add(sid)
-
-            # variable --depends_on--> v2
-            for k in range(astnode.getNumChildren()):
-                child: libsbml.ASTNode = astnode.getChild(k)
-                if child.getType() == libsbml.AST_NAME:
-                    # add to dependency graph if id is not a defined parameter or state variable
-                    sid = child.getName()
-                    if sid not in filtered_ids:
-                        g[variable].add(sid)
-
-                # recursive adding of children
-                add_dependency_edges(g, variable, child)
-
-        # create math dependency graph
-        g: Dict[str, Set] = defaultdict(set)
-        for variable, astnode in y.items():
-            g[variable] = set()
-            add_dependency_edges(g, variable=variable, astnode=astnode)
-
-        return g
+        return math_dependency_graph(y, filtered_ids)  # type: ignore
 
     def _ordered_yids(self) -> List[str]:
-        """Get the order of the yids from the assignment rules."""
+        """Get the order of the yids from the assignment rules.
+
+        :raises CyclicDependencyError: for cyclic dependencies of the math
+        """
         filtered_ids: Set[str] = set(list(self.p.keys()) + list(self.dx_ast.keys()))
-        # console.print(f"{filtered_ids=}")
-        # console.print(f"{self.y_ast=}")
         g: Dict[str, Set] = SBML2ODE.dependency_graph(self.y_ast, filtered_ids)
-        # console.print(g)
-
-        def create_ordered_variables(
-            g: Dict[str, Set], yids: Optional[List[str]] = None
-        ) -> List[str]:
-            if yids is None:
-                yids = []
-
-            yids_remove = []
-            for yid in sorted(g.keys()):
-                yid_deps = g[yid]
-
-                # add yids with no dependencies
-                if len(yid_deps) == 0:
-                    yids_remove.append(yid)
-
-            # add nodes with no dependencies to list
-            yids = yids + list(yids_remove)  # hard copy to store
-
-            for yid in yids_remove:
-                # remove the yid from nodes
-                del g[yid]
-                # remove the yid from dependency graph
-                for s in g.values():
-                    if yid in s:
-                        s.remove(yid)
-
-            # still nodes in dependency graph (recursive removal)
-            if len(g) > 0:
-                # console.print(g)
-                yids = create_ordered_variables(g, yids=yids)
-            return yids
-
-        # create order from dependency graph
-        yids = create_ordered_variables(g)
-        return yids
+        return topological_order(g)
+
+    def jacobian(self) -> Tuple[Dict[str, Dict[str, str]], Dict[str, Dict[str, str]]]:
+        """Create analytic Jacobian of the odes.
+
+        The derivatives of the assigned variables y with respect to the states
+        are created in the order of the math dependencies via the chain rule.
+        The formulas use the y and the derivatives of y as variables, see
+        `jacobian_variable`. Only nonzero derivatives are returned, i.e. the
+        keys are the sparsity pattern.
+
+        :return: derivatives {yid: {xid: formula}}, Jacobian {xid: {xid: formula}}
+        :raises ValueError: if the derivative of math is not supported
+        """
+        xids: Set[str] = set(self.dx_ast.keys())
+        dy: Dict[str, Dict[str, str]] = {}
+        for yid in self.yids_ordered:
+            astnode = self.y_ast[yid]
+            if isinstance(astnode, libsbml.ASTNode) and yid not in xids:
+                dy[yid] = self._total_derivatives(astnode, xids=xids, dy=dy)
+
+        jac: Dict[str, Dict[str, str]] = {}
+        for xid in sorted(xids):
+            astnode = self.dx_ast[xid]
+            if isinstance(astnode, libsbml.ASTNode):
+                jac[xid] = self._total_derivatives(astnode, xids=xids, dy=dy)
+
+        return dy, jac
+
+    def jacobian_variable(self, yid: str, xid: str) -> str:
+        """Get variable name of derivative of y with respect to state."""
+        return f"dy{self._yids_idx[yid]}_dx{self._xids_idx[xid]}"
+
+    def _total_derivatives(
+        self,
+        astnode: libsbml.ASTNode,
+        xids: Set[str],
+        dy: Dict[str, Dict[str, str]],
+    ) -> Dict[str, str]:
+        """Get derivatives of math with respect to the states.
+
+        :param astnode: math
+        :param xids: state ids
+        :param dy: derivatives of the assigned variables
+        :return: {xid: formula}
+        """
+        terms: Dict[str, List[str]] = defaultdict(list)
+        for name in sorted(math_symbols(astnode)):
+            if name in xids:
+                d = derivative.derivative(astnode, name)
+                if d is not None:
+                    terms[name].append(d)
+            elif dy.get(name, None):
+                d = derivative.derivative(astnode, name)
+                if d is not None:
+                    for xid in dy[name]:
+                        variable = self.jacobian_variable(name, xid)
+                        terms[xid].append(f"({d}) * {variable}")
+
+        return {xid: " + ".join(terms[xid]) for xid in sorted(terms)}
 
     def to_python(self, py_file: Path) -> None:
         """Write ODEs to python."""
@@ -423,10 +482,76 @@ class SBML2ODE:
             template_file="odefac_template.pytemp",
             index_offset=0,
             replace_symbols=True,
+            jacobian=True,
+        )
+        with open(py_file, "w") as f:
+            f.write(content)
+
+    def to_python_vectorized(self, py_file: Path) -> None:
+        """Write ODEs to python with vectorized right hand side.
+
+        The reaction rates are evaluated in a single vector `v` and the odes
+        are calculated via the sparse stoichiometric matrix `S @ v`.
+        """
+        content = self._render_template(
+            template_file="odefac_template_vectorized.pytemp",
+            index_offset=0,
+            replace_symbols=True,
+            jacobian=True,
+            vectorized=True,
+        )
+        with open(py_file, "w") as f:
+            f.write(content)
+
+    def to_python_ensemble(self, py_file: Path) -> None:
+        """Write ODEs to python for ensembles of parameter sets.
+
+        The states and parameters are 2D arrays with the ensemble as second
+        dimension, i.e. x (Nx, Ne) and p (Np, Ne), so all parameter sets are
+        evaluated together. The math is elementwise, i.e. logical operators
+        and piecewise functions are evaluated via numpy.
+        """
+        content = self._render_template(
+            template_file="odefac_template_ensemble.pytemp",
+            index_offset=0,
+            replace_symbols=True,
+            elementwise=True,
+            jacobian=True,
+            vectorized=True,
         )
         with open(py_file, "w") as f:
             f.write(content)
 
+    def to_c(self, c_file: Path) -> None:
+        """Write ODEs to C with python loader.
+
+        The C code contains the odes `f_dxdt`, the Jacobian `f_jac` and the
+        assigned variables `f_y`. The python module with the same name
+        (`c_file.with_suffix(".py")`) compiles the C code with the system C
+        compiler into a shared library and loads the functions via ctypes.
+
+        :raises ValueError: if the math is not supported in C
+        """
+        yids_idx = {yid: k for k, yid in enumerate(self.yids_ordered)}
+
+        def math_formula(astnode: libsbml.ASTNode) -> str:
+            symbols = {yid: f"y[{k}]" for yid, k in yids_idx.items()}
+            return ccode.c_formula(astnode, symbols=symbols)
+
+        for template_file, path in [
+            ("odefac_template.c", c_file),
+            ("odefac_template_c.pytemp", c_file.with_suffix(".py")),
+        ]:
+            content = self._render_template(
+                template_file=template_file,
+                index_offset=0,
+                replace_symbols=True,
+                math_formula=math_formula,
+                jacobian=True,
+            )
+            with open(path, "w") as f:
+                f.write(content)
+
     def to_tex(self, tex_file: Path) -> None:
         """Write ODEs to tex/latex."""
         content = self._render_template(
@@ -438,11 +563,16 @@ class SBML2ODE:
             f.write(content)
 
     def to_R(self, r_file: Path) -> None:
-        """Write ODEs to R."""
+        """Write ODEs to R.
+
+        :raises ValueError: if the math is not supported in R
+        """
         content = self._render_template(
             template_file="odefac_template.R",
             index_offset=1,
             replace_symbols=True,
+            math_formula=rcode.r_formula,
+            jacobian=True,
         )
         with open(r_file, "w") as f:
             f.write(content)
@@ -474,9 +604,17 @@ class SBML2ODE:
         index_offset: int = 0,
         replace_symbols: bool = True,
         template_dir: Optional[Path] = None,
+        elementwise: bool = False,
+        math_formula: Callable[[libsbml.ASTNode], str] = evaluableMathML,
+        jacobian: bool = False,
+        vectorized: bool = False,
     ) -> str:
         """Render given language template.
 
+        :param elementwise: logical operators as functions for elementwise math
+        :param math_formula: function creating formula string of language from astnode
+        :param jacobian: create the Jacobian, otherwise the Jacobian entries are None
+        :param vectorized: create the context of the vectorized odes
         :return: rendered template string.
         """
         if not template_dir:
@@ -519,9 +657,12 @@ class SBML2ODE:
                         d[key] = astnode
                         continue
 
-                    if replace_symbols:
+                    if replace_symbols or elementwise:
                         astnode = astnode.deepCopy()
+                    if elementwise:
+                        elementwise_logic(astnode)
 
+                    if replace_symbols:
                         # replace parameters (p)
                         for key_rep, index in pids_idx.items():
                             ast_rep = libsbml.parseL3Formula(f"p___{index}___")
@@ -531,7 +672,7 @@ class SBML2ODE:
                             ast_rep = libsbml.parseL3Formula(f"x___{index}___")
                             astnode.replaceArgument(key_rep, ast_rep)
 
-                    formula = evaluableMathML(astnode)
+                    formula = math_formula(astnode)
                     if replace_symbols:
                         formula = re.sub("p___", "p[", formula)
                         formula = re.sub("x___", "x[", formula)
@@ -589,6 +730,29 @@ class SBML2ODE:
         y_flat = to_formula(y_flat, replace_symbols=False)
         dx_flat = to_formula(dx_flat, replace_symbols=False)
 
+        # jacobian
+        jacobian_context: Dict[str, Any] = {
+            "jac_y": None,
+            "jac": None,
+            "jac_rows": None,
+            "jac_cols": None,
+        }
+        if jacobian:
+            jacobian_context = self._jacobian(
+                dxids_idx=dxids_idx,
+                index_offset=index_offset,
+                formulas=lambda ast_dict: to_formula(ast_dict, replace_symbols),
+            )
+
+        # vectorized odes
+        vectorized_context: Dict[str, Any] = {}
+        if vectorized:
+            vectorized_context = self._vectorized(
+                pids_idx=pids_idx,
+                dxids_idx=dxids_idx,
+                formulas=lambda ast_dict: to_formula(ast_dict, replace_symbols),
+            )
+
         # context
         c = {
             "model": self.doc.getModel(),
@@ -610,9 +774,117 @@ class SBML2ODE:
             "dx_sym": dx_sym,
             "y_flat": y_flat,
             "dx_flat": dx_flat,
+            "rids": self.rids,
+            **vectorized_context,
+            **jacobian_context,
         }
         return str(template.render(c))
 
+    def _jacobian(
+        self,
+        dxids_idx: Dict[str, int],
+        index_offset: int,
+        formulas: Callable[[Dict], Dict],
+    ) -> Dict[str, Any]:
+        """Create context of the Jacobian.
+
+        The sparsity pattern is given by the zero based indices of the nonzero
+        entries. If the Jacobian is not supported for the math of the model the
+        entries are None.
+
+        :param dxids_idx: indices of states
+        :param index_offset: offset of indices
+        :param formulas: function creating formulas from astnode dictionary
+        :return: context for template
+        """
+        try:
+            dy, jac = self.jacobian()
+        except ValueError as err:
+            logger.warning(f"Jacobian not supported: {err}")
+            return {"jac_y": None, "jac": None, "jac_rows": None, "jac_cols": None}
+
+        def parse(formula: str) -> libsbml.ASTNode:
+            astnode = libsbml.parseL3Formula(formula)
+            if astnode is None:
+                raise ValueError(
+                    f"Jacobian formula could not be parsed: '{formula}': "
+                    f"{libsbml.getLastParseL3Error()}"
+                )
+            return astnode
+
+        dy_ast = {
+            self.jacobian_variable(yid, xid): parse(formula)
+            for yid, d in dy.items()
+            for xid, formula in d.items()
+        }
+        entries = [
+            (dxids_idx[xid_i], dxids_idx[xid_j], parse(formula))
+            for xid_i, d in jac.items()
+            for xid_j, formula in d.items()
+        ]
+        jac_formulas = formulas({f"{i},{j}": a for i, j, a in entries})
+
+        return {
+            "jac_y": formulas(dy_ast),
+            "jac": [(i, j, jac_formulas[f"{i},{j}"]) for i, j, _ in entries],
+            "jac_rows": [i - index_offset for i, _, _ in entries],
+            "jac_cols": [j - index_offset for _, j, _ in entries],
+        }
+
+    def _vectorized(
+        self,
+        pids_idx: Dict[str, int],
+        dxids_idx: Dict[str, int],
+        formulas: Callable[[Dict], Dict],
+    ) -> Dict[str, Any]:
+        """Create context of vectorized odes `dx = S @ v`.
+
+        The stoichiometric matrix S is given as sparse triplets. The species
+        in concentrations with constant compartments are divided by the volumes
+        via index arrays, all other factors (conversion factors, variable
+        compartments) and the odes of the rate rules are single formulas.
+
+        :param pids_idx: indices of parameters
+        :param dxids_idx: indices of states
+        :param formulas: function creating formulas from astnode dictionary
+        :return: context for template
+        """
+        model: libsbml.Model = self.doc.getModel()
+        rids_idx = {rid: k for k, rid in enumerate(self.rids)}
+        s_triplets = sorted(
+            (dxids_idx[sid], rids_idx[rid], coefficient)
+            for (sid, rid), coefficient in self.stoichiometry.items()
+            if coefficient != 0.0
+        )
+
+        conc_idx: List[int] = []
+        vol_idx: List[int] = []
+        factor_ast: Dict[str, libsbml.ASTNode] = {}
+        for sid, (cf, vid) in self.x_factors.items():
+            if cf is None and vid is not None and vid in pids_idx:
+                conc_idx.append(dxids_idx[sid])
+                vol_idx.append(pids_idx[vid])
+            elif cf is not None or vid is not None:
+                factor_str = f"{cf if cf else 1}/{vid}" if vid else str(cf)
+                factor_ast[sid] = libsbml.parseL3FormulaWithModel(factor_str, model)
+
+        rule_ast: Dict[str, libsbml.ASTNode] = {
+            xid: astnode
+            for xid, astnode in self.dx_ast.items()
+            if xid not in self.x_factors and astnode
+        }
+
+        return {
+            "s_rows": [t[0] for t in s_triplets],
+            "s_cols": [t[1] for t in s_triplets],
+            "s_data": [t[2] for t in s_triplets],
+            "conc_idx": [k for k, _ in sorted(zip(conc_idx, vol_idx))],
+            "vol_idx": [k for _, k in sorted(zip(conc_idx, vol_idx))],
+            "dx_factors": formulas(factor_ast),
+            "dx_rules": formulas(rule_ast),
+            "dxids_idx": dxids_idx,
+        }
+
     def _indices(
         self, index_offset: int = 0
     ) -> Tuple[Dict[str, int], Dict[str, int], Dict[str, int]]:
@@ -0,0 +1,153 @@
+"""R code of SBML math.
+
+Creates R expressions from ASTNodes. Booleans are `TRUE` and `FALSE`, and
+piecewise functions and logical operators are elementwise, i.e. `ifelse`,
+`&` and `|`. The symbol of time is `t`.
+"""
+from typing import Callable, Dict, List, Optional
+
+import libsbml
+
+
+_FUNCTIONS: Dict[int, str] = {
+    libsbml.AST_FUNCTION_ABS: "abs",
+    libsbml.AST_FUNCTION_CEILING: "ceiling",
+    libsbml.AST_FUNCTION_FLOOR: "floor",
+    libsbml.AST_FUNCTION_EXP: "exp",
+    libsbml.AST_FUNCTION_LN: "log",
+    libsbml.AST_FUNCTION_SIN: "sin",
+    libsbml.AST_FUNCTION_COS: "cos",
+    libsbml.AST_FUNCTION_TAN: "tan",
+    libsbml.AST_FUNCTION_ARCSIN: "asin",
+    libsbml.AST_FUNCTION_ARCCOS: "acos",
+    libsbml.AST_FUNCTION_ARCTAN: "atan",
+    libsbml.AST_FUNCTION_SINH: "sinh",
+    libsbml.AST_FUNCTION_COSH: "cosh",
+    libsbml.AST_FUNCTION_TANH: "tanh",
+    libsbml.AST_FUNCTION_ARCSINH: "asinh",
+    libsbml.AST_FUNCTION_ARCCOSH: "acosh",
+    libsbml.AST_FUNCTION_ARCTANH: "atanh",
+    libsbml.AST_FUNCTION_FACTORIAL: "factorial",
+}
+
+_RELATIONAL: Dict[int, str] = {
+    libsbml.AST_RELATIONAL_EQ: "==",
+    libsbml.AST_RELATIONAL_NEQ: "!=",
+    libsbml.AST_RELATIONAL_LT: "<",
+    libsbml.AST_RELATIONAL_GT: ">",
+    libsbml.AST_RELATIONAL_LEQ: "<=",
+    libsbml.AST_RELATIONAL_GEQ: ">=",
+}
+
+_CONSTANTS: Dict[int, str] = {
+    libsbml.AST_CONSTANT_E: "exp(1)",
+    libsbml.AST_CONSTANT_PI: "pi",
+    libsbml.AST_CONSTANT_TRUE: "TRUE",
+    libsbml.AST_CONSTANT_FALSE: "FALSE",
+    libsbml.AST_NAME_AVOGADRO: "6.02214076e+23",
+}
+
+
+def r_formula(
+    astnode: libsbml.ASTNode, symbols: Optional[Dict[str, str]] = None
+) -> str:
+    """Create R expression from ASTNode.
+
+    :param astnode: ASTNode
+    :param symbols: R expressions of symbols, e.g. {"k1": "p[2]"}, other
+        symbols are used as variables
+    :return: R expression
+    :raises ValueError: if the math is not supported
+    """
+    if symbols is None:
+        symbols = {}
+    return _r_formula(astnode, symbols)
+
+
+def _number(value: float) -> str:
+    """Create R numeric literal."""
+    if value != value:
+        return "NaN"
+    if value in {float("inf"), float("-inf")}:
+        return "Inf" if value > 0 else "(-Inf)"
+    formula = repr(float(value))
+    return f"({formula})" if value < 0 else formula
+
+
+def _r_formula(node: libsbml.ASTNode, symbols: Dict[str, str]) -> str:
+    """Create R expression from node (recursive)."""
+    ast_type = node.getType()
+    args: List[str] = [
+        _r_formula(node.getChild(k), symbols) for k in range(node.getNumChildren())
+    ]
+
+    def join(operator: str, default: str) -> str:
+        if not args:
+            return default
+        return f"({f' {operator} '.join(args)})"
+
+    def chain(combine: Callable[[str, str], str], operator: str) -> str:
+        """Pairwise combination of arguments, e.g. `a < b < c`."""
+        pairs = [combine(args[k], args[k + 1]) for k in range(len(args) - 1)]
+        return pairs[0] if len(pairs) == 1 else f"({f' {operator} '.join(pairs)})"
+
+    if ast_type == libsbml.AST_INTEGER:
+        return _number(node.getInteger())
+    elif ast_type in {libsbml.AST_REAL, libsbml.AST_REAL_E}:
+        return _number(node.getReal())
+    elif ast_type == libsbml.AST_RATIONAL:
+        return f"({_number(node.getNumerator())} / {_number(node.getDenominator())})"
+    elif ast_type == libsbml.AST_NAME:
+        return symbols.get(node.getName(), node.getName())
+    elif ast_type == libsbml.AST_NAME_TIME:
+        return "t"
+    elif ast_type in _CONSTANTS:
+        return _CONSTANTS[ast_type]
+
+    elif ast_type == libsbml.AST_PLUS:
+        return join("+", "0")
+    elif ast_type == libsbml.AST_MINUS:
+        return f"(-{args[0]})" if len(args) == 1 else f"({args[0]} - {args[1]})"
+    elif ast_type == libsbml.AST_TIMES:
+        return join("*", "1")
+    elif ast_type == libsbml.AST_DIVIDE:
+        return f"({args[0]} / {args[1]})"
+    elif ast_type in {libsbml.AST_POWER, libsbml.AST_FUNCTION_POWER}:
+        return f"({args[0]}^{args[1]})"
+
+    elif ast_type in _RELATIONAL and len(args) > 1:
+        operator = _RELATIONAL[ast_type]
+        return chain(lambda a, b: f"({a} {operator} {b})", "&")
+    elif ast_type == libsbml.AST_LOGICAL_AND:
+        return join("&", "TRUE")
+    elif ast_type == libsbml.AST_LOGICAL_OR:
+        return join("|", "FALSE")
+    elif ast_type == libsbml.AST_LOGICAL_XOR:
+        if not args:
+            return "FALSE"
+        formula = args[0]
+        for arg in args[1:]:
+            formula = f"xor({formula}, {arg})"
+        return formula
+    elif ast_type == libsbml.AST_LOGICAL_NOT:
+        return f"(!{args[0]})"
+
+    elif ast_type == libsbml.AST_FUNCTION_PIECEWISE:
+        formula = args[-1] if len(args) % 2 == 1 else "NaN"
+        for k in reversed(range(0, len(args) - 1, 2)):
+            formula = f"ifelse({args[k + 1]}, {args[k]}, {formula})"
+        return formula
+    elif ast_type in _FUNCTIONS and len(args) == 1:
+        return f"{_FUNCTIONS[ast_type]}({args[0]})"
+    elif ast_type == libsbml.AST_FUNCTION_ROOT:
+        if len(args) == 1:
+            return f"sqrt({args[0]})"
+        return f"({args[1]}^(1 / {args[0]}))"
+    elif ast_type == libsbml.AST_FUNCTION_LOG:
+        if len(args) == 1:
+            return f"log10({args[0]})"
+        return f"log({args[1]}, base = {args[0]})"
+
+    raise ValueError(
+        f"Math not supported in R code: '{libsbml.formulaToL3String(node)}'"
+    )
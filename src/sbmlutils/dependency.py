@@ -0,0 +1,127 @@
+"""Dependency graphs of symbols.
+
+A dependency graph is a dictionary {node: set of nodes it depends on}, e.g.
+the variables of assignment rules and the symbols used in their math.
+The graphs are ordered via Kahn's algorithm, i.e. in linear time and without
+recursion, so long chains of dependencies are supported. Cyclic dependencies
+are reported with one of the cycles.
+"""
+from typing import Dict, Iterable, List, Mapping, Optional, Set
+
+import libsbml
+
+
+class CyclicDependencyError(ValueError):
+    """Error for cyclic dependencies in a dependency graph."""
+
+    def __init__(self, cycle: List[str], nodes: List[str]) -> None:
+        """Initialize with cycle and all nodes which could not be ordered.
+
+        :param cycle: nodes of cycle, every node depends on the next node
+        :param nodes: nodes in or depending on cycles
+        """
+        self.cycle = cycle
+        self.nodes = nodes
+        super().__init__(f"Cyclic dependencies: {' -> '.join(cycle + cycle[:1])}")
+
+
+def math_symbols(astnode: libsbml.ASTNode) -> Set[str]:
+    """Get symbols (names) used in math.
+
+    :param astnode: ASTNode
+    :return: set of symbols
+    """
+    symbols: Set[str] = set()
+    stack = [astnode]
+    while stack:
+        node = stack.pop()
+        if node.getType() == libsbml.AST_NAME:
+            symbols.add(node.getName())
+        stack.extend(node.getChild(k) for k in range(node.getNumChildren()))
+    return symbols
+
+
+def math_dependency_graph(
+    math: Mapping[str, libsbml.ASTNode], filtered_ids: Optional[Set[str]] = None
+) -> Dict[str, Set[str]]:
+    """Create dependency graph of variables and the symbols in their math.
+
+    :param math: { variable: astnode } dictionary
+    :param filtered_ids: ids which are defined elsewhere and not part of graph
+    :return: dependency graph
+    """
+    if filtered_ids is None:
+        filtered_ids = set()
+    return {
+        variable: math_symbols(astnode) - filtered_ids
+        for variable, astnode in math.items()
+    }
+
+
+def topological_order(graph: Mapping[str, Iterable[str]]) -> List[str]:
+    """Get nodes of dependency graph in dependency order.
+
+    Every node comes after its dependencies. The nodes are ordered in layers,
+    i.e. first all nodes without dependencies, then all nodes depending only
+    on the first layer, and so on. Nodes within a layer are sorted.
+    Dependencies which are not nodes of the graph are ignored.
+
+    :param graph: dependency graph {node: dependencies}
+    :return: ordered nodes
+    :raises CyclicDependencyError: for cyclic dependencies
+    """
+    in_degree: Dict[str, int] = {node: 0 for node in graph}
+    dependents: Dict[str, List[str]] = {node: [] for node in graph}
+    for node, dependencies in graph.items():
+        for dependency in set(dependencies):
+            if dependency in dependents:
+                dependents[dependency].append(node)
+                in_degree[node] += 1
+
+    order: List[str] = []
+    layer = sorted(node for node, degree in in_degree.items() if degree == 0)
+    while layer:
+        order.extend(layer)
+        next_layer = []
+        for node in layer:
+            for dependent in dependents[node]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    next_layer.append(dependent)
+        layer = sorted(next_layer)
+
+    if len(order) < len(in_degree):
+        nodes = sorted(node for node, degree in in_degree.items() if degree > 0)
+        raise CyclicDependencyError(cycle=find_cycle(graph) or nodes, nodes=nodes)
+    return order
+
+
+def find_cycle(graph: Mapping[str, Iterable[str]]) -> Optional[List[str]]:
+    """Find a cycle in dependency graph.
+
+    :param graph: dependency graph {node: dependencies}
+    :return: nodes of cycle (every node depends on the next node and the last
+        node on the first node) or None if the graph is acyclic
+    """
+    visited: Set[str] = set()
+    for start in sorted(graph):
+        if start in visited:
+            continue
+        # iterative depth first search with the current path on the stack
+        path: List[str] = [start]
+        on_path: Set[str] = {start}
+        iterators = [iter(sorted(set(graph[start])))]
+        visited.add(start)
+        while iterators:
+            dependency = next(iterators[-1], None)
+            if dependency is None:
+                iterators.pop()
+                on_path.discard(path.pop())
+            elif dependency in on_path:
+                return path[path.index(dependency) :]
+            elif dependency in graph and dependency not in visited:
+                visited.add(dependency)
+                path.append(dependency)
+                on_path.add(dependency)
+                iterators.append(iter(sorted(set(graph[dependency]))))
+    return None
@@ -19,9 +19,7 @@ from __future__ import annotations
 
 import datetime
 import inspect
-import json
 from collections import namedtuple
-from copy import deepcopy
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
@@ -40,7 +38,6 @@ from typing import (
 
 import libsbml
 import numpy as np
-import xmltodict  # type: ignore
 from numpy import NaN
 from pint import UndefinedUnitError, UnitRegistry
 from pydantic import BaseModel, ConfigDict
@@ -48,13 +45,15 @@ from pymetadata.core.creator import Creator
 
 from sbmlutils.console import console
 from sbmlutils.io import write_sbml
+from sbmlutils.io.sbml_json import sbml_to_json
 from sbmlutils.log import get_logger
 from sbmlutils.metadata import *
 from sbmlutils.metadata import annotator
 from sbmlutils.metadata.annotator import Annotation
+from sbmlutils.metadata.normalization import normalize_annotation
 from sbmlutils.notes import Notes, NotesFormat
 from sbmlutils.reaction_equation import EquationPart, ReactionEquation
-from sbmlutils.utils import FrozenClass, create_metaid, deprecated
+from sbmlutils.utils import CopyOnWriteList, FrozenClass, create_metaid, deprecated
 from sbmlutils.validation import ValidationOptions, check
 
 
@@ -358,7 +357,16 @@ def date_now() -> libsbml.Date:
 
 
 class Sbase:
-    """Base class of all SBML objects."""
+    """Base class of all SBML objects.
+
+    Factory objects are created in large numbers (e.g. for spatially replicated
+    models), so the element classes use `__slots__` instead of a per-instance
+    `__dict__`. The `Sbase.fields` are stored in the slots of the first concrete
+    subclass, the base class itself declares no slots so that `Model` can still
+    be combined with pydantic's `BaseModel`.
+    """
+
+    __slots__ = ()
 
     def __init__(
         self,
@@ -418,7 +426,9 @@ class Sbase:
                 if isinstance(annotation_obj, Annotation):
                     annotation = annotation_obj
                 elif isinstance(annotation_obj, (tuple, list, set)):
-                    annotation = Annotation.from_tuple(annotation_obj)  # type: ignore
+                    annotation = normalize_annotation(
+                        annotation_obj[0], annotation_obj[1]  # type: ignore
+                    )
                 annotations.append(annotation)
         return annotations
 
@@ -487,8 +497,8 @@ class Sbase:
             processed_annotations = Sbase._process_annotations(self.annotations)
 
         if self.sboTerm is not None:
-            sbo_annotation = Annotation(
-                qualifier=BQB.IS, resource=f"sbo/{self.sboTerm.replace('_', ':')}"
+            sbo_annotation = normalize_annotation(
+                BQB.IS, f"sbo/{self.sboTerm.replace('_', ':')}"
             )
             # check if SBO annotation exists
             sbo_exists = False
@@ -502,8 +512,10 @@ class Sbase:
             if not sbo_exists:
                 processed_annotations = [sbo_annotation] + processed_annotations
 
-        for annotation in processed_annotations:
-            annotator.ModelAnnotator.annotate_sbase(sbase=sbase, annotation=annotation)
+        if processed_annotations:
+            annotator.ModelAnnotator.annotate_sbases(
+                sbases=[sbase], annotations=processed_annotations
+            )
 
         if model:
             self.create_uncertainties(sbase, model)
@@ -590,6 +602,8 @@ class Sbase:
 class KeyValuePair(Sbase):
     """KeyValuePair."""
 
+    __slots__ = (*Sbase.fields, "key", "value", "uri")
+
     def __init__(
         self,
         key: str,
@@ -645,6 +659,8 @@ class Value(Sbase):
     subclasses.
     """
 
+    __slots__ = (*Sbase.fields, "value")
+
     def __init__(
         self,
         sid: Optional[str],
@@ -683,6 +699,8 @@ class UnitDefinition(Sbase):
     Corresponds to the information in the libsbml.UnitDefinition.
     """
 
+    __slots__ = (*Sbase.fields, "definition")
+
     # definition: str = (None,)
 
     _pint2sbml = {
@@ -934,6 +952,8 @@ class ValueWithUnit(Value):
     subclasses.
     """
 
+    __slots__ = ("unit",)
+
     def __repr__(self) -> str:
         """Get string representation."""
         return f"{self.sid} = {self.value} [{self.unit}]"
@@ -996,6 +1016,8 @@ class Function(Sbase):
         lambda(x, sin(x) )
     """
 
+    __slots__ = (*Sbase.fields, "formula")
+
     def __init__(
         self,
         sid: str,
@@ -1044,6 +1066,8 @@ class Function(Sbase):
 class Parameter(ValueWithUnit):
     """Parameter."""
 
+    __slots__ = ("constant",)
+
     def __init__(
         self,
         sid: str,
@@ -1113,6 +1137,8 @@ class Parameter(ValueWithUnit):
 class Compartment(ValueWithUnit):
     """Compartment."""
 
+    __slots__ = ("constant", "spatialDimensions")
+
     def __init__(
         self,
         sid: str,
@@ -1184,6 +1210,20 @@ class Compartment(ValueWithUnit):
 class Species(Sbase):
     """Species."""
 
+    __slots__ = (
+        *Sbase.fields,
+        "substanceUnits",
+        "initialAmount",
+        "initialConcentration",
+        "compartment",
+        "constant",
+        "boundaryCondition",
+        "hasOnlySubstanceUnits",
+        "charge",
+        "chemicalFormula",
+        "conversionFactor",
+    )
+
     def __init__(
         self,
         sid: str,
@@ -1298,6 +1338,8 @@ class InitialAssignment(Value):
     have to be defined in the math.
     """
 
+    __slots__ = ("symbol", "unit")
+
     def __init__(
         self,
         symbol: str,
@@ -1372,6 +1414,8 @@ class InitialAssignment(Value):
 class RuleWithVariable:
     """Rule."""
 
+    __slots__ = ()
+
     variable: str
     value: Union[str, float]
     unit: UnitType
@@ -1426,6 +1470,8 @@ class AssignmentRule(ValueWithUnit, RuleWithVariable):
     have to be defined in the math.
     """
 
+    __slots__ = ("variable",)
+
     def __repr__(self) -> str:
         """Get string representation."""
         return f"{self.variable} = {self.value} [{self.unit}]"
@@ -1478,6 +1524,8 @@ class AssignmentRule(ValueWithUnit, RuleWithVariable):
 class RateRule(ValueWithUnit, RuleWithVariable):
     """RateRule."""
 
+    __slots__ = ("variable",)
+
     def __repr__(self) -> str:
         """Get string representation."""
         return f"d{self.variable}/dt = {self.value} [{self.unit}]"
@@ -1530,6 +1578,8 @@ class RateRule(ValueWithUnit, RuleWithVariable):
 class AlgebraicRule(ValueWithUnit, RuleWithVariable):
     """AlgebraicRule."""
 
+    __slots__ = ()
+
     def __repr__(self) -> str:
         """Get string representation."""
         return f"0 = {self.value} [{self.unit}]"
@@ -1608,6 +1658,20 @@ class Reaction(Sbase):
         'acoa =>',
     """
 
+    __slots__ = (
+        *Sbase.fields,
+        "equation",
+        "compartment",
+        "reversible",
+        "pars",
+        "rules",
+        "formula",
+        "fast",
+        "lowerFluxBound",
+        "upperFluxBound",
+        "geneProductAssociation",
+    )
+
     def __init__(
         self,
         sid: str,
@@ -1798,6 +1862,17 @@ class Event(Sbase):
 
     """
 
+    __slots__ = (
+        *Sbase.fields,
+        "trigger",
+        "assignments",
+        "trigger_persistent",
+        "trigger_initialValue",
+        "useValuesFromTriggerTime",
+        "priority",
+        "delay",
+    )
+
     def __init__(
         self,
         sid: str,
@@ -1904,6 +1979,8 @@ class Constraint(Sbase):
         message='<body xmlns="http://www.w3.org/1999/xhtml">ATP must be non-negative</body>'
     """
 
+    __slots__ = (*Sbase.fields, "math", "message")
+
     def __init__(
         self,
         sid: str,
@@ -1968,6 +2045,8 @@ class UncertParameter:
     FIXME: This is an SBase!
     """
 
+    __slots__ = ("type", "value", "var", "unit")
+
     def __init__(
         self,
         type: str,
@@ -1992,6 +2071,8 @@ class UncertSpan:
     FIXME: This is an SBase!
     """
 
+    __slots__ = ("type", "valueLower", "varLower", "valueUpper", "varUpper", "unit")
+
     def __init__(
         self,
         type: str,
@@ -2025,6 +2106,8 @@ class Uncertainty(Sbase):
     Uncertainty information for Sbase.
     """
 
+    __slots__ = (*Sbase.fields, "formula", "uncertParameters", "uncertSpans")
+
     def __init__(
         self,
         sid: Optional[str] = None,
@@ -2180,6 +2263,8 @@ class ExchangeReaction(Reaction):
         e.g. INF
     """
 
+    __slots__ = ()
+
     PREFIX = "EX_"
 
     def __init__(
@@ -2232,6 +2317,8 @@ class GeneProduct(Sbase):
     name and associatedSpecies.
     """
 
+    __slots__ = (*Sbase.fields, "label", "associatedSpecies")
+
     def __init__(
         self,
         sid: str,
@@ -2279,6 +2366,8 @@ class GeneProduct(Sbase):
 class UserDefinedConstraintComponent(Sbase):
     """UserDefinedConstraintComponent."""
 
+    __slots__ = (*Sbase.fields, "variable", "coefficient", "variableType")
+
     def __init__(
         self,
         coefficient: float,
@@ -2350,6 +2439,8 @@ class UserDefinedConstraint(Sbase):
 
     """
 
+    __slots__ = (*Sbase.fields, "lowerBound", "upperBound", "components")
+
     def __init__(
         self,
         lowerBound: str,
@@ -2421,6 +2512,8 @@ class UserDefinedConstraint(Sbase):
 class FluxObjective(Sbase):
     """FluxObjective."""
 
+    __slots__ = (*Sbase.fields, "reaction", "coefficient", "variableType")
+
     fbc_variable_types: Set[str] = {
         libsbml.FBC_VARIABLE_TYPE_LINEAR,
         libsbml.FBC_VARIABLE_TYPE_QUADRATIC,
@@ -2495,6 +2588,8 @@ class FluxObjective(Sbase):
 class Objective(Sbase):
     """Objective."""
 
+    __slots__ = (*Sbase.fields, "objectiveType", "active", "fluxObjectives")
+
     objective_types: Set[str] = {
         libsbml.OBJECTIVE_TYPE_MAXIMIZE,
         libsbml.OBJECTIVE_TYPE_MINIMIZE,
@@ -2594,6 +2689,8 @@ class Objective(Sbase):
 class ModelDefinition(Sbase):
     """ModelDefinition."""
 
+    __slots__ = (*Sbase.fields, "units", "compartments", "species")
+
     # FIXME: handle as model
 
     def __init__(
@@ -2670,6 +2767,8 @@ class ModelDefinition(Sbase):
 class ExternalModelDefinition(Sbase):
     """ExternalModelDefinition."""
 
+    __slots__ = (*Sbase.fields, "source", "modelRef", "md5")
+
     def __init__(
         self,
         sid: str,
@@ -2719,6 +2818,13 @@ class ExternalModelDefinition(Sbase):
 class Submodel(Sbase):
     """Submodel."""
 
+    __slots__ = (
+        *Sbase.fields,
+        "modelRef",
+        "timeConversionFactor",
+        "extentConversionFactor",
+    )
+
     def __init__(
         self,
         sid: str,
@@ -2767,6 +2873,8 @@ class Submodel(Sbase):
 class SbaseRef(Sbase):
     """SBaseRef."""
 
+    __slots__ = (*Sbase.fields, "portRef", "idRef", "unitRef", "metaIdRef")
+
     def __init__(
         self,
         sid: str,
@@ -2814,6 +2922,8 @@ class SbaseRef(Sbase):
 class ReplacedElement(SbaseRef):
     """ReplacedElement."""
 
+    __slots__ = ("elementRef", "submodelRef", "deletion", "conversionFactor")
+
     def __init__(
         self,
         sid: str,
@@ -2882,6 +2992,8 @@ class ReplacedElement(SbaseRef):
 class ReplacedBy(SbaseRef):
     """ReplacedBy."""
 
+    __slots__ = ("elementRef", "submodelRef")
+
     def __init__(
         self,
         sid: str,
@@ -2934,6 +3046,8 @@ class ReplacedBy(SbaseRef):
 class Deletion(SbaseRef):
     """Deletion."""
 
+    __slots__ = ("submodelRef",)
+
     def __init__(
         self,
         sid: str,
@@ -2996,6 +3110,8 @@ class Port(SbaseRef):
     the Model.
     """
 
+    __slots__ = ("portType",)
+
     def __init__(
         self,
         sid: str,
@@ -3210,6 +3326,18 @@ class Model(Sbase, FrozenClass, BaseModel):
         # return f"{self.__class__.__name__}({field_str})"
         return f"{self.__class__.__name__}"
 
+    def __getstate__(self) -> Dict[str, Any]:
+        """Get state for pickling.
+
+        The attributes are stored in the instance dictionary (not as pydantic
+        fields), e.g. models are send between processes in the parser.
+        """
+        return self.__dict__.copy()
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Set state for unpickling."""
+        object.__setattr__(self, "__dict__", state)
+
     def __init__(
         self,
         sid: str,
@@ -3444,7 +3572,15 @@ class Model(Sbase, FrozenClass, BaseModel):
 
     @staticmethod
     def merge_models(models: Iterable[Model]) -> Model:
-        """Merge information from multiple models."""
+        """Merge information from multiple models.
+
+        The lists of the merged model share the elements of the provided
+        models (`CopyOnWriteList`), i.e. merging does not copy the elements.
+        The lists are snapshots at the time of merging, i.e. later changes of
+        the lists of the provided models do not change the merged model.
+        Modifying a list of the merged model creates a private copy of the
+        list, the provided models are not changed.
+        """
         if isinstance(models, Model):
             return models
         if not models:
@@ -3459,16 +3595,13 @@ class Model(Sbase, FrozenClass, BaseModel):
                 kind = m2._keys.get(key, None)
                 # lists of higher modules are extended
                 if kind in [list, tuple]:
-                    # create new list
-                    if not hasattr(model, key) or getattr(model, key) is None:
-                        setattr(model, key, [])
-                    # now add elements by copy
-                    if getattr(model, key):
-                        if value:
-                            getattr(model, key).extend(deepcopy(value))
-                    else:
-                        if value:
-                            setattr(model, key, deepcopy(value))
+                    merged = getattr(model, key, None)
+                    if not isinstance(merged, CopyOnWriteList):
+                        merged = CopyOnWriteList([merged] if merged else None)
+                        setattr(model, key, merged)
+                    # now add snapshot of elements
+                    if value:
+                        merged.share(value)
 
                 # units are collected and class created dynamically at the end
                 elif key == "units":
@@ -3582,8 +3715,18 @@ class Document(Sbase):
 
     def get_json(self) -> str:
         """Get JSON representation."""
-        o = xmltodict.parse(self.get_sbml())
-        return json.dumps(o, indent=2)
+        if self.doc is None:
+            self.create_sbml()
+        return sbml_to_json(self.doc)  # type: ignore
+
+    def write_json(self, filepath: Path) -> None:
+        """Write JSON representation to file.
+
+        :param filepath: path to JSON file
+        """
+        if self.doc is None:
+            self.create_sbml()
+        sbml_to_json(self.doc, filepath=filepath)
 
 
 @dataclass
@@ -1,2 +1,9 @@
 """Helper functions for input/output (IO)."""
-from .sbml import read_sbml, validate_sbml, write_sbml
+from .sbml import (
+    Compression,
+    disable_document_cache,
+    enable_document_cache,
+    read_sbml,
+    validate_sbml,
+    write_sbml,
+)
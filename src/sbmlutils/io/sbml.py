@@ -1,6 +1,14 @@
 """Utility functions for reading, writing and validating SBML."""
+import bz2
+import gzip
+import io
+import lzma
+import re
+import threading
+from collections import OrderedDict
+from enum import Enum
 from pathlib import Path
-from typing import Optional, Union
+from typing import BinaryIO, Dict, Optional, TextIO, Tuple, Union
 
 import libsbml
 
@@ -13,11 +21,219 @@ from sbmlutils.validation import (
 )
 
 
+try:
+    import zstandard  # type: ignore
+except ImportError:
+    zstandard = None
+
 logger = log.get_logger(__name__)
 
 
+class Compression(str, Enum):
+    """Compression formats for reading and writing SBML."""
+
+    GZIP = "gzip"
+    BZ2 = "bz2"
+    XZ = "xz"
+    ZSTD = "zstd"
+
+
+# magic bytes at the start of compressed data
+_MAGIC_BYTES: Dict[Compression, bytes] = {
+    Compression.GZIP: b"\x1f\x8b",
+    Compression.BZ2: b"BZh",
+    Compression.XZ: b"\xfd7zXZ\x00",
+    Compression.ZSTD: b"\x28\xb5\x2f\xfd",
+}
+_SUFFIXES: Dict[str, Compression] = {
+    ".gz": Compression.GZIP,
+    ".bz2": Compression.BZ2,
+    ".xz": Compression.XZ,
+    ".zst": Compression.ZSTD,
+}
+# SBML (XML) strings start with '<' after an optional BOM and whitespace
+_XML_START = re.compile(r"\ufeff?\s*<")
+
+
+def detect_compression(data: bytes) -> Optional[Compression]:
+    """Detect compression from the magic bytes at the start of the data.
+
+    :param data: first bytes of the data (at least 6 bytes)
+    :return: compression or None for uncompressed data
+    """
+    for compression, magic in _MAGIC_BYTES.items():
+        if data.startswith(magic):
+            return compression
+    return None
+
+
+def _decompress_stream(stream: BinaryIO, compression: Compression) -> BinaryIO:
+    """Get streaming decompressing reader for binary stream."""
+    if compression == Compression.GZIP:
+        return gzip.GzipFile(fileobj=stream, mode="rb")  # type: ignore
+    elif compression == Compression.BZ2:
+        return bz2.BZ2File(stream, mode="rb")  # type: ignore
+    elif compression == Compression.XZ:
+        return lzma.LZMAFile(stream, mode="rb")  # type: ignore
+    elif compression == Compression.ZSTD:
+        if zstandard is None:
+            raise ImportError(
+                "Reading zstd compressed SBML requires 'zstandard', install via "
+                "`pip install zstandard`."
+            )
+        return zstandard.ZstdDecompressor().stream_reader(  # type: ignore
+            stream, closefd=False
+        )
+    raise ValueError(f"Unsupported compression: '{compression}'")
+
+
+def _compress_stream(stream: BinaryIO, compression: Compression) -> BinaryIO:
+    """Get streaming compressing writer for binary stream."""
+    if compression == Compression.GZIP:
+        return gzip.GzipFile(fileobj=stream, mode="wb")  # type: ignore
+    elif compression == Compression.BZ2:
+        return bz2.BZ2File(stream, mode="wb")  # type: ignore
+    elif compression == Compression.XZ:
+        return lzma.LZMAFile(stream, mode="wb")  # type: ignore
+    elif compression == Compression.ZSTD:
+        if zstandard is None:
+            raise ImportError(
+                "Writing zstd compressed SBML requires 'zstandard', install via "
+                "`pip install zstandard`."
+            )
+        return zstandard.ZstdCompressor().stream_writer(  # type: ignore
+            stream, closefd=False
+        )
+    raise ValueError(f"Unsupported compression: '{compression}'")
+
+
+def _read_stream(stream: Union[BinaryIO, TextIO]) -> str:
+    """Read SBML string from binary or text stream with decompression."""
+    if isinstance(stream, io.TextIOBase):
+        return stream.read()
+
+    if hasattr(stream, "peek"):
+        magic = stream.peek(6)[:6]
+    elif stream.seekable():
+        position = stream.tell()
+        magic = stream.read(6)
+        stream.seek(position)
+    else:
+        stream = io.BytesIO(stream.read())
+        magic = stream.getvalue()[:6]
+
+    compression = detect_compression(magic)  # type: ignore
+    if compression is not None:
+        with _decompress_stream(stream, compression) as f_sbml:  # type: ignore
+            data = f_sbml.read()
+    else:
+        data = stream.read()
+    return data.decode("utf-8") if isinstance(data, bytes) else data
+
+
+def _native_compression(compression: Optional[Compression], path: Path) -> bool:
+    """Check if libsbml handles the (compressed) file natively."""
+    if compression is None:
+        return True
+    suffix = path.suffix.lower()
+    if compression == Compression.GZIP:
+        return suffix == ".gz" and libsbml.SBMLReader.hasZlib()
+    elif compression == Compression.BZ2:
+        return suffix == ".bz2" and libsbml.SBMLReader.hasBzip2()
+    return False
+
+
+# (resolved path, mtime in ns, size in bytes, promote)
+DocumentCacheKey = Tuple[str, int, int, bool]
+
+
+class SBMLDocumentCache:
+    """LRU cache of parsed SBMLDocuments used by `read_sbml` for paths.
+
+    Documents are keyed by (resolved path, mtime, size, promote), i.e. modified
+    files are parsed again. The cache holds its own copy of every document and
+    returns clones, so the returned documents can be modified.
+
+    The memory budget `max_size` is measured in the sizes of the cached SBML
+    files. The least recently used documents are evicted when it is exceeded.
+    """
+
+    def __init__(self, max_size: int = 512 * 1024**2) -> None:
+        """Initialize cache with memory budget in bytes."""
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._docs: OrderedDict[DocumentCacheKey, libsbml.SBMLDocument] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path: Path, promote: bool) -> DocumentCacheKey:
+        """Get cache key for SBML file."""
+        stat = path.stat()
+        return str(path.resolve()), stat.st_mtime_ns, stat.st_size, promote
+
+    def get(self, key: DocumentCacheKey) -> Optional[libsbml.SBMLDocument]:
+        """Get clone of cached document or None."""
+        with self._lock:
+            doc = self._docs.get(key, None)
+            if doc is None:
+                self.misses += 1
+                return None
+            self._docs.move_to_end(key)
+            self.hits += 1
+        return doc.clone()
+
+    def put(self, key: DocumentCacheKey, doc: libsbml.SBMLDocument) -> None:
+        """Store clone of document and evict least recently used documents."""
+        size = key[2]
+        if size > self.max_size:
+            return
+        doc = doc.clone()
+        with self._lock:
+            if key in self._docs:
+                self.size -= key[2]
+            self._docs[key] = doc
+            self.size += size
+            while self.size > self.max_size:
+                evicted_key, _ = self._docs.popitem(last=False)
+                self.size -= evicted_key[2]
+
+    def clear(self) -> None:
+        """Remove all documents from cache."""
+        with self._lock:
+            self._docs.clear()
+            self.size = 0
+
+    def __len__(self) -> int:
+        """Get number of cached documents."""
+        return len(self._docs)
+
+
+_document_cache: Optional[SBMLDocumentCache] = None
+
+
+def enable_document_cache(max_size: int = 512 * 1024**2) -> SBMLDocumentCache:
+    """Enable cache of parsed documents for `read_sbml`.
+
+    :param max_size: memory budget in bytes of SBML files
+    :return: the document cache
+    """
+    global _document_cache
+    _document_cache = SBMLDocumentCache(max_size=max_size)
+    return _document_cache
+
+
+def disable_document_cache() -> None:
+    """Disable and clear cache of parsed documents for `read_sbml`."""
+    global _document_cache
+    if _document_cache is not None:
+        _document_cache.clear()
+    _document_cache = None
+
+
 def read_sbml(
-    source: Union[Path, str],
+    source: Union[Path, str, bytes, BinaryIO, TextIO],
     promote: bool = False,
     validate: bool = False,
     validation_options: Optional[ValidationOptions] = None,
@@ -29,30 +245,64 @@ def read_sbml(
     The subset of tested features in validation can be set via the
     `validation_options`.
 
-    :param source: SBML path or string
+    The source can be a path, an SBML string, bytes or a file-like object.
+    Compressed data (gzip, bz2, xz, zstd) is detected via the magic bytes and
+    decompressed while reading.
+
+    :param source: SBML path, string, bytes or file-like object
     :param promote: promote local parameters to global parameters
     :param validate: validate file
     :param validation_options: options for validation
 
     :return: libsbml.SBMLDocument
     """
-    doc: libsbml.SBMLDocument
-    if isinstance(source, str) and "<sbml" in source:
+    doc: Optional[libsbml.SBMLDocument] = None
+    cache = _document_cache
+    cache_key: Optional[DocumentCacheKey] = None
+    if isinstance(source, str) and _XML_START.match(source):
         doc = libsbml.readSBMLFromString(source)
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        doc = libsbml.readSBMLFromString(_read_stream(io.BytesIO(source)))
+        source = "<bytes>"
+    elif hasattr(source, "read"):
+        doc = libsbml.readSBMLFromString(_read_stream(source))  # type: ignore
+        source = str(getattr(source, "name", "<stream>"))
     else:
         if not isinstance(source, Path):
             logger.error(
                 f"All SBML paths should be of type 'Path', but "
                 f"'{type(source)}' found for: {source}"
             )
-            source = Path(source)
-
-        doc = libsbml.readSBMLFromFile(str(source))
+            source = Path(source)  # type: ignore
+
+        if cache is not None and source.is_file():
+            cache_key = cache.key(source, promote)
+            doc = cache.get(cache_key)
+            if doc is not None:
+                # cached documents are already promoted
+                promote = False
+                cache_key = None
+
+        if doc is None:
+            compression: Optional[Compression] = None
+            if source.is_file():
+                with open(source, "rb") as f_sbml:
+                    compression = detect_compression(f_sbml.read(6))
+
+            if _native_compression(compression, source):
+                doc = libsbml.readSBMLFromFile(str(source))
+            else:
+                with open(source, "rb") as f_sbml:
+                    doc = libsbml.readSBMLFromString(_read_stream(f_sbml))
 
     # promote local parameters
     if promote:
         doc = promote_local_variables(doc)
 
+    # cache documents parsed without errors
+    if cache_key is not None and doc.getNumErrors() == 0:
+        cache.put(cache_key, doc)  # type: ignore
+
     # check for errors
     if doc.getNumErrors() > 0:
         if doc.getError(0).getErrorId() == libsbml.XMLFileUnreadable:
@@ -77,24 +327,31 @@ def read_sbml(
 
 def write_sbml(
     doc: libsbml.SBMLDocument,
-    filepath: Optional[Path] = None,
+    filepath: Optional[Union[Path, BinaryIO, TextIO]] = None,
     validate: bool = False,
     validation_options: Optional[ValidationOptions] = None,
     program_name: Optional[str] = None,
     program_version: Optional[str] = None,
+    compression: Optional[Compression] = None,
 ) -> Optional[str]:
     """Write SBMLDocument to file or string.
 
     To write the SBML to string use 'filepath=None', which returns the SBML string.
+    The SBML can be written to a file-like object, text streams are written
+    uncompressed.
+
+    The compression of files is inferred from the suffix ('.gz', '.bz2',
+    '.xz', '.zst') if no `compression` is provided.
 
     The file can be validated during writing via the validate flag.
 
     :param doc: SBMLDocument to write
-    :param filepath: output file to write
+    :param filepath: output file or file-like object to write
     :param validate: flag for validation
     :param validation_options: validation flag
     :param program_name: Program name for SBML file
     :param program_version: Program version for SBML file
+    :param compression: compression for file or binary stream
 
     :return: None or SBML string
     """
@@ -110,8 +367,33 @@ def write_sbml(
     if filepath is None:
         sbml_str = writer.writeSBMLToString(doc)
         source = str(sbml_str)
+    elif hasattr(filepath, "write"):
+        source = str(writer.writeSBMLToString(doc))
+        if isinstance(filepath, io.TextIOBase):
+            if compression is not None:
+                raise ValueError("Compression requires a binary stream.")
+            filepath.write(source)
+        elif compression is not None:
+            # closing the compressed stream does not close the underlying stream
+            with _compress_stream(
+                filepath, Compression(compression)  # type: ignore
+            ) as f_sbml:
+                f_sbml.write(source.encode("utf-8"))
+        else:
+            filepath.write(source.encode("utf-8"))  # type: ignore
     else:
-        writer.writeSBMLToFile(doc, str(filepath))
+        filepath = Path(filepath)  # type: ignore
+        if compression is None:
+            compression = _SUFFIXES.get(filepath.suffix.lower(), None)
+        else:
+            compression = Compression(compression)
+
+        if _native_compression(compression, filepath):
+            writer.writeSBMLToFile(doc, str(filepath))
+        else:
+            with open(filepath, "wb") as f_raw:
+                with _compress_stream(f_raw, compression) as f_sbml:
+                    f_sbml.write(writer.writeSBMLToString(doc).encode("utf-8"))
         source = filepath
 
     # validation
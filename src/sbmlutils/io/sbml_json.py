@@ -0,0 +1,180 @@
+"""Serialization of SBML to JSON.
+
+The JSON representation is the dictionary representation of the SBML XML
+as created by `xmltodict`, i.e. attributes are prefixed with '@', text content
+is stored under '#text' and repeated child elements are stored as lists.
+
+The SBML is serialized with the libsbml writer and converted in a single
+expat pass without the generic `xmltodict` handler. The JSON is written
+by a specialized encoder for the limited set of types in the representation
+(dict, list, str, None) which can stream the output to a file.
+"""
+from json.encoder import encode_basestring_ascii  # type: ignore
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TextIO, Union
+from xml.parsers import expat
+
+import libsbml
+
+from sbmlutils.log import get_logger
+
+
+logger = get_logger(__name__)
+
+# number of chunks buffered before writing to stream
+_CHUNK_BUFFER = 8192
+
+
+def sbml_to_dict(source: Union[str, libsbml.SBMLDocument]) -> Dict[str, Any]:
+    """Convert SBML to dictionary.
+
+    The dictionary is identical to `xmltodict.parse` of the SBML string.
+
+    :param source: SBML string or SBMLDocument
+    :return: dictionary representation of SBML
+    """
+    if isinstance(source, libsbml.SBMLDocument):
+        source = libsbml.writeSBMLToString(source)
+
+    # (item, data) of the parent elements
+    stack: List[Any] = []
+    # item and character data of the current element
+    item: Optional[Dict[str, Any]] = None
+    data: Optional[List[str]] = None
+
+    def start(name: str, attrs: List[str]) -> None:
+        nonlocal item, data
+        stack.append((item, data))
+        if attrs:
+            item = dict(zip(["@" + key for key in attrs[0::2]], attrs[1::2]))
+        else:
+            item = None
+        data = None
+
+    def end(name: str) -> None:
+        nonlocal item, data
+        value: Any = item
+        if value is None:
+            value = "".join(data).strip() or None if data else None
+        elif data:
+            text = "".join(data).strip()
+            if text:
+                value["#text"] = text
+        item, data = stack.pop()
+
+        if item is None:
+            item = {name: value}
+        elif name in item:
+            existing = item[name]
+            if type(existing) is list:
+                existing.append(value)
+            else:
+                item[name] = [existing, value]
+        else:
+            item[name] = value
+
+    def characters(text: str) -> None:
+        nonlocal data
+        if data is None:
+            data = [text]
+        else:
+            data.append(text)
+
+    parser = expat.ParserCreate("utf-8")
+    parser.ordered_attributes = True
+    parser.buffer_text = True
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = characters
+    parser.Parse(source.encode("utf-8"), True)
+
+    return item  # type: ignore
+
+
+def _encode(o: Any, newline: str, indent: str, append: Callable[[str], None]) -> None:
+    """Encode object with the given chunk callback.
+
+    Output is identical to `json.dumps(o, indent=len(indent))`.
+    """
+    if isinstance(o, str):
+        append(encode_basestring_ascii(o))
+    elif o is None:
+        append("null")
+    elif isinstance(o, dict):
+        if not o:
+            append("{}")
+            return
+        inner = newline + indent
+        first = True
+        for key, value in o.items():
+            append(("{" if first else ",") + inner + encode_basestring_ascii(key))
+            first = False
+            if isinstance(value, str):
+                append(": " + encode_basestring_ascii(value))
+            else:
+                append(": ")
+                _encode(value, inner, indent, append)
+        append(newline + "}")
+    elif isinstance(o, list):
+        if not o:
+            append("[]")
+            return
+        inner = newline + indent
+        first = True
+        for value in o:
+            append(("[" if first else ",") + inner)
+            first = False
+            _encode(value, inner, indent, append)
+        append(newline + "]")
+    else:
+        raise TypeError(f"Object of type '{type(o)}' is not supported: {o}")
+
+
+def dict_to_json(o: Dict[str, Any], indent: int = 2) -> str:
+    """Get JSON string for dictionary representation of SBML.
+
+    :param o: dictionary representation
+    :param indent: indentation
+    :return: JSON string
+    """
+    chunks: List[str] = []
+    _encode(o, "\n", " " * indent, chunks.append)
+    return "".join(chunks)
+
+
+def sbml_to_json(
+    source: Union[str, libsbml.SBMLDocument],
+    filepath: Optional[Path] = None,
+    indent: int = 2,
+) -> Optional[str]:
+    """Convert SBML to JSON.
+
+    If a `filepath` is provided the JSON is streamed to the file,
+    otherwise the JSON string is returned.
+
+    :param source: SBML string or SBMLDocument
+    :param filepath: optional path to write JSON
+    :param indent: indentation
+    :return: JSON string or None if written to file
+    """
+    o = sbml_to_dict(source)
+    if filepath is None:
+        return dict_to_json(o, indent=indent)
+
+    with open(filepath, "w") as f_json:
+        _write_json(o, f_json, indent=indent)
+    return None
+
+
+def _write_json(o: Dict[str, Any], stream: TextIO, indent: int = 2) -> None:
+    """Stream JSON for dictionary representation in buffered chunks."""
+    chunks: List[str] = []
+
+    def append(chunk: str) -> None:
+        chunks.append(chunk)
+        if len(chunks) >= _CHUNK_BUFFER:
+            stream.write("".join(chunks))
+            chunks.clear()
+
+    _encode(o, "\n", " " * indent, append)
+    stream.write("".join(chunks))
@@ -4,15 +4,16 @@ The following is a helper function for merging multiple SBML models into
 a single model.
 """
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, Optional
 
 import libsbml
 
 from sbmlutils import log
-from sbmlutils.comp import comp, flatten_sbml
-from sbmlutils.io import read_sbml, validate_sbml, write_sbml
-from sbmlutils.validation import ValidationOptions
+from sbmlutils.comp import flatten_sbml_doc
+from sbmlutils.io import read_sbml, write_sbml
+from sbmlutils.validation import ValidationOptions, check, validate_doc
 
 
 logger = log.get_logger(__name__)
@@ -20,7 +21,7 @@ logger = log.get_logger(__name__)
 
 def merge_models(
     model_paths: Dict[str, Path],
-    output_dir: Path,
+    output_dir: Optional[Path] = None,
     merged_id: str = "merged",
     flatten: bool = True,
     validate: bool = True,
@@ -28,23 +29,29 @@ def merge_models(
     validation_options: Optional[ValidationOptions] = None,
     sbml_level: int = 3,
     sbml_version: int = 1,
+    workers: Optional[int] = None,
 ) -> libsbml.SBMLDocument:
     """Merge SBML models.
 
-    Merges SBML models given in `model_paths` in the `output_dir`.
+    Merges SBML models given in `model_paths`.
     Models are provided as dictionary
     {
         'model1_id': model1_path,
         'model2_id': model2_path,
         ...
     }
-    The model ids are used as ids for the ExternalModelDefinitions.
-    Relative paths are set in the merged models.
+    The model ids are used as ids for the ModelDefinitions and submodels
+    of the merged comp model.
+
+    The input models are converted (and validated) in parallel in `workers`
+    processes. The merged model is created in memory, files are only written
+    if an `output_dir` is provided, i.e. the merged model `<merged_id>.xml`
+    and the flattened model `<merged_id>_flat.xml`.
 
     The created model is either in SBML L3V1 (default) or SBML L3V2.
 
     :param model_paths: absolute paths to models
-    :param output_dir: output directory for merged model
+    :param output_dir: optional output directory for merged model
     :param merged_id: model id of the merged model
     :param flatten: flattens the merged model
     :param validate: boolean flag to validate the merged model
@@ -52,75 +59,105 @@ def merge_models(
     :param validation_options: ValidationOptions
     :param sbml_level: SBML Level of the merged model in [3]
     :param sbml_version: SBML Version of the merged model in [1, 2]
+    :param workers: number of worker processes, defaults to the number of CPUs
     :return: SBMLDocument of the merged models
     """
-    # necessary to convert models to SBML L3V1
     if isinstance(output_dir, str):
         logger.warning(f"'output_dir' should be a Path but: '{type(output_dir)}'")
         output_dir = Path(output_dir)
-    if not output_dir.exists():
+    if output_dir is not None and not output_dir.exists():
         raise IOError(f"'output_dir' does not exist: {output_dir}")
 
+    paths: Dict[str, Path] = {}
     for model_id, path in model_paths.items():
+        path = Path(path)
         if not path.exists():
             raise IOError(f"Path for SBML file does not exist: {path}")
-        if isinstance(path, str):
-            path = Path(path)
-
-        # convert to L3V1
-        path_L3: Path = output_dir / f"{model_id}_L3.xml"
-        doc = read_sbml(path)
-        doc.setLevelAndVersion(sbml_level, sbml_version)
-        write_sbml(doc, path_L3)
-        model_paths[model_id] = path_L3
-
-        if validate_input:
-            validate_sbml(
-                source=path_L3,
-                title=str(path),
-                validation_options=validation_options,
-            )
+        paths[model_id] = path
+
+    # convert to Level and Version of merged model
+    args = [
+        (path, sbml_level, sbml_version, validate_input, validation_options)
+        for path in paths.values()
+    ]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 1 or len(args) == 1:
+        sbml_strs = [_convert_model(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            sbml_strs = list(executor.map(_convert_model, *zip(*args)))
+    docs = {
+        model_id: libsbml.readSBMLFromString(sbml_str)
+        for model_id, sbml_str in zip(paths, sbml_strs)
+    }
 
     # create comp model
-    cur_dir = os.getcwd()
-    os.chdir(str(output_dir))
-    merged_doc: libsbml.SBMLDocument = _create_merged_doc(
-        model_paths, merged_id=merged_id
+    merged_doc: libsbml.SBMLDocument = _create_merged_doc_from_docs(
+        docs, merged_id=merged_id, sbml_level=sbml_level, sbml_version=sbml_version
     )
-    os.chdir(cur_dir)
-
-    # write merged doc
-    merged_path = output_dir / f"{merged_id}.xml"
-    write_sbml(merged_doc, filepath=merged_path)
+    if output_dir is not None:
+        merged_path = output_dir / f"{merged_id}.xml"
+        write_sbml(merged_doc, filepath=merged_path)
     if validate:
-        validate_sbml(
-            source=merged_path,
-            validation_options=validation_options,
-            title=str(merged_path),
+        validate_doc(
+            merged_doc, options=validation_options, title=f"{merged_id} (merged)"
         )
 
     if flatten:
-        flat_path = output_dir / f"{merged_id}_flat.xml"
-        flatten_sbml(sbml_path=merged_path, sbml_flat_path=flat_path)
+        flat_path = None if output_dir is None else output_dir / f"{merged_id}_flat.xml"
+        # metaids are prefixed with the submodel ids by the flattening, i.e. the
+        # duplicate metaids of the model definitions are unique after flattening
+        flat_doc = _create_merged_doc_from_docs(
+            docs,
+            merged_id=merged_id,
+            sbml_level=sbml_level,
+            sbml_version=sbml_version,
+            prefix_metaids=False,
+        )
+        flat_doc = flatten_sbml_doc(flat_doc, perform_validation=False)
+        if flat_path is not None:
+            write_sbml(flat_doc, filepath=flat_path)
         if validate:
-            validate_sbml(
-                source=flat_path,
-                validation_options=validation_options,
-                title=str(flat_path),
+            validate_doc(
+                flat_doc, options=validation_options, title=f"{merged_id} (flat)"
             )
 
     return merged_doc
 
 
-def _create_merged_doc(
-    model_paths: Dict[str, Path],
+def _convert_model(
+    path: Path,
+    sbml_level: int,
+    sbml_version: int,
+    validate: bool,
+    validation_options: Optional[ValidationOptions],
+) -> str:
+    """Convert model to Level and Version, runs in worker process.
+
+    :return: SBML string of converted model
+    """
+    doc = read_sbml(path)
+    doc.setLevelAndVersion(sbml_level, sbml_version)
+    if validate:
+        validate_doc(doc, options=validation_options, title=str(path))
+    return libsbml.writeSBMLToString(doc)
+
+
+def _create_merged_doc_from_docs(
+    docs: Dict[str, libsbml.SBMLDocument],
     merged_id: str = "merged",
     sbml_level: int = 3,
     sbml_version: int = 1,
+    prefix_metaids: bool = True,
 ) -> libsbml.SBMLDocument:
-    """Create a comp model from given model paths.
+    """Create a comp model with ModelDefinitions for the given documents.
+
+    The ModelDefinitions are copies of the models, the documents are not
+    changed.
 
-    Warning: This only works if all models are in the same directory.
+    :param prefix_metaids: prefix the metaids with the model ids to make them
+        unique in the merged document
     """
     sbmlns = libsbml.SBMLNamespaces(sbml_level, sbml_version)
     sbmlns.addPackageNamespace("comp", 1)
@@ -133,13 +170,43 @@ def _create_merged_doc(
     comp_doc: libsbml.CompSBMLDocumentPlugin = doc.getPlugin("comp")
     comp_model: libsbml.CompModelPlugin = model.getPlugin("comp")
 
-    for emd_id, path in model_paths.items():
-        # create ExternalModelDefinition
-        emd: libsbml.ExternalModelDefinition = comp.create_ExternalModelDefinition(
-            comp_doc, emd_id, source=str(path)
-        )
-
-        # add submodel which references the external model definition
-        comp.add_submodel_from_emd(comp_model, submodel_id=emd_id, emd=emd)
+    for md_id, model_doc in docs.items():
+        # ModelDefinitions require the comp plugins on all elements
+        model_doc.enablePackage(libsbml.CompExtension.getXmlnsL3V1V1(), "comp", True)
+        for k in range(model_doc.getNumPlugins()):
+            plugin = model_doc.getPlugin(k)
+            doc.enablePackage(plugin.getURI(), plugin.getPrefix(), True)
+
+        md = libsbml.ModelDefinition(model_doc.getModel())
+        md.setId(md_id)
+        if prefix_metaids:
+            _prefix_metaids(md, prefix=f"{md_id}__")
+        check(comp_doc.addModelDefinition(md), f"add ModelDefinition '{md_id}'")
+
+        submodel: libsbml.Submodel = comp_model.createSubmodel()
+        submodel.setId(md_id)
+        submodel.setModelRef(md_id)
+        if md.isSetSBOTerm():
+            submodel.setSBOTerm(md.getSBOTerm())
 
     return doc
+
+
+def _prefix_metaids(model: libsbml.Model, prefix: str) -> None:
+    """Prefix all metaids of the model and its elements.
+
+    The references to the metaids in the RDF annotations are updated.
+    """
+    elements = [model] + list(model.getListOfAllElements())
+    for element in elements:
+        if not element.isSetMetaId():
+            continue
+        metaid = element.getMetaId()
+        element.setMetaId(f"{prefix}{metaid}")
+        if element.isSetAnnotation():
+            annotation = element.getAnnotationString()
+            about = f'rdf:about="#{metaid}"'
+            if about in annotation:
+                element.setAnnotation(
+                    annotation.replace(about, f'rdf:about="#{prefix}{metaid}"')
+                )
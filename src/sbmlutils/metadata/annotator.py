@@ -10,29 +10,61 @@ model components.
 A standard workflow is looking up the components for instance in things like OLS
 ontology lookup service.
 """
+import csv
+import hashlib
+import itertools
+import json
 import os
-import re
+import pickle
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import libsbml
+import openpyxl
 import pandas as pd
 from pymetadata.core.annotation import RDFAnnotation as Annotation
 from pymetadata.identifiers.miriam import BQB, BQM
 
-from sbmlutils import utils
+from sbmlutils import __version__, utils
 from sbmlutils.console import console
 from sbmlutils.io.sbml import read_sbml, write_sbml
 from sbmlutils.log import get_logger
+from sbmlutils.metadata.normalization import normalize_annotation
+from sbmlutils.metadata.patterns import PatternMatcher, PatternStatistics
 
 from ..validation import check
 
 
 logger = get_logger(__name__)
 
+# libsbml qualifier type and qualifier for the BQB and BQM qualifier strings
+_SBML_QUALIFIERS: Dict[str, Tuple[int, int]] = {
+    **{
+        q.value: (libsbml.BIOLOGICAL_QUALIFIER, getattr(libsbml, q.value))
+        for q in BQB
+        if hasattr(libsbml, q.value)
+    },
+    **{
+        q.value: (libsbml.MODEL_QUALIFIER, getattr(libsbml, q.value))
+        for q in BQM
+        if hasattr(libsbml, q.value)
+    },
+}
+_SBML_QUALIFIER_STRINGS: Dict[str, str] = {
+    key: str(
+        libsbml.BiolQualifierType_toString(qualifier)
+        if qualifier_type == libsbml.BIOLOGICAL_QUALIFIER
+        else libsbml.ModelQualifierType_toString(qualifier)
+    )
+    for key, (qualifier_type, qualifier) in _SBML_QUALIFIERS.items()
+}
+
 
 def annotate_sbml(
-    source: Union[Path, str], annotations_path: Path, filepath: Path
+    source: Union[Path, str],
+    annotations_path: Path,
+    filepath: Path,
+    cache_dir: Optional[Path] = None,
 ) -> libsbml.SBMLDocument:
     """
     Annotate a given SBML file with the provided annotations.
@@ -40,6 +72,7 @@ def annotate_sbml(
     :param source: SBML to annotation
     :param annotations_path: external file with annotations
     :param filepath: annotated SBML file
+    :param cache_dir: optional directory for cache of parsed annotations
     :return: annotated SBMLDocument
     """
     doc: libsbml.SBMLDocument = read_sbml(source=source)
@@ -47,10 +80,12 @@ def annotate_sbml(
     # annotate
     if not os.path.exists(str(annotations_path)):
         raise IOError(f"Annotation file does not exist: {annotations_path}")
-    external_annotations = ModelAnnotator.read_annotations(
-        annotations_path, file_format="*"
+    external_annotations = itertools.chain.from_iterable(
+        ModelAnnotator.iter_annotations(
+            annotations_path, file_format="*", cache_dir=cache_dir
+        )
     )
-    doc = annotate_sbml_doc(doc, external_annotations)  # type: ignore
+    doc = annotate_sbml_doc(doc, external_annotations)
 
     # write annotated sbml
     write_sbml(doc, filepath=filepath)
@@ -60,7 +95,7 @@ def annotate_sbml(
 
 
 def annotate_sbml_doc(
-    doc: libsbml.SBMLDocument, external_annotations: List["ExternalAnnotation"]
+    doc: libsbml.SBMLDocument, external_annotations: Iterable["ExternalAnnotation"]
 ) -> libsbml.SBMLDocument:
     """Annotates given SBML document using the annotations file.
 
@@ -193,8 +228,16 @@ class ModelAnnotator:
         self.model = doc.getModel()
         self.annotations = annotations
 
-        # prepare dictionary for lookup of ids
-        self.id_dict = self._get_ids_from_model()
+        # index of elements by type and id for lookup
+        self.element_index = self._create_element_index()
+        self.id_dict = {
+            sbml_type: list(elements)
+            for sbml_type, elements in self.element_index.items()
+        }
+        # pattern matching of ids by type
+        self.matchers: Dict[str, PatternMatcher] = {
+            sbml_type: PatternMatcher(ids) for sbml_type, ids in self.id_dict.items()
+        }
 
     def annotate_model(self) -> None:
         """Annotate the model with the given annotations."""
@@ -205,99 +248,83 @@ class ModelAnnotator:
                 elements = [self.doc]
             else:
                 # lookup of allowed ids for given sbmlutils type
-                ids = self.id_dict.get(a.sbml_type, None)  # type: ignore
+                matcher = self.matchers.get(a.sbml_type, None)  # type: ignore
                 elements = []
-                if ids:
+                if matcher:
                     # find the subset of ids matching the pattern
-                    pattern_ids = ModelAnnotator._get_matching_ids(ids, pattern)  # type: ignore
+                    pattern_ids = matcher.match(pattern)  # type: ignore
                     if not pattern_ids:
                         logger.warning(
                             f"No SBML objects found matching SId annotation "
                             f"pattern: '{pattern}'"
                         )
-                    elements = ModelAnnotator._elements_from_ids(
-                        self.model, pattern_ids, sbml_type=a.sbml_type
+                    elements = self._elements_from_ids(
+                        pattern_ids, sbml_type=a.sbml_type  # type: ignore
                     )
 
             self._annotate_elements(elements, a)
 
-    def _get_ids_from_model(self) -> Dict[str, List[str]]:
-        """Create dictionary of ids for given model for lookup.
-
-        :return:
-        """
-        id_dict = dict()
-        id_dict["model"] = [self.model.getId()]
-
-        lof = self.model.getListOfUnitDefinitions()
-        if lof:
-            id_dict["unit"] = [item.getId() for item in lof]
-
-        lof = self.model.getListOfCompartments()
-        if lof:
-            id_dict["compartment"] = [item.getId() for item in lof]
-
-        lof = self.model.getListOfSpecies()
-        if lof:
-            id_dict["species"] = [item.getId() for item in lof]
-
-        lof = self.model.getListOfParameters()
-        if lof:
-            id_dict["parameter"] = [item.getId() for item in lof]
+    def _create_element_index(self) -> Dict[str, Dict[str, libsbml.SBase]]:
+        """Create index of elements by type and id for lookup.
 
-        lof = self.model.getListOfReactions()
-        if lof:
-            id_dict["reaction"] = [item.getId() for item in lof]
-
-        lof = self.model.getListOfRules()
-        if lof:
-            id_dict["rule"] = [item.getVariable() for item in lof]
-
-        lof = self.model.getListOfEvents()
-        if lof:
-            id_dict["event"] = [item.getId() for item in lof]
+        Rules are indexed by their variable. Only types with elements
+        are part of the index.
 
+        :return: dictionary of {type: {id: element}}
+        """
+        index: Dict[str, Dict[str, libsbml.SBase]] = {
+            "model": {self.model.getId(): self.model}
+        }
+        lofs = {
+            "unit": self.model.getListOfUnitDefinitions(),
+            "compartment": self.model.getListOfCompartments(),
+            "species": self.model.getListOfSpecies(),
+            "parameter": self.model.getListOfParameters(),
+            "reaction": self.model.getListOfReactions(),
+            "rule": self.model.getListOfRules(),
+            "event": self.model.getListOfEvents(),
+        }
         fbc_model = self.model.getPlugin("fbc")
         if fbc_model is not None:
-            lof = fbc_model.getListOfGeneProducts()
+            lofs["fbc:geneproduct"] = fbc_model.getListOfGeneProducts()
+
+        for sbml_type, lof in lofs.items():
             if lof:
-                id_dict["fbc:geneproduct"] = [item.getId() for item in lof]
+                if sbml_type == "rule":
+                    index[sbml_type] = {item.getVariable(): item for item in lof}
+                else:
+                    index[sbml_type] = {item.getId(): item for item in lof}
 
-        return id_dict
+        return index
 
-    @staticmethod
-    def _get_matching_ids(ids: Iterable[str], pattern: str) -> List[str]:
-        """Ids matching the regular expression."""
-        return [s for s in ids if re.match(pattern, s)]
+    def pattern_statistics(self) -> Dict[str, List[PatternStatistics]]:
+        """Get statistics of the pattern matching by type.
+
+        :return: dictionary of {type: [statistics of patterns]}
+        """
+        return {
+            sbml_type: list(matcher.statistics.values())
+            for sbml_type, matcher in self.matchers.items()
+            if matcher.statistics
+        }
 
-    @staticmethod
     def _elements_from_ids(
-        model: libsbml.Model, sbml_ids: Iterable[str], sbml_type: Optional[str] = None
+        self, sbml_ids: Iterable[str], sbml_type: str
     ) -> List[libsbml.SBase]:
         """
         Get list of SBML elements from given ids.
 
-        :param model: SBML model
         :param sbml_ids: SBML SIds
         :param sbml_type: type of SBML objects
         :return:
         """
         elements = []
+        index = self.element_index.get(sbml_type, {})
         for sid in sbml_ids:
-            if sbml_type == "rule":
-                e = model.getRuleByVariable(sid)
-            elif sbml_type == "unit":
-                e = model.getUnitDefinition(sid)
-            else:
-                # returns the first element with id
-                # FIXME: this is very slow in a loop, better solution required via
-                e = model.getElementBySId(sid)
+            e = index.get(sid, None)
             if e is None:
-                if sid == model.getId():
-                    e = model
-                else:
-                    logger.warning(f"Element not found for sid: '{sid}'.")
-                    continue
+                logger.warning(f"Element not found for sid: '{sid}'.")
+                continue
             elements.append(e)
         return elements
 
@@ -310,26 +337,28 @@ class ModelAnnotator:
         :param ex_a: annotation
         :return:
         """
-        for e in elements:
-            if ex_a.annotation_type == "rdf":
-                annotation = Annotation(
-                    qualifier=ex_a.qualifier, resource=ex_a.resource  # type: ignore
-                )
-                ModelAnnotator.annotate_sbase(e, annotation)
+        if ex_a.annotation_type == "rdf":
+            elements = list(elements)
+            annotation = normalize_annotation(
+                ex_a.qualifier, ex_a.resource  # type: ignore
+            )
+            ModelAnnotator.annotate_sbases(elements, [annotation])
 
-                # write SBO terms based on the SBO RDF
-                if annotation.collection == "sbo":
+            # write SBO terms based on the SBO RDF
+            if annotation.collection == "sbo":
+                for e in elements:
                     e.setSBOTerm(annotation.term)
+            return
 
-            elif ex_a.annotation_type in ["formula", "charge"]:
+        for e in elements:
+            if ex_a.annotation_type in ["formula", "charge"]:
                 # via fbc species plugin, so check that species first
                 if ex_a.sbml_type != "species":
                     logger.error(
                         "Chemical formula or Charge can only be " "set on species."
                     )
                 else:
-                    s = self.model.getSpecies(e.getId())
-                    splugin = s.getPlugin("fbc")
+                    splugin = e.getPlugin("fbc")
                     if splugin is None:
                         logger.error(
                             "FbcSpeciesPlugin does not exist, add "
@@ -340,7 +369,7 @@ class ModelAnnotator:
                         if ex_a.annotation_type == "formula":
                             splugin.setChemicalFormula(ex_a.resource)
                         elif ex_a.annotation_type == "charge":
-                            splugin.setCharge(int(ex_a.resource))  # type: ignore
+                            splugin.setCharge(_parse_charge(ex_a.resource))
             else:
                 raise ValueError(
                     f"Annotation type not supported: '{ex_a.annotation_type}'"
@@ -353,17 +382,10 @@ class ModelAnnotator:
         :param qualifier_type: BQB or BQM
         :return: SBML qualifier string
         """
-        if qualifier_str not in libsbml.__dict__:
+        if qualifier_str not in _SBML_QUALIFIERS:
             raise ValueError(f"Qualifier not supported: {qualifier_str}")
 
-        qtype = libsbml.__dict__.get(qualifier_str)
-
-        qualifier: str
-        if qualifier_type == "BQB":
-            qualifier = str(libsbml.BiolQualifierType_toString(qtype))
-        elif qualifier_type == "BQM":
-            qualifier = str(libsbml.ModelQualifierType_toString(qtype))
-        return qualifier
+        return _SBML_QUALIFIER_STRINGS[qualifier_str]
 
     @staticmethod
     def annotate_sbase(sbase: libsbml.SBase, annotation: Annotation) -> None:
@@ -373,63 +395,82 @@ class ModelAnnotator:
         :param annotation: Annotation
         :return:
         """
-        qualifier, resource = annotation.qualifier.value, annotation.resource_normalized
-        cv: libsbml.CVTerm = libsbml.CVTerm()
-
-        # set correct type of qualifier
-        if isinstance(qualifier, str):
-            if qualifier.startswith("BQB"):
-                cv.setQualifierType(libsbml.BIOLOGICAL_QUALIFIER)
-
-                sbml_qualifier = ModelAnnotator.get_SBMLQualifier(qualifier, "BQB")
-                success = check(
-                    cv.setBiologicalQualifierType(sbml_qualifier),
-                    f"Set biological qualifier: '{sbml_qualifier}'",
-                )
-                if not success:
-                    logger.error(
-                        f"Could not set biological qualifier '{qualifier}' "
-                        f"for '{sbase}'."
-                    )
-            elif qualifier.startswith("BQM"):
-                cv.setQualifierType(libsbml.MODEL_QUALIFIER)
-                sbml_qualifier = ModelAnnotator.get_SBMLQualifier(qualifier, "BQM")
-                success = check(
-                    cv.setModelQualifierType(sbml_qualifier),
-                    f"Set model qualifier: '{sbml_qualifier}'",
-                )
-                if not success:
+        ModelAnnotator.annotate_sbases(sbases=[sbase], annotations=[annotation])
+
+    @staticmethod
+    def annotate_sbases(
+        sbases: Iterable[libsbml.SBase], annotations: Iterable[Annotation]
+    ) -> None:
+        """Annotate all SBases with all given annotations in one pass.
+
+        Resources with the same qualifier are grouped in a single CVTerm.
+        The CVTerms are created once and added to every SBase.
+
+        :param sbases: libsbml.SBase objects to annotate
+        :param annotations: Annotations
+        :return:
+        """
+        cvterms = ModelAnnotator.create_cvterms(annotations)
+        if not cvterms:
+            return
+
+        for sbase in sbases:
+            # meta id has to be set
+            if not sbase.isSetMetaId():
+                sbase.setMetaId(utils.create_metaid(sbase))
+
+            for cv in cvterms:
+                success = sbase.addCVTerm(cv)
+                if success != libsbml.LIBSBML_OPERATION_SUCCESS:
+                    check(success, f"Add cvterm: '{cv}'.")
                     logger.error(
-                        f"Could not set model qualifier '{qualifier}' "
+                        f"Annotation RDF for CVTerm '{cv}' could not be written "
                         f"for '{sbase}'."
                     )
-            else:
-                logger.error(f"Unsupported qualifier: '{qualifier}' for '{sbase}'.")
-        else:
-            msg = (
-                f"qualifier is not a string, but: '{qualifier}' of type "
-                f"'{type(qualifier)}' for '{sbase}'."
-            )
-            logger.error(msg)
-            raise ValueError(msg)
 
-        success = check(cv.addResource(resource), f"Add resource: '{resource}'.")
-        if not success:
-            logger.error(f"Could not add resource: {resource} for '{sbase}'.")
+    @staticmethod
+    def create_cvterms(annotations: Iterable[Annotation]) -> List[libsbml.CVTerm]:
+        """Create CVTerms for the annotations.
+
+        Resources are grouped by qualifier, i.e. one CVTerm is created per
+        qualifier in the order of first occurrence.
 
-        # meta id has to be set
-        if not sbase.isSetMetaId():
-            sbase.setMetaId(utils.create_metaid(sbase))
+        :param annotations: Annotations
+        :return: list of CVTerms
+        """
+        resources: Dict[str, Dict[str, None]] = {}
+        for annotation in annotations:
+            qualifier = annotation.qualifier.value
+            if not isinstance(qualifier, str):
+                msg = (
+                    f"qualifier is not a string, but: '{qualifier}' of type "
+                    f"'{type(qualifier)}'."
+                )
+                logger.error(msg)
+                raise ValueError(msg)
+            if qualifier not in _SBML_QUALIFIERS:
+                logger.error(f"Unsupported qualifier: '{qualifier}'.")
+                continue
+            # dict as ordered set of resources
+            resources.setdefault(qualifier, {})[annotation.resource_normalized] = None
+
+        cvterms: List[libsbml.CVTerm] = []
+        for qualifier, qualifier_resources in resources.items():
+            qualifier_type, sbml_qualifier = _SBML_QUALIFIERS[qualifier]
+            cv: libsbml.CVTerm = libsbml.CVTerm(qualifier_type)
+            if qualifier_type == libsbml.BIOLOGICAL_QUALIFIER:
+                cv.setBiologicalQualifierType(sbml_qualifier)
+            else:
+                cv.setModelQualifierType(sbml_qualifier)
 
-        success = check(sbase.addCVTerm(cv), f"Add cvterm: '{cv}'.")
+            for resource in qualifier_resources:
+                success = cv.addResource(resource)
+                if success != libsbml.LIBSBML_OPERATION_SUCCESS:
+                    check(success, f"Add resource: '{resource}'.")
+                    logger.error(f"Could not add resource: {resource}.")
+            cvterms.append(cv)
 
-        if not success:
-            logger.error(
-                f"Annotation RDF for CVTerm '{cv}' could not be written "
-                f"for '{sbase}'."
-            )
-            logger.error(libsbml.OperationReturnValue_toString(success))
-            logger.error(f"{sbase}, {qualifier}, {resource}")
+        return cvterms
 
     # --- File IO ---
 
@@ -443,24 +484,7 @@ class ModelAnnotator:
         :param file_format: annotation file format
         :return: pandas.DataFrame
         """
-        filename, file_extension = os.path.splitext(file_path)
-        if file_format == "*":
-            file_format = file_extension[1:]  # remove leading dot
-
-        formats = ["xlsx", "tsv", "csv", "json"]
-        if file_format not in formats:
-            raise IOError(
-                f"Annotation format '{file_format}' not in supported formats: "
-                f"'{formats}'"
-            )
-
-        if file_extension != ("." + file_format):
-            logger.warning(
-                f"format '{file_format}' not matching file extension "
-                f"'{file_extension}' "
-                f"for file_path '{file_path}'"
-            )
-
+        file_format = _annotation_format(file_path, file_format)
         if file_format == "tsv":
             df = pd.read_csv(file_path, sep="\t", comment="#", skip_blank_lines=True)
         elif file_format == "csv":
@@ -475,22 +499,197 @@ class ModelAnnotator:
 
     @staticmethod
     def read_annotations(
-        file_path: Path, file_format: str = "*"
+        file_path: Path, file_format: str = "*", cache_dir: Optional[Path] = None
     ) -> List[ExternalAnnotation]:
-        """Read annotations from given file into DataFrame.
+        """Read annotations from given file.
 
         Supports "xlsx", "tsv", "csv", "json", "*"
 
         :param file_path: either path to file, or data in dict format
         :param file_format: annotation file format
+        :param cache_dir: optional directory for cache of parsed annotations
         :return: list of annotation objects
         """
-        df = ModelAnnotator.read_annotations_df(
-            file_path=file_path, file_format=file_format
+        return [
+            annotation
+            for chunk in ModelAnnotator.iter_annotations(
+                file_path, file_format=file_format, cache_dir=cache_dir
+            )
+            for annotation in chunk
+        ]
+
+    @staticmethod
+    def iter_annotations(
+        file_path: Path,
+        file_format: str = "*",
+        chunk_size: int = 10000,
+        cache_dir: Optional[Path] = None,
+    ) -> Iterator[List[ExternalAnnotation]]:
+        """Read annotations from given file in chunks.
+
+        The rows are streamed from the file, i.e. only a chunk of annotations
+        is in memory at once. Lines (and the remainder of lines) after '#'
+        are comments, empty rows are skipped.
+
+        If a `cache_dir` is provided the parsed annotations are cached in a
+        binary file keyed by the sbmlutils version and the hash of the
+        annotation file. Unreadable cache files are ignored and overwritten.
+
+        :param file_path: path to annotation file
+        :param file_format: annotation file format
+        :param chunk_size: number of annotations per chunk
+        :param cache_dir: optional directory for cache of parsed annotations
+        :return: iterator over chunks of annotations
+        """
+        file_format = _annotation_format(file_path, file_format)
+        cache_path: Optional[Path] = None
+        if cache_dir is not None:
+            cache_path = Path(cache_dir) / (
+                f"annotations_{__version__}_{_file_hash(Path(file_path))}_"
+                f"{file_format}.pickle"
+            )
+            annotations = _read_cache(cache_path)
+            if annotations is not None:
+                for k in range(0, len(annotations), chunk_size):
+                    yield annotations[k : k + chunk_size]
+                return
+
+        cached: List[ExternalAnnotation] = []
+        chunk: List[ExternalAnnotation] = []
+        for entry in _iter_annotation_rows(Path(file_path), file_format):
+            chunk.append(ExternalAnnotation(entry))
+            if len(chunk) == chunk_size:
+                if cache_path:
+                    cached.extend(chunk)
+                yield chunk
+                chunk = []
+        if cache_path:
+            cached.extend(chunk)
+        if chunk:
+            yield chunk
+
+        if cache_path:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_path, "wb") as f_cache:
+                pickle.dump(cached, f_cache, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _annotation_format(file_path: Path, file_format: str = "*") -> str:
+    """Get format of annotation file.
+
+    :raises IOError: if format is not supported
+    """
+    filename, file_extension = os.path.splitext(file_path)
+    if file_format == "*":
+        file_format = file_extension[1:]  # remove leading dot
+
+    formats = ["xlsx", "tsv", "csv", "json"]
+    if file_format not in formats:
+        raise IOError(
+            f"Annotation format '{file_format}' not in supported formats: "
+            f"'{formats}'"
         )
-        entries = df.to_dict("records")
-        annotations = []
-        for entry in entries:
-            annotations.append(ExternalAnnotation(entry))
 
-        return annotations
+    if file_extension != ("." + file_format):
+        logger.warning(
+            f"format '{file_format}' not matching file extension "
+            f"'{file_extension}' "
+            f"for file_path '{file_path}'"
+        )
+    return file_format
+
+
+def _read_cache(cache_path: Path) -> Optional[List[ExternalAnnotation]]:
+    """Read cached annotations, None if the cache does not exist or is invalid."""
+    if not cache_path.exists():
+        return None
+    try:
+        with open(cache_path, "rb") as f_cache:
+            annotations = pickle.load(f_cache)
+    except Exception as err:
+        logger.warning(f"Annotation cache '{cache_path}' could not be read: {err}")
+        return None
+    if not isinstance(annotations, list):
+        logger.warning(f"Annotation cache '{cache_path}' is invalid.")
+        return None
+    return annotations
+
+
+def _parse_charge(value: Any) -> int:
+    """Parse charge, e.g. from '-1', '1.0' or 1.0.
+
+    :raises ValueError: if the charge is not an integer
+    """
+    try:
+        charge = float(value)
+    except (TypeError, ValueError):
+        charge = float("nan")
+    if not charge.is_integer():
+        raise ValueError(f"Charge must be an integer: '{value}'")
+    return int(charge)
+
+
+def _file_hash(path: Path) -> str:
+    """Get sha256 hash of file content."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024**2), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _strip_comment(row: Iterable[Any]) -> List[Optional[str]]:
+    """Remove comment from row, i.e. the remainder of the row after '#'.
+
+    Empty cells are None. Numbers are strings, integral floats are written
+    as integers (e.g. charges from xlsx, `1.0` -> `'1'`).
+    """
+    values: List[Optional[str]] = []
+    for value in row:
+        if isinstance(value, float) and value.is_integer():
+            value = str(int(value))
+        elif value is not None and not isinstance(value, str):
+            value = str(value)
+        if value is not None and "#" in value:
+            value = value[: value.index("#")]
+            values.append(value if value else None)
+            break
+        values.append(value if value else None)
+    return values
+
+
+def _iter_annotation_rows(file_path: Path, file_format: str) -> Iterator[Dict]:
+    """Iterate over the rows of annotation file as dictionaries."""
+    rows: Iterable[Iterable[Any]]
+    if file_format in ("csv", "tsv"):
+        f = open(file_path, "r", newline="", encoding="utf-8")
+        rows = csv.reader(f, delimiter="\t" if file_format == "tsv" else ",")
+    elif file_format == "xlsx":
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+    elif file_format == "json":
+        with open(file_path, "r") as f_json:
+            data = json.load(f_json)
+        if isinstance(data, dict):
+            data = pd.DataFrame(data).to_dict("records")
+        for entry in data:
+            if any(value is not None and value != "" for value in entry.values()):
+                yield entry
+        return
+
+    try:
+        header: Optional[List[Optional[str]]] = None
+        for row in rows:
+            values = _strip_comment(row)
+            if not any(values):
+                continue
+            if header is None:
+                header = values
+                continue
+            values.extend([None] * (len(header) - len(values)))
+            yield dict(zip(header, values))
+    finally:
+        if file_format == "xlsx":
+            workbook.close()
+        else:
+            f.close()
@@ -0,0 +1,183 @@
+"""Cache of normalized annotations.
+
+Annotations are normalized via the pymetadata `Annotation`, i.e. the resource is
+split in collection and term and validated against the identifiers.org
+registry. The same resources (e.g. SBO terms) are annotated on many elements,
+so the normalized annotations are memoized keyed by (qualifier, resource).
+
+The memo is shared by the factory and the `ModelAnnotator`. The returned
+annotations are shared between all callers and must not be modified.
+
+The cache can be persisted between runs via `enable_annotation_cache`. Only
+annotations which normalized without warnings (valid identifiers.org terms
+and URLs) are persisted, all other annotations are normalized (and logged)
+again in every run.
+"""
+import atexit
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from pymetadata.core.annotation import RDFAnnotation as Annotation
+from pymetadata.identifiers.miriam import BQB, BQM
+from pymetadata.identifiers.registry import REGISTRY
+
+from sbmlutils import __version__
+from sbmlutils.log import get_logger
+
+
+logger = get_logger(__name__)
+
+ANNOTATION_CACHE_PATH: Path = Path.home() / ".cache" / "sbmlutils" / "annotations.json"
+
+AnnotationKey = Tuple[Union[BQB, BQM], str]
+
+
+class AnnotationCache:
+    """Memo of normalized annotations keyed by (qualifier, resource)."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        """Initialize cache with optional path for persistence."""
+        self.path: Optional[Path] = path
+        self.hits = 0
+        self.misses = 0
+        self._annotations: Dict[AnnotationKey, Annotation] = {}
+        self._persistent: Dict[AnnotationKey, bool] = {}
+        self._lock = threading.Lock()
+
+    def annotation(self, qualifier: Union[BQB, BQM], resource: str) -> Annotation:
+        """Get normalized annotation for qualifier and resource.
+
+        :raises ValueError: if qualifier or resource are invalid
+        """
+        key = (qualifier, resource)
+        annotation = self._annotations.get(key, None)
+        if annotation is not None:
+            self.hits += 1
+            return annotation
+
+        annotation = Annotation(qualifier=qualifier, resource=resource)
+        self.misses += 1
+        with self._lock:
+            self._annotations[key] = annotation
+            self._persistent[key] = _is_persistent(annotation)
+        return annotation
+
+    def load(self) -> None:
+        """Load persisted annotations from path."""
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r") as f_json:
+                data = json.load(f_json)
+            if data.get("version") != __version__:
+                logger.debug(f"Annotation cache of other version ignored: {self.path}")
+                return
+            annotations = {}
+            for qualifier_str, resource, collection, term in data["annotations"]:
+                qualifier = _QUALIFIERS[qualifier_str]
+                annotation = Annotation.__new__(Annotation)
+                annotation.qualifier = qualifier
+                annotation.resource = resource
+                annotation.collection = collection
+                annotation.term = term
+                annotations[(qualifier, resource)] = annotation
+        except (ValueError, KeyError, TypeError) as err:
+            logger.warning(f"Annotation cache could not be loaded: {self.path}: {err}")
+            return
+
+        with self._lock:
+            for key, annotation in annotations.items():
+                self._annotations.setdefault(key, annotation)
+                self._persistent.setdefault(key, True)
+
+    def save(self) -> None:
+        """Save annotations to path."""
+        if self.path is None:
+            return
+        with self._lock:
+            annotations = [
+                [a.qualifier.value, a.resource, a.collection, a.term]
+                for key, a in self._annotations.items()
+                if self._persistent[key]
+            ]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w") as f_json:
+            json.dump({"version": __version__, "annotations": annotations}, f_json)
+
+    def clear(self) -> None:
+        """Remove all annotations from cache."""
+        with self._lock:
+            self._annotations.clear()
+            self._persistent.clear()
+
+    def __len__(self) -> int:
+        """Get number of cached annotations."""
+        return len(self._annotations)
+
+
+_QUALIFIERS: Dict[str, Union[BQB, BQM]] = {
+    **{q.value: q for q in BQB},
+    **{q.value: q for q in BQM},
+}
+
+
+def _is_persistent(annotation: Annotation) -> bool:
+    """Check if annotation normalized without warnings and can be persisted."""
+    if annotation.resource.startswith("urn:miriam:"):
+        return False
+    if annotation.collection is None:
+        return annotation.resource.startswith("http")
+    namespace = REGISTRY.ns_dict.get(annotation.collection, None)
+    if namespace is None or annotation.term is None:
+        return False
+    return re.match(namespace.pattern, annotation.term) is not None
+
+
+_annotation_cache: AnnotationCache = AnnotationCache()
+
+
+def get_annotation_cache() -> AnnotationCache:
+    """Get the shared annotation cache."""
+    return _annotation_cache
+
+
+def normalize_annotation(qualifier: Union[BQB, BQM], resource: str) -> Annotation:
+    """Get normalized annotation from the shared annotation cache.
+
+    :param qualifier: BQB or BQM qualifier
+    :param resource: resource of annotation
+    :return: shared annotation, must not be modified
+    """
+    return _annotation_cache.annotation(qualifier, resource)
+
+
+def enable_annotation_cache(path: Path = ANNOTATION_CACHE_PATH) -> AnnotationCache:
+    """Persist the shared annotation cache to disk.
+
+    Loads the annotations from `path`, the annotations are saved to `path`
+    on `disable_annotation_cache` or at exit.
+
+    :param path: path of the cache file
+    :return: the annotation cache
+    """
+    disable_annotation_cache()
+    _annotation_cache.path = Path(path)
+    _annotation_cache.load()
+    atexit.register(_annotation_cache.save)
+    return _annotation_cache
+
+
+def disable_annotation_cache(save: bool = True) -> None:
+    """Stop persisting the shared annotation cache.
+
+    :param save: save annotations before disabling
+    """
+    if _annotation_cache.path is None:
+        return
+    atexit.unregister(_annotation_cache.save)
+    if save:
+        _annotation_cache.save()
+    _annotation_cache.path = None
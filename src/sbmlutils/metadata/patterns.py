@@ -0,0 +1,166 @@
+"""Matching of SId patterns of external annotations.
+
+Patterns are regular expressions which are matched via `re.match` against the
+SIds, i.e. the patterns are anchored at the start of the ids.
+
+The `PatternMatcher` compiles every pattern once and uses the literal part of
+the patterns to avoid matching the regular expression against all ids:
+
+- exact patterns (literal ending with `$`) are looked up in a hash index
+- literal patterns (i.e. prefixes) are looked up in a sorted index of the ids
+- patterns starting with a literal prefix are only matched against the ids
+  with the prefix from the sorted index
+- all other patterns are matched against all ids
+"""
+import bisect
+import re
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Iterable, List, Pattern, Tuple
+
+from sbmlutils.log import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class PatternType(str, Enum):
+    """Type of SId pattern."""
+
+    EXACT = "exact"
+    LITERAL = "literal"
+    PREFIX = "prefix"
+    REGEX = "regex"
+
+
+@dataclass
+class PatternStatistics:
+    """Statistics of the matching of a pattern."""
+
+    pattern: str
+    pattern_type: PatternType
+    prefix: str
+    calls: int = 0
+    candidates: int = 0
+    matches: int = 0
+    time: float = 0.0
+
+
+# characters with special meaning in regular expressions
+_METACHARACTERS = frozenset(".^$*+?{}[]\\|()")
+# quantifiers which make the preceding character optional
+_OPTIONAL = frozenset("*?{")
+
+
+def analyze_pattern(pattern: str) -> Tuple[PatternType, str]:
+    """Get type and literal prefix of pattern.
+
+    :param pattern: regular expression matched at the start of the ids
+    :return: tuple of pattern type and literal prefix
+    """
+    body = pattern[1:] if pattern.startswith("^") else pattern
+    if "|" in body:
+        return PatternType.REGEX, ""
+
+    prefix: List[str] = []
+    k = 0
+    while k < len(body):
+        c = body[k]
+        if c == "\\":
+            # escaped metacharacters are literal, other escapes are classes
+            if k + 1 < len(body) and body[k + 1] in _METACHARACTERS:
+                c = body[k + 1]
+                step = 2
+            else:
+                break
+        elif c in _METACHARACTERS:
+            break
+        else:
+            step = 1
+        if k + step < len(body) and body[k + step] in _OPTIONAL:
+            break
+        prefix.append(c)
+        k += step
+
+    literal = "".join(prefix)
+    rest = body[k:]
+    if not rest:
+        return PatternType.LITERAL, literal
+    elif rest == "$":
+        return PatternType.EXACT, literal
+    elif literal:
+        return PatternType.PREFIX, literal
+    return PatternType.REGEX, ""
+
+
+class PatternMatcher:
+    """Matching of SId patterns against a fixed collection of ids.
+
+    Matches are returned in the order of the ids and are cached per pattern.
+    """
+
+    def __init__(self, ids: Iterable[str]) -> None:
+        """Initialize matcher with the ids."""
+        self.ids: List[str] = list(dict.fromkeys(ids))
+        self._positions: Dict[str, int] = {sid: k for k, sid in enumerate(self.ids)}
+        self._sorted_ids: List[str] = sorted(self.ids)
+        self._compiled: Dict[str, Tuple[PatternType, str, Pattern]] = {}
+        self._matches: Dict[str, List[str]] = {}
+        self.statistics: Dict[str, PatternStatistics] = {}
+
+    def match(self, pattern: str) -> List[str]:
+        """Get ids matching the pattern.
+
+        :param pattern: regular expression matched at the start of the ids
+        :return: matching ids
+        """
+        start = time.perf_counter()
+        stats = self.statistics.get(pattern, None)
+        if stats is None:
+            pattern_type, prefix = analyze_pattern(pattern)
+            self._compiled[pattern] = (pattern_type, prefix, re.compile(pattern))
+            stats = PatternStatistics(
+                pattern=pattern, pattern_type=pattern_type, prefix=prefix
+            )
+            self.statistics[pattern] = stats
+
+        matches = self._matches.get(pattern, None)
+        if matches is None:
+            matches = self._match(pattern, stats)
+            self._matches[pattern] = matches
+
+        stats.calls += 1
+        stats.time += time.perf_counter() - start
+        return list(matches)
+
+    def _match(self, pattern: str, stats: PatternStatistics) -> List[str]:
+        """Match pattern via the indices."""
+        pattern_type, prefix, regex = self._compiled[pattern]
+        if pattern_type == PatternType.EXACT:
+            matches = [prefix] if prefix in self._positions else []
+            stats.candidates = len(matches)
+        elif pattern_type == PatternType.REGEX:
+            stats.candidates = len(self.ids)
+            matches = [sid for sid in self.ids if regex.match(sid)]
+        else:
+            candidates = self._with_prefix(prefix)
+            stats.candidates = len(candidates)
+            if pattern_type == PatternType.LITERAL:
+                matches = candidates
+            else:
+                matches = [sid for sid in candidates if regex.match(sid)]
+            matches.sort(key=self._positions.__getitem__)
+
+        stats.matches = len(matches)
+        return matches
+
+    def _with_prefix(self, prefix: str) -> List[str]:
+        """Get ids starting with prefix via the sorted ids."""
+        ids = self._sorted_ids
+        k = bisect.bisect_left(ids, prefix)
+        candidates = []
+        while k < len(ids) and ids[k].startswith(prefix):
+            candidates.append(ids[k])
+            k += 1
+        return candidates
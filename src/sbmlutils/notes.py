@@ -4,6 +4,7 @@ Notes can be either written in markdown or HTML.
 Markdown -> HTML conversion is performed using `markdown-it-py` for the conversion.
 No styles for the display are inserted here.
 """
+import functools
 import textwrap
 from enum import Enum
 
@@ -24,34 +25,50 @@ class NotesFormat(str, Enum):
     HTML = "html"
 
 
+# shared parser, creating the MarkdownIt instance is expensive
+_markdown_it = MarkdownIt()
+
+
+@functools.lru_cache(maxsize=1024)
+def _notes_xml(text: str, format: NotesFormat) -> libsbml.XMLNode:
+    """Convert notes text to XMLNode.
+
+    The conversion is cached, because many elements share identical notes.
+    The returned XMLNode must not be modified, use a clone instead.
+    """
+    # markdown to html
+    if format == NotesFormat.MARKDOWN:
+        html = _markdown_it.render(text)
+    elif format == NotesFormat.HTML:
+        html = text
+    else:
+        raise ValueError(f"Invalid Notes format: '{format}'")
+
+    # insert body text with namespace
+    notes_str = f'<body xmlns="http://www.w3.org/1999/xhtml">\n{html}\n</body>'
+
+    xml: libsbml.XMLNode = libsbml.XMLNode.convertStringToXMLNode(notes_str)
+    if xml is None:
+        logger.error(
+            f"XMLNode could not be generated. Most likely syntax error in \n"
+            f"'{notes_str}'."
+        )
+        raise ValueError(f"XMLNode could not be generated for:\n{notes_str}")
+    return xml
+
+
 class Notes:
     """SBML notes."""
 
     def __init__(self, notes: str, format: NotesFormat = NotesFormat.MARKDOWN):
         """Initialize notes object."""
-
-        # remove indentation
-        md = textwrap.dedent(notes)
-
-        # markdown to html
         if format == NotesFormat.MARKDOWN:
-            mdit = MarkdownIt()
-            html = mdit.render(md)
-        elif format == NotesFormat.HTML:
-            html = notes
+            # remove indentation
+            text = textwrap.dedent(notes)
         else:
-            raise ValueError(f"Invalid Notes format: '{format}'")
-
-        # insert body text with namespace
-        notes_str = f'<body xmlns="http://www.w3.org/1999/xhtml">\n{html}\n</body>'
-
-        self.xml: libsbml.XMLNode = libsbml.XMLNode.convertStringToXMLNode(notes_str)
-        if self.xml is None:
-            logger.error(
-                f"XMLNode could not be generated. Most likely syntax error in \n"
-                f"'{notes_str}'."
-            )
-            raise ValueError(f"XMLNode could not be generated for:\n{notes_str}")
+            text = notes
+
+        self.xml: libsbml.XMLNode = _notes_xml(text, NotesFormat(format)).clone()
 
     def __str__(self) -> str:
         """Get string representation."""
@@ -4,8 +4,22 @@ FIXME: no support for notes
 FIXME: no support for modelHistory
 
 """
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import antimony
 import libsbml
@@ -14,9 +28,11 @@ from pymetadata.omex import ManifestEntry, Omex
 from sbmlutils import RESOURCES_DIR
 from sbmlutils.console import console
 from sbmlutils.factory import *
+from sbmlutils.factory import Sbase
 from sbmlutils.io.sbml import read_sbml, validate_sbml
 from sbmlutils.log import get_logger
 from sbmlutils.metadata import BQB, BQM
+from sbmlutils.metadata.miriam import BiologicalQualifierType, ModelQualifierType
 from sbmlutils.reaction_equation import EquationPart
 from sbmlutils.report.sbmlinfo import SBMLDocumentInfo
 from sbmlutils.validation import ValidationOptions
@@ -29,6 +45,20 @@ def antimony_to_sbml(
     source: Union[Path, str],
 ) -> str:
     """Parse antimony model to SBML string."""
+    sbml_str, error = _load_antimony(source)
+
+    # log errors
+    if error is not None:
+        logger.error(error)
+
+    return sbml_str
+
+
+def _load_antimony(source: Union[Path, str]) -> Tuple[str, Optional[str]]:
+    """Load antimony model in the global antimony state.
+
+    :return: SBML string of the main module and error message or None
+    """
     status: int
     if isinstance(source, str) and "model" in source:
         status = antimony.loadAntimonyString(source)
@@ -42,15 +72,14 @@ def antimony_to_sbml(
 
         status = antimony.loadAntimonyFile(str(source))
 
-    # log errors
-    if status != -1:
-        logger.error(f"Antimony status: {status}")
-        logger.error(antimony.getLastError())
-        # antimony.getSBMLWarnings()
+    # loading returns the index of the loaded module or -1 on failure
+    error: Optional[str] = None
+    if status == -1:
+        error = f"Antimony status: {status}\n{antimony.getLastError()}"
 
     sbml_str: str = antimony.getSBMLString()
 
-    return sbml_str
+    return sbml_str, error
 
 
 def antimony_to_model(
@@ -72,6 +101,133 @@ def antimony_to_model(
     )
 
 
+@dataclass
+class AntimonyConversion:
+    """Result of the conversion of an antimony source."""
+
+    source: Union[Path, str]
+    sbml: Optional[str] = None
+    sbml_path: Optional[Path] = None
+    model: Optional[Model] = None
+    error: Optional[str] = None
+    time: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        """Check if conversion was successful."""
+        return self.error is None
+
+
+def antimony_to_sbml_batch(
+    sources: Iterable[Union[Path, str]],
+    output_dir: Optional[Path] = None,
+    workers: Optional[int] = None,
+    to_model: bool = False,
+    validate: bool = False,
+    promote: bool = False,
+    validation_options: Optional[ValidationOptions] = None,
+) -> List[AntimonyConversion]:
+    """Convert many antimony sources to SBML in parallel.
+
+    The antimony library has global state, so every conversion runs in a
+    worker process of a process pool. Errors are reported per source in the
+    results and do not stop the other conversions.
+
+    If an `output_dir` is provided the SBML is written to files
+    (`<stem>.xml` for antimony paths, `antimony_<index>.xml` for antimony
+    strings) instead of being returned as string. With `to_model` the SBML is
+    parsed with `sbml_to_model` in the worker process.
+
+    :param sources: antimony paths or strings
+    :param output_dir: optional directory for the SBML files
+    :param workers: number of worker processes, defaults to the number of CPUs
+    :param to_model: parse the SBML to factory models
+    :param validate: validate SBML when parsing to factory model
+    :param promote: promote local parameters when parsing to factory model
+    :param validation_options: options for validation
+    :return: conversion results in the order of the sources
+    """
+    sources = list(sources)
+    sbml_paths: List[Optional[Path]] = [None] * len(sources)
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for k, source in enumerate(sources):
+            if isinstance(source, str) and "model" in source:
+                sbml_paths[k] = output_dir / f"antimony_{k}.xml"
+            else:
+                sbml_paths[k] = output_dir / f"{Path(source).stem}.xml"
+        filenames = [p.name for p in sbml_paths]  # type: ignore
+        duplicates = {name for name in filenames if filenames.count(name) > 1}
+        if duplicates:
+            raise ValueError(f"Duplicate SBML output files: {sorted(duplicates)}")
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    results: List[AntimonyConversion] = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                _convert_antimony,
+                source,
+                sbml_paths[k],
+                to_model,
+                validate,
+                promote,
+                validation_options,
+            )
+            for k, source in enumerate(sources)
+        ]
+        for source, future in zip(sources, futures):
+            try:
+                result = future.result()
+            except Exception as err:
+                # worker process failed, e.g. crash in antimony
+                result = AntimonyConversion(source=source, error=repr(err))
+            if result.error:
+                logger.error(f"Antimony conversion failed: {result.error}")
+            results.append(result)
+
+    return results
+
+
+def _convert_antimony(
+    source: Union[Path, str],
+    sbml_path: Optional[Path],
+    to_model: bool,
+    validate: bool,
+    promote: bool,
+    validation_options: Optional[ValidationOptions],
+) -> AntimonyConversion:
+    """Convert single antimony source in worker process."""
+    start = time.perf_counter()
+    result = AntimonyConversion(source=source)
+    try:
+        # clear the modules of the previous conversions in the worker
+        antimony.clearPreviousLoads()
+        sbml_str, result.error = _load_antimony(source)
+        if result.error is None:
+            if sbml_path is not None:
+                with open(sbml_path, "w") as f_sbml:
+                    f_sbml.write(sbml_str)
+                result.sbml_path = sbml_path
+            else:
+                result.sbml = sbml_str
+
+            if to_model:
+                result.model = sbml_to_model(
+                    source=sbml_str,
+                    validate=validate,
+                    promote=promote,
+                    validation_options=validation_options,
+                )
+    except Exception as err:
+        result.error = repr(err)
+
+    result.time = time.perf_counter() - start
+    return result
+
+
 # TODO: validation & validation options
 
 
@@ -89,206 +245,56 @@ def sbml_to_model(
         validation_options=validation_options,
     )
     model: libsbml.Model = doc.getModel()
-
-    def parse_sbase_kwargs(sbase: libsbml.SBase) -> Dict[str, Any]:
-        """Parse SBase information in dictionary."""
-        d = SBMLDocumentInfo.sbase_dict(sbase)
-        kwargs = {
-            "sid": d["id"],
-            "name": d["name"],
-            "metaId": d["metaId"],
-            "sboTerm": d["sbo"],
-            "annotations": [],
-        }
-
-        # annotations
-        if d["cvterms"]:
-            for cvterm in d["cvterms"]:
-                qualifier_str = cvterm["qualifier"]
-                qualifier: Union[BQB, BQM]
-                if qualifier_str.startswith("BQB_"):
-                    qualifier = BQB.__getitem__(qualifier_str[4:])
-                elif qualifier_str.startswith("BQM_"):
-                    qualifier = BQM.__getitem__(qualifier_str[4:])
-
-                for resource in cvterm["resources"]:
-                    kwargs["annotations"].append((qualifier, resource))
-
-        # model history
-        # FIXME: currently not supported consistently, see
-        # https: // github.com / matthiaskoenig / sbmlutils / issues / 416
-
-        # notes
-        # FIXME: support merging of notes, see
-
-        # keyValuePairs
-        sbase_fbc: libsbml.FbcSBasePlugin = sbase.getPlugin("fbc")
-        kvps: List[KeyValuePair] = []
-        if sbase_fbc:
-            kvp: libsbml.KeyValuePair
-            for kvp in sbase_fbc.getListOfKeyValuePairs():
-                kvps.append(
-                    KeyValuePair(
-                        key=kvp.getKey(),
-                        value=kvp.getValue(),
-                        uri=kvp.getUri() if kvp.isSetUri() else None,
-                        **parse_sbase_kwargs(kvp),
-                    )
-                )
-
-        kwargs["keyValuePairs"] = kvps
-        # if d["notes"]:
-        #     kwargs["notes"] = d["notes"]  # This is an XML string.
-
-        return kwargs
-
     if not model:
         logger.error("No model in SBMLDocument.")
 
-    m = Model(**parse_sbase_kwargs(model))
+    m = Model(**_sbase_kwargs(model))
     # FIXME: parse packages
     m.packages = [Package.FBC_V3]
 
-    p: libsbml.Parameter
-    for p in model.getListOfParameters():
-        d = parse_sbase_kwargs(p)
-        # print(d)
-        m.parameters.append(
-            Parameter(
-                value=p.getValue() if p.isSetValue else None,
-                # unit=p.getUnits(),
-                constant=p.getConstant() if p.isSetConstant() else None,
-                **d,
-            )
-        )
-
-    c: libsbml.Compartment
-    for c in model.getListOfCompartments():
-        m.compartments.append(
-            Compartment(
-                value=c.getSize() if c.isSetSize() else NaN,
-                constant=c.getConstant() if c.isSetConstant() else True,
-                spatialDimensions=c.getSpatialDimensions()
-                if c.isSetSpatialDimensions()
-                else None,
-                # unit=p.getUnits(),
-                **parse_sbase_kwargs(c),
-            )
-        )
+    for key, elements in iter_model_elements(model):
+        getattr(m, key).extend(elements)
 
-    s: libsbml.Species
-    for s in model.getListOfSpecies():
-        m.species.append(
-            Species(
-                compartment=s.getCompartment() if s.isSetCompartment() else None,
-                initialAmount=s.getInitialAmount() if s.isSetInitialAmount() else None,
-                initialConcentration=s.getInitialConcentration()
-                if s.isSetInitialConcentration()
-                else None,
-                constant=s.getConstant() if s.isSetConstant() else None,
-                hasOnlySubstanceUnits=s.getHasOnlySubstanceUnits()
-                if s.isSetHasOnlySubstanceUnits()
-                else None,
-                boundaryCondition=s.getBoundaryCondition()
-                if s.isSetBoundaryCondition()
-                else None,
-                # unit=p.getUnits(),
-                **parse_sbase_kwargs(s),
-            )
-        )
-
-    # reactions
-    r: libsbml.Reaction
-    ast: Optional[libsbml.ASTNode]
-    formula: Optional[str]
-
-    for r in model.getListOfReactions():
-        # FIXME: better equation support.
-        equation = ReactionEquation(
-            reversible=r.getReversible() if r.isSetReversible() else None
-        )
-        reactant: libsbml.SpeciesReference
-        for reactant in r.getListOfReactants():
-            equation.reactants.append(
-                EquationPart(
-                    species=reactant.getSpecies() if reactant.isSetSpecies() else None,
-                    stoichiometry=reactant.getStoichiometry()
-                    if reactant.isSetStoichiometry()
-                    else None,
-                    constant=reactant.getConstant()
-                    if reactant.isSetConstant()
-                    else True,
-                    **parse_sbase_kwargs(reactant),
-                )
-            )
-            product: libsbml.SpeciesReference
-        for product in r.getListOfProducts():
-            equation.products.append(
-                EquationPart(
-                    species=product.getSpecies() if product.isSetSpecies() else None,
-                    stoichiometry=product.getStoichiometry()
-                    if product.isSetStoichiometry()
-                    else None,
-                    constant=product.getConstant() if product.isSetConstant() else True,
-                    **parse_sbase_kwargs(product),
-                )
-            )
-        modifier: libsbml.SpeciesReference
-        for modifier in r.getListOfModifiers():
-            if modifier.isSetSpecies():
-                equation.modifiers.append(modifier.getSpecies())
-
-        # formula
-        if r.isSetKineticLaw():
-            klaw: libsbml.KineticLaw = r.getKineticLaw()
-            ast = klaw.getMath() if klaw.isSetMath() else None
-        formula = libsbml.formulaToL3String(ast) if ast else None
-
-        m.reactions.append(
-            Reaction(equation=equation, formula=formula, **parse_sbase_kwargs(r))
-        )
+    return m
 
-    # initial assignment
-    ia: libsbml.InitialAssignment
-    for ia in model.getListOfInitialAssignments():
-        ast = ia.getMath() if ia.isSetMath() else None
-        formula = libsbml.formulaToL3String(ast) if ast else None
-        if formula:
-            m.assignments.append(
-                InitialAssignment(
-                    symbol=ia.getSymbol() if ia.isSetSymbol() else None,
-                    value=formula,
-                    **parse_sbase_kwargs(ia),
-                )
-            )
 
-    # rules
-    rule: libsbml.Rule
-    for rule in model.getListOfRules():
-        ast = rule.getMath() if rule.isSetMath() else None
-        formula = libsbml.formulaToL3String(ast) if ast else None
-        typecode: int = rule.getTypeCode()
-        if formula:
-            if typecode == libsbml.SBML_ASSIGNMENT_RULE:
-                m.rules.append(
-                    AssignmentRule(
-                        variable=rule.getVariable() if rule.isSetVariable() else None,
-                        value=formula,
-                        **parse_sbase_kwargs(rule),
-                    )
-                )
-            elif typecode == libsbml.SBML_RATE_RULE:
-                m.rate_rules.append(
-                    RateRule(
-                        variable=rule.getVariable() if rule.isSetVariable() else None,
-                        value=formula,
-                        **parse_sbase_kwargs(rule),
-                    )
-                )
-            elif typecode == libsbml.SBML_ALGEBRAIC_RULE:
-                m.algebraic_rules.append(
-                    AlgebraicRule(value=formula, **parse_sbase_kwargs(rule))
-                )
+def iter_model_elements(
+    model: libsbml.Model, chunk_size: int = 1000
+) -> Iterator[Tuple[str, List[Sbase]]]:
+    """Convert the elements of the SBML model to factory objects in chunks.
+
+    Yields tuples of the `factory.Model` attribute (e.g. 'species') and a chunk
+    of at most `chunk_size` factory objects of the attribute. This allows
+    streaming conversion of large models, the elements are converted on demand.
+
+    :param model: SBML model
+    :param chunk_size: maximum number of factory objects per chunk
+    :return: iterator of (Model attribute, factory objects)
+    """
+    sources: List[Tuple[libsbml.ListOf, Callable]] = [
+        (model.getListOfParameters(), _parameter),
+        (model.getListOfCompartments(), _compartment),
+        (model.getListOfSpecies(), _species),
+        (model.getListOfReactions(), _reaction),
+        (model.getListOfInitialAssignments(), _initial_assignment),
+        (model.getListOfRules(), _rule),
+    ]
+    for sbases, convert in sources:
+        chunks: Dict[str, List[Sbase]] = {}
+        for sbase in sbases:
+            converted: Optional[Tuple[str, Sbase]] = convert(sbase)
+            if converted is None:
+                continue
+            key, obj = converted
+            chunk = chunks.setdefault(key, [])
+            chunk.append(obj)
+            if len(chunk) >= chunk_size:
+                yield key, chunk
+                chunks[key] = []
+
+        for key, chunk in chunks.items():
+            if chunk:
+                yield key, chunk
 
     # events
     # constraints
@@ -300,7 +306,206 @@ def sbml_to_model(
     # groups
     # distrib
 
-    return m
+
+# lookup of qualifier for (qualifier type, qualifier) of CVTerms
+_QUALIFIERS: Dict[Tuple[int, int], Union[BQB, BQM]] = {
+    **{
+        (libsbml.BIOLOGICAL_QUALIFIER, key): BQB[value[4:]]
+        for key, value in BiologicalQualifierType.items()
+    },
+    **{
+        (libsbml.MODEL_QUALIFIER, key): BQM[value[4:]]
+        for key, value in ModelQualifierType.items()
+    },
+}
+
+
+def _sbase_kwargs(sbase: libsbml.SBase) -> Dict[str, Any]:
+    """Parse SBase information required by the factory.
+
+    Only the id, name, metaId, SBO term, CVTerms and key value pairs are read.
+    """
+    sbo = sbase.getSBOTermID() if sbase.isSetSBOTerm() else None
+    kwargs = {
+        "sid": sbase.getId() if sbase.isSetId() else None,
+        "name": sbase.getName() if sbase.isSetName() else None,
+        "metaId": sbase.getMetaId() if sbase.isSetMetaId() else None,
+        "sboTerm": sbo,
+        "annotations": _annotations(sbase, sbo) if sbase.isSetAnnotation() else [],
+    }
+
+    # model history
+    # FIXME: currently not supported consistently, see
+    # https: // github.com / matthiaskoenig / sbmlutils / issues / 416
+
+    # notes
+    # FIXME: support merging of notes, see
+
+    # keyValuePairs
+    sbase_fbc: libsbml.FbcSBasePlugin = sbase.getPlugin("fbc")
+    kvps: List[KeyValuePair] = []
+    if sbase_fbc:
+        kvp: libsbml.KeyValuePair
+        for kvp in sbase_fbc.getListOfKeyValuePairs():
+            kvps.append(
+                KeyValuePair(
+                    key=kvp.getKey(),
+                    value=kvp.getValue(),
+                    uri=kvp.getUri() if kvp.isSetUri() else None,
+                    **_sbase_kwargs(kvp),
+                )
+            )
+
+    kwargs["keyValuePairs"] = kvps
+
+    return kwargs
+
+
+def _annotations(
+    sbase: libsbml.SBase, sbo: Optional[str]
+) -> List[Tuple[Union[BQB, BQM], str]]:
+    """Parse annotations from CVTerms.
+
+    The SBO term is added as annotation if not part of the CVTerms.
+    """
+    annotations: List[Tuple[Union[BQB, BQM], str]] = []
+    for kcv in range(sbase.getNumCVTerms()):
+        cv: libsbml.CVTerm = sbase.getCVTerm(kcv)
+        q_type = cv.getQualifierType()
+        if q_type == libsbml.MODEL_QUALIFIER:
+            qualifier = _QUALIFIERS[(q_type, cv.getModelQualifierType())]
+        elif q_type == libsbml.BIOLOGICAL_QUALIFIER:
+            qualifier = _QUALIFIERS[(q_type, cv.getBiologicalQualifierType())]
+        else:
+            raise ValueError(f"Unsupported qualifier type: '{q_type}'")
+
+        for k in range(cv.getNumResources()):
+            annotations.append((qualifier, cv.getResourceURI(k)))
+
+    if sbo and not any(sbo in resource for _, resource in annotations):
+        annotations.insert(0, (BQB.IS, f"https://identifiers.org/{sbo}"))
+
+    return annotations
+
+
+def _formula(sbase: libsbml.SBase) -> Optional[str]:
+    """Get formula of math."""
+    ast: Optional[libsbml.ASTNode] = sbase.getMath() if sbase.isSetMath() else None
+    return libsbml.formulaToL3String(ast) if ast else None
+
+
+def _parameter(p: libsbml.Parameter) -> Tuple[str, Parameter]:
+    """Convert parameter."""
+    return "parameters", Parameter(
+        value=p.getValue() if p.isSetValue() else None,
+        # unit=p.getUnits(),
+        constant=p.getConstant() if p.isSetConstant() else None,
+        **_sbase_kwargs(p),
+    )
+
+
+def _compartment(c: libsbml.Compartment) -> Tuple[str, Compartment]:
+    """Convert compartment."""
+    return "compartments", Compartment(
+        value=c.getSize() if c.isSetSize() else NaN,
+        constant=c.getConstant() if c.isSetConstant() else True,
+        spatialDimensions=c.getSpatialDimensions()
+        if c.isSetSpatialDimensions()
+        else None,
+        # unit=p.getUnits(),
+        **_sbase_kwargs(c),
+    )
+
+
+def _species(s: libsbml.Species) -> Tuple[str, Species]:
+    """Convert species."""
+    return "species", Species(
+        compartment=s.getCompartment() if s.isSetCompartment() else None,
+        initialAmount=s.getInitialAmount() if s.isSetInitialAmount() else None,
+        initialConcentration=s.getInitialConcentration()
+        if s.isSetInitialConcentration()
+        else None,
+        constant=s.getConstant() if s.isSetConstant() else None,
+        hasOnlySubstanceUnits=s.getHasOnlySubstanceUnits()
+        if s.isSetHasOnlySubstanceUnits()
+        else None,
+        boundaryCondition=s.getBoundaryCondition()
+        if s.isSetBoundaryCondition()
+        else None,
+        # unit=p.getUnits(),
+        **_sbase_kwargs(s),
+    )
+
+
+def _equation_part(sref: libsbml.SpeciesReference) -> EquationPart:
+    """Convert species reference."""
+    return EquationPart(
+        species=sref.getSpecies() if sref.isSetSpecies() else None,
+        stoichiometry=sref.getStoichiometry() if sref.isSetStoichiometry() else None,
+        constant=sref.getConstant() if sref.isSetConstant() else True,
+        **_sbase_kwargs(sref),
+    )
+
+
+def _reaction(r: libsbml.Reaction) -> Tuple[str, Reaction]:
+    """Convert reaction."""
+    # FIXME: better equation support.
+    equation = ReactionEquation(
+        reversible=r.getReversible() if r.isSetReversible() else None
+    )
+    reactant: libsbml.SpeciesReference
+    for reactant in r.getListOfReactants():
+        equation.reactants.append(_equation_part(reactant))
+    product: libsbml.SpeciesReference
+    for product in r.getListOfProducts():
+        equation.products.append(_equation_part(product))
+    modifier: libsbml.ModifierSpeciesReference
+    for modifier in r.getListOfModifiers():
+        if modifier.isSetSpecies():
+            equation.modifiers.append(modifier.getSpecies())
+
+    # formula
+    formula = _formula(r.getKineticLaw()) if r.isSetKineticLaw() else None
+
+    return "reactions", Reaction(equation=equation, formula=formula, **_sbase_kwargs(r))
+
+
+def _initial_assignment(
+    ia: libsbml.InitialAssignment,
+) -> Optional[Tuple[str, InitialAssignment]]:
+    """Convert initial assignment."""
+    formula = _formula(ia)
+    if not formula:
+        return None
+    return "assignments", InitialAssignment(
+        symbol=ia.getSymbol() if ia.isSetSymbol() else None,
+        value=formula,
+        **_sbase_kwargs(ia),
+    )
+
+
+def _rule(rule: libsbml.Rule) -> Optional[Tuple[str, Sbase]]:
+    """Convert rule."""
+    formula = _formula(rule)
+    if not formula:
+        return None
+
+    typecode: int = rule.getTypeCode()
+    if typecode == libsbml.SBML_ASSIGNMENT_RULE:
+        return "rules", AssignmentRule(
+            variable=rule.getVariable() if rule.isSetVariable() else None,
+            value=formula,
+            **_sbase_kwargs(rule),
+        )
+    elif typecode == libsbml.SBML_RATE_RULE:
+        return "rate_rules", RateRule(
+            variable=rule.getVariable() if rule.isSetVariable() else None,
+            value=formula,
+            **_sbase_kwargs(rule),
+        )
+    elif typecode == libsbml.SBML_ALGEBRAIC_RULE:
+        return "algebraic_rules", AlgebraicRule(value=formula, **_sbase_kwargs(rule))
+    return None
 
 
 if __name__ == "__main__":
@@ -18,7 +18,7 @@ from pymetadata.core.annotation import RDFAnnotation, RDFAnnotationData
 from pymetadata.identifiers.miriam import BQB
 from pymetadata.omex import EntryFormat, Manifest, ManifestEntry, Omex
 
-from sbmlutils import log
+from sbmlutils import aio, log
 from sbmlutils.console import console
 from sbmlutils.report.api_examples import ExampleMetaData, examples_info
 from sbmlutils.report.sbmlinfo import SBMLDocumentInfo
@@ -118,7 +118,7 @@ async def report_from_file(request: Request) -> Dict[Any, Any]:
 
                 f.write(file_content)
 
-            return json_for_omex(path)
+            return await aio.run_in_executor(json_for_omex, path)
 
     except Exception as e:
         return _handle_error(e, info={})
@@ -156,7 +156,7 @@ async def get_report_from_content(request: Request) -> Dict[Any, Any]:
             with open(path, "w") as f:
                 f.write(file_content)
 
-            return json_for_omex(path)
+            return await aio.run_in_executor(json_for_omex, path)
 
     except Exception as e:
         return _handle_error(e, info={})
@@ -0,0 +1,81 @@
+/*
+Autogenerated ODE definition SBML file with sbmlutils (https://github.com/matthiaskoenig/sbmlutils.git).
+
+    model: {{ model.getId() }}
+
+The C code is loaded via the python module with the same name, or compiled
+into a shared library with the system C compiler, e.g.
+
+    cc -O2 -shared -fPIC -o model.so model.c -lm
+
+Arrays are double arrays: states x (NX), parameters p (NP), assigned
+variables y (NY), odes dx (NX) and Jacobian jac (NX * NX, row major).
+
+time: [{{units["time"]}}]
+substance: [{{units["substance"]}}]
+extent: [{{units["extent"]}}]
+volume: [{{units["volume"]}}]
+area: [{{units["area"]}}]
+length: [{{units["length"]}}]
+*/
+#include <math.h>
+
+#define NX {{ xids | length }}
+#define NP {{ pids | length }}
+#define NY {{ yids | length }}
+/* size of local arrays (at least 1) */
+#define NY_ARRAY {{ [yids | length, 1] | max }}
+
+const int nx = NX;
+const int np = NP;
+const int ny = NY;
+const int has_jac = {{ 0 if jac is none else 1 }};
+
+
+static void assignments(const double *x, double t, const double *p, double *y)
+{
+    (void)x; (void)t; (void)p; (void)y;
+    {% for id in yids %}
+    y[{{ loop.index0 }}] = {{ y[id] }};  // {{ id }} [{{y_units[id]}}] {{names[id]}}
+    {% endfor %}
+}
+
+
+void f_y(const double *x, double t, const double *p, double *y)
+{
+    assignments(x, t, p, y);
+}
+
+
+void f_dxdt(const double *x, double t, const double *p, double *dx)
+{
+    double y[NY_ARRAY];
+    assignments(x, t, p, y);
+
+    // ode
+    {% for id in xids %}
+    dx[{{ loop.index0 }}] = {{ dx[id] }};  // {{ id }} [{{x_units[id]}}] {{names[id]}}
+    {% endfor %}
+}
+
+
+void f_jac(const double *x, double t, const double *p, double *jac)
+{
+    double y[NY_ARRAY];
+    assignments(x, t, p, y);
+
+    for (int k = 0; k < NX * NX; k++) {
+        jac[k] = 0.0;
+    }
+{% if jac is not none %}
+
+    // derivatives of y
+    {% for id, formula in jac_y.items() %}
+    const double {{ id }} = {{ formula }};
+    {% endfor %}
+
+    {% for i, j, formula in jac %}
+    jac[{{ i * (xids | length) + j }}] = {{ formula }};  // d{{ xids[i] }}/d{{ xids[j] }}
+    {% endfor %}
+{% endif %}
+}
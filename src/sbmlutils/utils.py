@@ -1,9 +1,11 @@
 """Utility functions."""
 import functools
 import hashlib
+import itertools
 import time
 import warnings
-from typing import Any, Callable
+from collections.abc import MutableSequence
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
 
 import libsbml
 
@@ -29,6 +31,97 @@ class FrozenClass(object):
         self.__isfrozen = True
 
 
+class CopyOnWriteList(MutableSequence):
+    """List sharing the elements of the given lists until it is written to.
+
+    The given lists are stored as immutable snapshots (tuples), so later
+    changes of the given lists do not change this list. Reading (iteration,
+    length, truthiness) works on the snapshots. The first write materializes
+    a private list of the elements. The elements themselves are shared, not
+    copied.
+    """
+
+    __slots__ = ("_parts", "_data")
+
+    def __init__(self, parts: Optional[Iterable[Iterable[Any]]] = None):
+        """Construct CopyOnWriteList from snapshots of the given lists."""
+        self._parts: List[Tuple[Any, ...]] = []
+        self._data: Optional[List[Any]] = None
+        for values in parts or []:
+            self.share(values)
+
+    def share(self, values: Iterable[Any]) -> None:
+        """Append all values of a snapshot of the given list.
+
+        Snapshots of a CopyOnWriteList are shared without copying.
+        """
+        if self._data is not None:
+            self._data.extend(values)
+            return
+        if isinstance(values, CopyOnWriteList):
+            if values._data is None:
+                self._parts.extend(values._parts)
+                return
+            values = values._data
+        if values:
+            self._parts.append(tuple(values))
+
+    def _materialize(self) -> List[Any]:
+        """Get private list of the elements."""
+        if self._data is None:
+            self._data = list(itertools.chain.from_iterable(self._parts))
+            self._parts = []
+        return self._data
+
+    def __len__(self) -> int:
+        """Get length."""
+        if self._data is not None:
+            return len(self._data)
+        return sum(len(p) for p in self._parts)
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over elements."""
+        if self._data is not None:
+            return iter(self._data)
+        return itertools.chain.from_iterable(self._parts)
+
+    def __getitem__(self, index: Any) -> Any:
+        """Get item(s)."""
+        if (
+            self._data is None
+            and len(self._parts) == 1
+            and not isinstance(index, slice)
+        ):
+            return self._parts[0][index]
+        return self._materialize()[index]
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        """Set item(s)."""
+        self._materialize()[index] = value
+
+    def __delitem__(self, index: Any) -> None:
+        """Delete item(s)."""
+        del self._materialize()[index]
+
+    def insert(self, index: int, value: Any) -> None:
+        """Insert value before index."""
+        self._materialize().insert(index, value)
+
+    def __eq__(self, other: Any) -> bool:
+        """Compare elements with other sequence."""
+        if isinstance(other, (list, CopyOnWriteList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __add__(self, other: Iterable[Any]) -> List[Any]:
+        """Concatenate to new list."""
+        return list(self) + list(other)
+
+    def __repr__(self) -> str:
+        """Get representation."""
+        return repr(list(self))
+
+
 def create_metaid(sbase: libsbml.SBase) -> str:
     """Create a globally unique meta id.
 
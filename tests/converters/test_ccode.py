@@ -0,0 +1,27 @@
+"""Test C code of math."""
+import libsbml
+import pytest
+
+from sbmlutils.converters.ccode import c_formula
+
+
+@pytest.mark.parametrize(
+    "formula, expected",
+    [
+        ("1/2 * x", "((1.0 / 2.0) * x[0])"),
+        ("x^k", "pow(x[0], p[1])"),
+        ("piecewise(1, x < 2, 3)", "((x[0] < 2.0) ? 1.0 : 3.0)"),
+        ("piecewise(1, x < 2)", "((x[0] < 2.0) ? 1.0 : NAN)"),
+        ("x > 1 && !(y == 2)", "((x[0] > 1.0) && (!(y == 2.0)))"),
+        ("ln(x) + abs(y)", "(log(x[0]) + fabs(y))"),
+        ("log(2, x)", "(log(x[0]) / log(2.0))"),
+    ],
+)
+def test_c_formula(formula: str, expected: str) -> None:
+    astnode = libsbml.parseL3Formula(formula)
+    assert c_formula(astnode, symbols={"x": "x[0]", "k": "p[1]"}) == expected
+
+
+def test_c_formula_not_supported() -> None:
+    with pytest.raises(ValueError):
+        c_formula(libsbml.parseL3Formula("f(x)"))
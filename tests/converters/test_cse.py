@@ -0,0 +1,64 @@
+"""Test optimization of math for code generation."""
+import libsbml
+import pytest
+
+from sbmlutils.converters.cse import eliminate_common_subexpressions, fold_constants
+
+
+@pytest.mark.parametrize(
+    "formula, expected",
+    [
+        ("x * (2 + 3)", "x * 5"),
+        ("1/1000 * 60 * x", "0.06 * x"),
+        ("2 * 3 * x * 4", "6 * x * 4"),
+        ("piecewise(1 + 1, x > 2, 3 * 4)", "piecewise(2, x > 2, 12)"),
+        ("ln(-1) + x", "ln(-1) + x"),
+        ("2 * time", "2 * time"),
+    ],
+)
+def test_fold_constants(formula: str, expected: str) -> None:
+    astnode = libsbml.parseL3Formula(formula)
+    folded = fold_constants(astnode)
+    assert libsbml.formulaToL3String(folded) == expected
+    # astnode unchanged
+    assert libsbml.formulaToL3String(astnode) == libsbml.formulaToL3String(
+        libsbml.parseL3Formula(formula)
+    )
+
+
+def test_eliminate_common_subexpressions() -> None:
+    formulas = {
+        "v1": "Vmax/Km * S/(1 + S/Km)",
+        "v2": "Vmax/Km * P/(1 + S/Km)",
+        "v3": "piecewise(1, x > 2 && x < 4, 0) + piecewise(2, x > 2 && x < 4, 1)",
+    }
+    math = {key: libsbml.parseL3Formula(f) for key, f in formulas.items()}
+    result, temporaries = eliminate_common_subexpressions(math, reserved={"cse0"})
+
+    assert {libsbml.formulaToL3String(a) for a in temporaries.values()} == {
+        "Vmax / Km",
+        "1 + S / Km",
+        "(x > 2) && (x < 4)",
+    }
+    assert "cse0" not in temporaries
+    tid = {libsbml.formulaToL3String(a): tid for tid, a in temporaries.items()}
+    assert libsbml.formulaToL3String(result["v1"]) == (
+        f"{tid['Vmax / Km']} * S / {tid['1 + S / Km']}"
+    )
+    # math unchanged
+    for key, formula in formulas.items():
+        assert libsbml.formulaToL3String(math[key]) == libsbml.formulaToL3String(
+            libsbml.parseL3Formula(formula)
+        )
+
+
+def test_eliminate_common_subexpressions_nested() -> None:
+    """Subexpressions occurring only in other subexpressions are not hoisted."""
+    math = {
+        "y1": libsbml.parseL3Formula("exp(a * b) + 1"),
+        "y2": libsbml.parseL3Formula("exp(a * b) + 2"),
+    }
+    result, temporaries = eliminate_common_subexpressions(math)
+    assert len(temporaries) == 1
+    assert libsbml.formulaToL3String(temporaries["cse0"]) == "exp(a * b)"
+    assert libsbml.formulaToL3String(result["y2"]) == "cse0 + 2"
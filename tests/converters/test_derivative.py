@@ -0,0 +1,79 @@
+"""Test symbolic differentiation of SBML math."""
+import math
+from typing import Dict
+
+import libsbml
+import pytest
+
+from sbmlutils.converters.derivative import derivative
+
+
+VALUES: Dict[str, float] = {"x": 0.7, "y": 1.3, "k": 2.5}
+
+
+def _evaluate(formula: str, values: Dict[str, float]) -> float:
+    """Evaluate formula via libsbml parser and python."""
+    astnode = libsbml.parseL3Formula(formula)
+    assert astnode is not None, libsbml.getLastParseL3Error()
+    formula = libsbml.formulaToL3String(astnode).replace("^", "**")
+    namespace = {
+        "exp": math.exp,
+        "ln": math.log,
+        "log10": math.log10,
+        "sqrt": math.sqrt,
+        "sin": math.sin,
+        "cos": math.cos,
+        "tan": math.tan,
+        "abs": abs,
+        "floor": math.floor,
+        "piecewise": lambda *args: next(
+            (args[k] for k in range(0, len(args) - 1, 2) if args[k + 1]), args[-1]
+        ),
+        "log": lambda base, x: math.log(x, base),
+        "root": lambda n, x: x ** (1 / n),
+        **values,
+    }
+    return float(eval(formula.replace("&&", "and").replace("||", "or"), namespace))
+
+
+@pytest.mark.parametrize(
+    "formula",
+    [
+        "k*x",
+        "-x + y",
+        "x*y*k - x/y",
+        "k*x/(1 + x)",
+        "x^2 + x^y",
+        "2^x",
+        "exp(-k*x) + ln(x) + log10(x) + log(2, x)",
+        "sqrt(x) + root(3, x)",
+        "sin(x) * cos(x) + tan(x)",
+        "abs(x - y)",
+        "piecewise(x^2, x > 0.5, k*x)",
+        "piecewise(x^2, x > 1.5, k*x)",
+        "floor(x) * y",
+    ],
+)
+def test_derivative(formula: str) -> None:
+    """Test derivative against finite differences."""
+    astnode = libsbml.parseL3Formula(formula)
+    d = derivative(astnode, "x")
+    h = 1e-6
+    fd = (
+        _evaluate(formula, {**VALUES, "x": VALUES["x"] + h})
+        - _evaluate(formula, {**VALUES, "x": VALUES["x"] - h})
+    ) / (2 * h)
+    value = _evaluate(d, VALUES) if d is not None else 0.0
+    assert value == pytest.approx(fd, rel=1e-6, abs=1e-8)
+
+
+def test_derivative_zero() -> None:
+    """Test zero derivatives."""
+    assert derivative(libsbml.parseL3Formula("k*y"), "x") is None
+    assert derivative(libsbml.parseL3Formula("x > y"), "x") is None
+
+
+def test_derivative_not_supported() -> None:
+    """Test error for unsupported math."""
+    with pytest.raises(ValueError):
+        derivative(libsbml.parseL3Formula("factorial(x)"), "x")
@@ -0,0 +1,55 @@
+"""Test evaluation of mathml."""
+import libsbml
+import numpy as np
+import pytest
+
+from sbmlutils.converters.mathml import compileMathML, evaluateMathML
+
+
+@pytest.mark.parametrize(
+    "formula, variables, expected",
+    [
+        ("k * x^2", {"k": 2.0, "x": 3.0}, 18.0),
+        ("piecewise(8, x < 4, 0.1, 4 <= x && x < 6, 8)", {"x": 5.0}, 0.1),
+        ("root(3, x) + log(2, y) + ln(exponentiale)", {"x": 8.0, "y": 4.0}, 5.0),
+        ("-x^-2", {"x": 2.0}, -0.25),
+        ("2 * pi", {}, 2 * np.pi),
+    ],
+)
+def test_evaluate_mathml(formula: str, variables: dict, expected: float) -> None:
+    astnode = libsbml.parseL3Formula(formula)
+    assert evaluateMathML(astnode, variables=variables) == pytest.approx(expected)
+
+
+def test_evaluate_mathml_astnode_unchanged() -> None:
+    astnode = libsbml.parseL3Formula("k * x")
+    assert evaluateMathML(astnode, variables={"k": "2", "x": "3"}) == 6
+    assert libsbml.formulaToL3String(astnode) == "k * x"
+
+
+def test_compile_mathml() -> None:
+    astnode = libsbml.parseL3Formula("piecewise(k * x, x < 4 || x > 6, 0)")
+    compiled = compileMathML(astnode)
+    assert compiled.symbols == ("k", "x")
+    assert compiled({"k": 2.0, "x": 1.0}) == 2.0
+    assert compiled({"k": 2.0, "x": 5.0}) == 0.0
+
+    # cached by formula
+    assert (
+        compileMathML(libsbml.parseL3Formula(libsbml.formulaToL3String(astnode)))
+        is compiled
+    )
+
+
+def test_compile_mathml_vectorized() -> None:
+    astnode = libsbml.parseL3Formula("piecewise(k * x, x < 4 || !(x < 6), exp(0))")
+    compiled = compileMathML(astnode)
+    k, x = np.meshgrid(np.linspace(0, 2, 5), np.linspace(0, 10, 11))
+    values = compiled.vectorized({"k": k, "x": x})
+    assert values.shape == (11, 5)
+    expected = np.where((x < 4) | (x >= 6), k * x, 1.0)
+    np.testing.assert_allclose(values, expected)
+
+    # constant math is broadcasted to the shape of the symbols
+    compiled = compileMathML(libsbml.parseL3Formula("2 + 0 * x"))
+    np.testing.assert_allclose(compiled.vectorized({"x": np.zeros(3)}), [2, 2, 2])
@@ -1,10 +1,25 @@
 """Testing ODE factory."""
+import importlib.util
+import os
+import re
+import shutil
+import subprocess
 from pathlib import Path
+from typing import Any
 
 import libsbml
+import numpy as np
 import pytest
 
 from sbmlutils.converters.odefac import SBML2ODE
+from sbmlutils.factory import (
+    Compartment,
+    Model,
+    Parameter,
+    Reaction,
+    Species,
+    create_model,
+)
 from sbmlutils.io import read_sbml
 from sbmlutils.resources import DEMO_SBML, GALACTOSE_SINGLECELL_SBML
 
@@ -33,3 +48,224 @@ def test_odefac_to_python(sbml_path: Path, tmp_path: Path) -> None:
     out_path = tmp_path / "dallaman.py"
     sbml2ode.to_python(out_path)
     assert out_path.exists()
+
+
+def _load_module(path: Path) -> Any:
+    """Load generated python module."""
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)  # type: ignore
+    spec.loader.exec_module(module)  # type: ignore
+    return module
+
+
+@pytest.mark.parametrize("sbml_path", test_models)
+def test_odefac_to_python_vectorized(sbml_path: Path, tmp_path: Path) -> None:
+    """Create vectorized python code and compare with scalar odes."""
+    doc: libsbml.SBMLDocument = read_sbml(sbml_path)
+    sbml2ode = SBML2ODE(doc=doc)
+    sbml2ode.to_python(tmp_path / "model_scalar.py")
+    sbml2ode.to_python_vectorized(tmp_path / "model_vectorized.py")
+    scalar = _load_module(tmp_path / "model_scalar.py")
+    vectorized = _load_module(tmp_path / "model_vectorized.py")
+
+    assert vectorized.S.shape == (len(vectorized.xids), len(vectorized.rids))
+    x = scalar.x0 * np.linspace(1.0, 2.0, num=len(scalar.x0)) + 0.1
+    np.testing.assert_allclose(
+        vectorized.f_dxdt(x, 0.0, vectorized.p),
+        scalar.f_dxdt(x, 0.0, scalar.p),
+        rtol=1e-12,
+    )
+
+
+@pytest.mark.parametrize("sbml_path", test_models)
+def test_odefac_jacobian(sbml_path: Path, tmp_path: Path) -> None:
+    """Compare Jacobian of python code with finite differences."""
+    doc: libsbml.SBMLDocument = read_sbml(sbml_path)
+    sbml2ode = SBML2ODE(doc=doc)
+    sbml2ode.to_python(tmp_path / "model.py")
+    sbml2ode.to_R(tmp_path / "model.R")
+    assert "f_jac <- function" in (tmp_path / "model.R").read_text()
+    model = _load_module(tmp_path / "model.py")
+
+    x = model.x0 * np.linspace(1.0, 2.0, num=len(model.x0)) + 0.1
+    p = np.nan_to_num(model.p, nan=1.0)
+    jac = model.f_jac(x, 0.0, p)
+    jac_fd = np.empty_like(jac)
+    dx = model.f_dxdt(x, 0.0, p)
+    for k in range(len(x)):
+        h = 1e-7 * max(1.0, abs(x[k]))
+        xh = x.copy()
+        xh[k] += h
+        jac_fd[:, k] = (model.f_dxdt(xh, 0.0, p) - dx) / h
+
+    np.testing.assert_allclose(jac, jac_fd, rtol=1e-4, atol=1e-6)
+    # nonzero entries are in the sparsity pattern
+    pattern = model.jac_sparsity.toarray() != 0
+    assert not np.any(jac_fd[~pattern])
+
+
+def _math_doc(formula: str, tmp_path: Path) -> libsbml.SBMLDocument:
+    """Create model with reaction `A -> B` with the given rate."""
+    model = Model(
+        "math",
+        compartments=[Compartment("c", value=1.0)],
+        species=[
+            Species("A", compartment="c", initialConcentration=2.0),
+            Species("B", compartment="c", initialConcentration=1.0),
+        ],
+        parameters=[Parameter("k", 1.0), Parameter("Km", 0.5)],
+        reactions=[Reaction("v", equation="A -> B", formula=formula)],
+    )
+    result = create_model(model, filepath=tmp_path / "math.xml", validate=False)
+    return read_sbml(result.sbml_path)
+
+
+# functions of R (base) used in the generated code
+R_FUNCTIONS = set(
+    "abs c cbind ceiling colnames cos dim exp floor for function ifelse length "
+    "list log log10 matrix seq sin sqrt tan xor".split()
+)
+
+
+def test_odefac_to_R_math(tmp_path: Path) -> None:
+    """Test that the R code only calls R functions."""
+    doc = _math_doc("k * abs(A - B) / log10(Km + A) + piecewise(k, A > B, 0)", tmp_path)
+    SBML2ODE(doc=doc).to_R(tmp_path / "model.R")
+    code = (tmp_path / "model.R").read_text()
+    assert "f_jac <- function" in code
+    code = re.sub(r"#.*", "", code)
+    calls = set(re.findall(r"([A-Za-z_][A-Za-z0-9_.]*)\s*\(", code))
+    defined = set(re.findall(r"([A-Za-z_][A-Za-z0-9_.]*)\s*<-\s*function", code))
+    assert calls - defined <= R_FUNCTIONS
+
+    if shutil.which("Rscript"):
+        script = tmp_path / "run.R"
+        script.write_text(
+            f'source("{tmp_path / "model.R"}")\n'
+            "print(f_dxdt(0, x0, p))\n"
+            "print(f_jac(0, x0, p))\n"
+        )
+        subprocess.run(["Rscript", str(script)], check=True)
+
+
+def test_odefac_documentation_without_jacobian(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that the documentation targets do not create the Jacobian."""
+
+    def jacobian(self: SBML2ODE) -> Any:
+        raise AssertionError("Jacobian created")
+
+    monkeypatch.setattr(SBML2ODE, "jacobian", jacobian)
+    sbml2ode = SBML2ODE(doc=read_sbml(DEMO_SBML))
+    sbml2ode.to_markdown(tmp_path / "model.md")
+    sbml2ode.to_tex(tmp_path / "model.tex")
+    assert (tmp_path / "model.md").exists()
+    assert (tmp_path / "model.tex").exists()
+
+
+@pytest.mark.parametrize("sbml_path", test_models)
+def test_odefac_to_python_ensemble(sbml_path: Path, tmp_path: Path) -> None:
+    """Create ensemble python code and compare with scalar odes."""
+    doc: libsbml.SBMLDocument = read_sbml(sbml_path)
+    sbml2ode = SBML2ODE(doc=doc)
+    sbml2ode.to_python(tmp_path / "model_scalar.py")
+    sbml2ode.to_python_ensemble(tmp_path / "model_ensemble.py")
+    scalar = _load_module(tmp_path / "model_scalar.py")
+    ensemble = _load_module(tmp_path / "model_ensemble.py")
+
+    n = 5
+    rng = np.random.default_rng(seed=42)
+    p = ensemble.ensemble(np.nan_to_num(ensemble.p, nan=1.0), n)
+    p *= rng.uniform(0.5, 1.5, size=p.shape)
+    x = ensemble.ensemble(ensemble.x0, n) + rng.uniform(
+        0.1, 1.0, size=(len(ensemble.x0), n)
+    )
+    assert p.shape == (len(sbml2ode.p), n)
+
+    dx = ensemble.f_dxdt(x, 0.0, p)
+    y = ensemble.f_y(x, 0.0, p)
+    assert dx.shape == x.shape
+    for k in range(n):
+        np.testing.assert_allclose(dx[:, k], scalar.f_dxdt(x[:, k], 0.0, p[:, k]))
+        np.testing.assert_allclose(y[:, k], scalar.f_y(x[:, k], 0.0, p[:, k]))
+
+    np.testing.assert_allclose(ensemble.f_ode(0.0, x.ravel(), p), dx.ravel())
+    assert ensemble.jac_sparsity_ensemble(n).shape == (x.size, x.size)
+
+
+def test_odefac_to_python_math(tmp_path: Path) -> None:
+    """Test root, log and xor in the python code."""
+    doc = _math_doc(
+        "k * root(3, A) + log(2, A + B) + piecewise(1, xor(A > 1, B > 1), 0)",
+        tmp_path,
+    )
+    sbml2ode = SBML2ODE(doc=doc)
+    sbml2ode.to_python(tmp_path / "model_scalar.py")
+    sbml2ode.to_python_vectorized(tmp_path / "model_vectorized.py")
+    sbml2ode.to_python_ensemble(tmp_path / "model_ensemble.py")
+    scalar = _load_module(tmp_path / "model_scalar.py")
+    vectorized = _load_module(tmp_path / "model_vectorized.py")
+    ensemble = _load_module(tmp_path / "model_ensemble.py")
+
+    x = np.array([2.0, 1.0])
+    v = 2.0 ** (1.0 / 3.0) + np.log2(3.0) + 1.0
+    dx = np.array([-v, v])
+    np.testing.assert_allclose(scalar.f_dxdt(x, 0.0, scalar.p), dx)
+    np.testing.assert_allclose(vectorized.f_dxdt(x, 0.0, vectorized.p), dx)
+    p = ensemble.ensemble(ensemble.p, 2)
+    np.testing.assert_allclose(
+        ensemble.f_dxdt(ensemble.ensemble(x, 2), 0.0, p), np.column_stack([dx, dx])
+    )
+
+
+@pytest.mark.parametrize("sbml_path", test_models)
+def test_odefac_optimize(sbml_path: Path, tmp_path: Path) -> None:
+    """Create optimized python code and compare with odes."""
+    sbml2ode = SBML2ODE(doc=read_sbml(sbml_path))
+    sbml2ode_opt = SBML2ODE(doc=read_sbml(sbml_path), optimize=True)
+    assert sbml2ode_opt.cse_ids
+    assert set(sbml2ode_opt.cse_ids) <= set(sbml2ode_opt.yids_ordered)
+    sbml2ode.to_python(tmp_path / "model.py")
+    sbml2ode_opt.to_python(tmp_path / "model_opt.py")
+    sbml2ode_opt.to_R(tmp_path / "model_opt.R")
+    sbml2ode_opt.to_markdown(tmp_path / "model_opt.md")
+    assert f"{sbml2ode_opt.cse_ids[0]} = " in (tmp_path / "model_opt.R").read_text()
+    model = _load_module(tmp_path / "model.py")
+    model_opt = _load_module(tmp_path / "model_opt.py")
+
+    x = model.x0 * np.linspace(1.0, 2.0, num=len(model.x0)) + 0.1
+    p = np.nan_to_num(model.p, nan=1.0)
+    np.testing.assert_allclose(
+        model_opt.f_dxdt(x, 0.0, p), model.f_dxdt(x, 0.0, p), rtol=1e-12
+    )
+    np.testing.assert_allclose(
+        model_opt.f_jac(x, 0.0, p), model.f_jac(x, 0.0, p), rtol=1e-10, atol=1e-14
+    )
+
+
+@pytest.mark.skipif(
+    shutil.which(os.environ.get("CC", "cc")) is None, reason="no C compiler"
+)
+@pytest.mark.parametrize("sbml_path", test_models)
+def test_odefac_to_c(sbml_path: Path, tmp_path: Path) -> None:
+    """Create C code and compare with python odes."""
+    doc: libsbml.SBMLDocument = read_sbml(sbml_path)
+    sbml2ode = SBML2ODE(doc=doc, optimize=True)
+    sbml2ode.to_python(tmp_path / "model.py")
+    sbml2ode.to_c(tmp_path / "model_c.c")
+    model = _load_module(tmp_path / "model.py")
+    model_c = _load_module(tmp_path / "model_c.py")
+    assert (tmp_path / "model_c.so").exists() or (tmp_path / "model_c.dll").exists()
+
+    x = model.x0 * np.linspace(1.0, 2.0, num=len(model.x0)) + 0.1
+    p = np.nan_to_num(model.p, nan=1.0)
+    np.testing.assert_allclose(
+        model_c.f_dxdt(x, 0.0, p), model.f_dxdt(x, 0.0, p), rtol=1e-12
+    )
+    np.testing.assert_allclose(
+        model_c.f_jac(x, 0.0, p), model.f_jac(x, 0.0, p), rtol=1e-12, atol=1e-14
+    )
+    np.testing.assert_allclose(model_c.f_y(x, 0.0, p), model.f_y(x, 0.0, p))
+    with pytest.raises(ValueError):
+        model_c.f_dxdt(x[1:], 0.0, p)
@@ -0,0 +1,28 @@
+"""Test R code of math."""
+import libsbml
+import pytest
+
+from sbmlutils.converters.rcode import r_formula
+
+
+@pytest.mark.parametrize(
+    "formula, expected",
+    [
+        ("1/2 * x", "((1.0 / 2.0) * x[1])"),
+        ("x^k", "(x[1]^p[2])"),
+        ("piecewise(1, x < 2, 3)", "ifelse((x[1] < 2.0), 1.0, 3.0)"),
+        ("piecewise(1, x < 2)", "ifelse((x[1] < 2.0), 1.0, NaN)"),
+        ("x > 1 && !(y == 2)", "((x[1] > 1.0) & (!(y == 2.0)))"),
+        ("ln(x) + abs(y)", "(log(x[1]) + abs(y))"),
+        ("log(2, x)", "log(x[1], base = 2.0)"),
+        ("root(3, x)", "(x[1]^(1 / 3.0))"),
+    ],
+)
+def test_r_formula(formula: str, expected: str) -> None:
+    astnode = libsbml.parseL3Formula(formula)
+    assert r_formula(astnode, symbols={"x": "x[1]", "k": "p[2]"}) == expected
+
+
+def test_r_formula_not_supported() -> None:
+    with pytest.raises(ValueError):
+        r_formula(libsbml.parseL3Formula("f(x)"))
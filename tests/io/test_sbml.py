@@ -1,9 +1,19 @@
 """Test SBML reading and writing."""
+import io
 from pathlib import Path
+from typing import Optional
 
 import libsbml
-
-from sbmlutils.io.sbml import read_sbml, write_sbml
+import pytest
+
+from sbmlutils.io.sbml import (
+    Compression,
+    detect_compression,
+    disable_document_cache,
+    enable_document_cache,
+    read_sbml,
+    write_sbml,
+)
 from sbmlutils.resources import BASIC_SBML, GZ_SBML
 
 
@@ -77,3 +87,118 @@ def test_write_sbml(tmp_path: Path) -> None:
     doc2 = read_sbml(source=sbml_path)
     assert doc2
     assert doc2.getModel()
+
+
+@pytest.mark.parametrize("compression", list(Compression))
+def test_write_read_compressed(compression: Compression, tmp_path: Path) -> None:
+    """Write and read compressed SBML files."""
+    if compression == Compression.ZSTD:
+        pytest.importorskip("zstandard")
+    suffix = {
+        Compression.GZIP: ".gz",
+        Compression.BZ2: ".bz2",
+        Compression.XZ: ".xz",
+        Compression.ZSTD: ".zst",
+    }[compression]
+    doc = read_sbml(BASIC_SBML)
+
+    sbml_path = tmp_path / f"model.xml{suffix}"
+    write_sbml(doc, filepath=sbml_path)
+    with open(sbml_path, "rb") as f_sbml:
+        assert detect_compression(f_sbml.read(6)) == compression
+
+    # compression is detected from magic bytes, not suffix
+    sbml_path_nosuffix = tmp_path / "model.sbml"
+    sbml_path.rename(sbml_path_nosuffix)
+    for source in [sbml_path_nosuffix, sbml_path_nosuffix.read_bytes()]:
+        doc2 = read_sbml(source)
+        assert doc2.getModel().getId() == doc.getModel().getId()
+        assert doc2.getNumErrors() == 0
+
+
+@pytest.mark.parametrize("compression", [None, Compression.GZIP, Compression.XZ])
+def test_write_read_stream(compression: Optional[Compression]) -> None:
+    """Write and read SBML with binary file-like objects."""
+    doc = read_sbml(BASIC_SBML)
+    stream = io.BytesIO()
+    write_sbml(doc, filepath=stream, compression=compression)
+    assert not stream.closed
+    data = stream.getvalue()
+    assert detect_compression(data) == compression
+
+    stream.seek(0)
+    doc2 = read_sbml(stream)
+    assert doc2.getModel().getNumSpecies() == doc.getModel().getNumSpecies()
+
+
+def test_write_read_text_stream() -> None:
+    """Write and read SBML with text file-like objects."""
+    doc = read_sbml(BASIC_SBML)
+    stream = io.StringIO()
+    write_sbml(doc, filepath=stream)
+    stream.seek(0)
+    doc2 = read_sbml(stream)
+    assert doc2.getModel().getId() == doc.getModel().getId()
+
+
+def test_read_sbml_from_bytes() -> None:
+    """Read uncompressed SBML bytes."""
+    sbml_str = write_sbml(read_sbml(BASIC_SBML))
+    assert sbml_str
+    doc = read_sbml(sbml_str.encode("utf-8"))
+    assert doc.getModel()
+
+
+def test_document_cache(tmp_path: Path) -> None:
+    """Cached documents are clones and invalidated on file changes."""
+    sbml_path = tmp_path / "model.xml"
+    write_sbml(read_sbml(BASIC_SBML), filepath=sbml_path)
+
+    cache = enable_document_cache()
+    try:
+        doc1 = read_sbml(sbml_path)
+        doc2 = read_sbml(sbml_path)
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert doc1 is not doc2
+
+        # returned documents can be modified without changing the cache
+        doc2.getModel().setId("modified")
+        assert read_sbml(sbml_path).getModel().getId() == doc1.getModel().getId()
+
+        # promote is part of key
+        read_sbml(sbml_path, promote=True)
+        assert (
+            read_sbml(sbml_path, promote=True).getModel().getId().endswith("_promoted")
+        )
+        assert len(cache) == 2
+
+        # modified files are parsed again
+        write_sbml(doc2, filepath=sbml_path)
+        assert read_sbml(sbml_path).getModel().getId() == "modified"
+    finally:
+        disable_document_cache()
+
+
+def test_document_cache_eviction(tmp_path: Path) -> None:
+    """Least recently used documents are evicted."""
+    paths = []
+    for k in range(3):
+        doc = read_sbml(BASIC_SBML)
+        doc.getModel().setId(f"model_{k}")
+        paths.append(tmp_path / f"model_{k}.xml")
+        write_sbml(doc, filepath=paths[-1])
+
+    size = max(p.stat().st_size for p in paths)
+    cache = enable_document_cache(max_size=2 * size)
+    try:
+        read_sbml(paths[0])
+        read_sbml(paths[1])
+        read_sbml(paths[0])
+        read_sbml(paths[2])
+        assert len(cache) == 2
+        assert cache.size <= cache.max_size
+
+        read_sbml(paths[1])
+        assert cache.misses == 4
+    finally:
+        disable_document_cache()
@@ -0,0 +1,49 @@
+"""Test JSON serialization of SBML."""
+import json
+from pathlib import Path
+
+import pytest
+import xmltodict  # type: ignore
+
+from sbmlutils.factory import Document, Model
+from sbmlutils.io.sbml import read_sbml, write_sbml
+from sbmlutils.io.sbml_json import sbml_to_dict, sbml_to_json
+from sbmlutils.resources import BASIC_SBML, DEMO_SBML, GALACTOSE_SINGLECELL_SBML
+
+
+@pytest.mark.parametrize("source", [BASIC_SBML, DEMO_SBML, GALACTOSE_SINGLECELL_SBML])
+def test_sbml_to_dict(source: Path) -> None:
+    """Dictionary is identical to xmltodict."""
+    sbml_str = write_sbml(read_sbml(source))
+    assert sbml_to_dict(sbml_str) == xmltodict.parse(sbml_str)
+
+
+@pytest.mark.parametrize("source", [BASIC_SBML, DEMO_SBML, GALACTOSE_SINGLECELL_SBML])
+def test_sbml_to_json(source: Path, tmp_path: Path) -> None:
+    """JSON is identical to json of xmltodict."""
+    doc = read_sbml(source)
+    json_ref = json.dumps(xmltodict.parse(write_sbml(doc)), indent=2)
+    assert sbml_to_json(doc) == json_ref
+
+    json_path = tmp_path / "model.json"
+    sbml_to_json(doc, filepath=json_path)
+    with open(json_path, "r") as f_json:
+        assert f_json.read() == json_ref
+
+
+def test_sbml_to_dict_mixed_content() -> None:
+    """Attributes, text, repeated and empty elements."""
+    xml = '<a x="1"><b>t1</b><b y="2">t2</b> <c/>text</a>'
+    assert sbml_to_dict(xml) == xmltodict.parse(xml)
+
+
+def test_document_json(tmp_path: Path) -> None:
+    """JSON of factory document."""
+    doc = Document(model=Model(sid="json_model"))
+    json_str = doc.get_json()
+    assert json.loads(json_str)["sbml"]["model"]["@id"] == "json_model"
+
+    json_path = tmp_path / "model.json"
+    doc.write_json(json_path)
+    with open(json_path, "r") as f_json:
+        assert f_json.read() == json_str
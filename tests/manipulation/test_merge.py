@@ -1,6 +1,8 @@
 """Test model merging functionality."""
 from pathlib import Path
 
+import pytest
+
 from sbmlutils import comp, validation
 from sbmlutils.examples.merge_models.merge_models import merge_models_example
 from sbmlutils.io import write_sbml
@@ -53,3 +55,18 @@ def test_biomodel_merge(tmp_path: Path) -> None:
     merged_sbml_path = out_dir / "merged_flat.xml"
     write_sbml(doc_flat, filepath=merged_sbml_path)
     assert merged_sbml_path.exists()
+
+
+def test_merge_in_memory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test merging in parallel workers without writing files."""
+    monkeypatch.chdir(tmp_path)
+    merge_dir = TESTDATA_DIR / "manipulation" / "merge"
+    model_ids = [f"BIOMD000000000{k}" for k in range(1, 5)]
+    model_paths = dict(zip(model_ids, [merge_dir / f"{mid}.xml" for mid in model_ids]))
+
+    doc = merge.merge_models(model_paths, workers=2)
+    comp_doc = doc.getPlugin("comp")
+    assert comp_doc.getNumExternalModelDefinitions() == 0
+    assert [md.getId() for md in comp_doc.getListOfModelDefinitions()] == model_ids
+    assert doc.getModel().getPlugin("comp").getNumSubmodels() == 4
+    assert list(tmp_path.iterdir()) == []
@@ -1,15 +1,17 @@
 """Test annotation functions and annotating of SBML models."""
 import re
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, List, Tuple
 
 import libsbml
+import openpyxl
+import pytest
 
 from sbmlutils.examples import annotation as annotation_example
 from sbmlutils.factory import *
 from sbmlutils.io.sbml import read_sbml
 from sbmlutils.metadata import SBO, annotator
-from sbmlutils.metadata.annotator import ExternalAnnotation, ModelAnnotator
+from sbmlutils.metadata.annotator import Annotation, ExternalAnnotation, ModelAnnotator
 from sbmlutils.metadata.miriam import *
 from sbmlutils.resources import (
     DEMO_ANNOTATIONS,
@@ -191,3 +193,196 @@ def test_galactose_annotation(tmp_path: Path) -> None:
         annotations_path=GALACTOSE_ANNOTATIONS,
         filepath=tmp_sbml_path,
     )
+
+
+def test_create_cvterms_grouped() -> None:
+    """Resources with the same qualifier are grouped in one CVTerm."""
+    annotations = [
+        Annotation(BQB.IS, "chebi/CHEBI:28061"),
+        Annotation(BQB.HAS_PART, "chebi/CHEBI:17234"),
+        Annotation(BQB.IS, "sbo/SBO:0000247"),
+        Annotation(BQB.IS, "chebi/CHEBI:28061"),
+        Annotation(BQM.IS_DESCRIBED_BY, "pubmed/123"),
+    ]
+    cvterms = ModelAnnotator.create_cvterms(annotations)
+    assert len(cvterms) == 3
+    assert cvterms[0].getBiologicalQualifierType() == libsbml.BQB_IS
+    assert cvterms[0].getNumResources() == 2
+    assert cvterms[1].getBiologicalQualifierType() == libsbml.BQB_HAS_PART
+    assert cvterms[2].getQualifierType() == libsbml.MODEL_QUALIFIER
+    assert cvterms[2].getModelQualifierType() == libsbml.BQM_IS_DESCRIBED_BY
+
+
+def test_annotate_sbases() -> None:
+    """Annotate many elements with many annotations in one pass."""
+    doc = libsbml.SBMLDocument(3, 1)
+    model = doc.createModel()
+    species = []
+    for k in range(3):
+        s = model.createSpecies()
+        s.setId(f"S{k}")
+        species.append(s)
+
+    annotations = [
+        Annotation(BQB.IS, "chebi/CHEBI:28061"),
+        Annotation(BQB.IS, "sbo/SBO:0000247"),
+    ]
+    ModelAnnotator.annotate_sbases(species, annotations)
+    # existing CVTerms with same qualifier are extended
+    ModelAnnotator.annotate_sbase(species[0], Annotation(BQB.IS, "pubmed/123"))
+
+    for s in species:
+        assert s.isSetMetaId()
+        assert s.getNumCVTerms() == 1
+    assert species[0].getCVTerm(0).getNumResources() == 3
+    assert species[1].getCVTerm(0).getNumResources() == 2
+
+
+def test_get_sbml_qualifier() -> None:
+    """Lookup of SBML qualifier strings."""
+    assert ModelAnnotator.get_SBMLQualifier("BQB_IS", "BQB") == "is"
+    assert (
+        ModelAnnotator.get_SBMLQualifier("BQM_IS_DESCRIBED_BY", "BQM")
+        == "isDescribedBy"
+    )
+
+
+def test_element_index() -> None:
+    """Test index of elements by type and id."""
+    sbmlns = libsbml.SBMLNamespaces(3, 1, "fbc", 2)
+    doc = libsbml.SBMLDocument(sbmlns)
+    model = doc.createModel()
+    model.setId("m")
+    model.createUnitDefinition().setId("mM")
+    model.createSpecies().setId("S1")
+    model.createParameter().setId("p1")
+    model.createAssignmentRule().setVariable("p1")
+    model.getPlugin("fbc").createGeneProduct().setId("G1")
+
+    ma = ModelAnnotator(doc, [])
+    index = ma.element_index
+    assert index["model"]["m"] == model
+    assert index["unit"]["mM"].getId() == "mM"
+    assert index["rule"]["p1"].getTypeCode() == libsbml.SBML_ASSIGNMENT_RULE
+    assert index["parameter"]["p1"].getTypeCode() == libsbml.SBML_PARAMETER
+    assert index["fbc:geneproduct"]["G1"].getId() == "G1"
+    assert "reaction" not in index
+    assert ma.id_dict["species"] == ["S1"]
+
+    elements = ma._elements_from_ids(["p1", "p2"], sbml_type="rule")
+    assert [e.getVariable() for e in elements] == ["p1"]
+
+
+def test_pattern_statistics() -> None:
+    """Test statistics of annotation patterns."""
+    doc = libsbml.SBMLDocument(3, 1)
+    model = doc.createModel()
+    for k in range(12):
+        model.createSpecies().setId(f"S{k}")
+
+    annotations = [
+        ExternalAnnotation(
+            {
+                "pattern": pattern,
+                "sbml_type": "species",
+                "annotation_type": "rdf",
+                "qualifier": "BQB_IS",
+                "resource": "sbo/SBO:0000247",
+            }
+        )
+        for pattern in ["S1", "^S2$", "S1"]
+    ]
+    ma = ModelAnnotator(doc, annotations)
+    ma.annotate_model()
+    stats = {s.pattern: s for s in ma.pattern_statistics()["species"]}
+    assert stats["S1"].calls == 2
+    assert stats["S1"].matches == 3
+    assert stats["^S2$"].matches == 1
+    assert model.getSpecies("S11").getSBOTerm() == 247
+    assert not model.getSpecies("S3").isSetSBOTerm()
+
+
+def _annotation_tuples(annotations: Iterable[ExternalAnnotation]) -> List[Tuple]:
+    keys = ["pattern", "sbml_type", "annotation_type", "qualifier", "resource", "name"]
+    return [tuple(getattr(a, key) for key in keys) for a in annotations]
+
+
+def test_iter_annotations_chunks(tmp_path: Path) -> None:
+    """Test chunked reading of annotation files in xlsx and tsv."""
+    tsv_path = GALACTOSE_ANNOTATIONS.parent / "galactose_annotations.xlsx.csv"
+    chunks = list(
+        ModelAnnotator.iter_annotations(tsv_path, file_format="tsv", chunk_size=100)
+    )
+    assert [len(chunk) for chunk in chunks] == [100, 100, 47]
+
+    annotations_tsv = [a for chunk in chunks for a in chunk]
+    annotations_xlsx = ModelAnnotator.read_annotations(GALACTOSE_ANNOTATIONS)
+    assert _annotation_tuples(annotations_tsv) == _annotation_tuples(annotations_xlsx)
+    assert annotations_xlsx[0].sbml_type == "document"
+    assert annotations_xlsx[0].pattern is None
+
+
+def test_read_annotations_comments(tmp_path: Path) -> None:
+    """Test comments and empty rows in csv."""
+    csv_path = tmp_path / "annotations.csv"
+    csv_path.write_text(
+        "pattern,sbml_type,annotation_type,qualifier,resource,name\n"
+        "# species,,,,,\n"
+        ",,,,,\n"
+        "S1,species,rdf,BQB_IS,chebi/CHEBI:28061,glucose # comment,ignored\n"
+        "S2,species,charge,,-1\n"
+    )
+    annotations = ModelAnnotator.read_annotations(csv_path)
+    assert _annotation_tuples(annotations) == [
+        ("S1", "species", "rdf", BQB.IS, "chebi/CHEBI:28061", "glucose "),
+        ("S2", "species", "charge", None, "-1", None),
+    ]
+
+
+def test_read_annotations_cache(tmp_path: Path) -> None:
+    """Test binary cache of parsed annotation files."""
+    cache_dir = tmp_path / "cache"
+    annotations = ModelAnnotator.read_annotations(
+        GALACTOSE_ANNOTATIONS, cache_dir=cache_dir
+    )
+    cache_files = list(cache_dir.iterdir())
+    assert len(cache_files) == 1
+
+    annotations_cached = ModelAnnotator.read_annotations(
+        GALACTOSE_ANNOTATIONS, cache_dir=cache_dir
+    )
+    assert _annotation_tuples(annotations_cached) == _annotation_tuples(annotations)
+    assert list(cache_dir.iterdir()) == cache_files
+
+
+def test_read_annotations_cache_invalid(tmp_path: Path) -> None:
+    """Test that unreadable cache files are ignored and overwritten."""
+    cache_dir = tmp_path / "cache"
+    annotations = ModelAnnotator.read_annotations(
+        GALACTOSE_ANNOTATIONS, cache_dir=cache_dir
+    )
+    [cache_path] = list(cache_dir.iterdir())
+    cache_path.write_bytes(b"invalid")
+
+    annotations_cached = ModelAnnotator.read_annotations(
+        GALACTOSE_ANNOTATIONS, cache_dir=cache_dir
+    )
+    assert _annotation_tuples(annotations_cached) == _annotation_tuples(annotations)
+    assert cache_path.read_bytes() != b"invalid"
+
+
+def test_read_annotations_xlsx_numbers(tmp_path: Path) -> None:
+    """Test numeric cells of xlsx files."""
+    xlsx_path = tmp_path / "annotations.xlsx"
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["pattern", "sbml_type", "annotation_type", "qualifier", "resource"])
+    sheet.append(["S1", "species", "charge", None, 1.0])
+    sheet.append(["S2", "species", "charge", None, -2])
+    workbook.save(xlsx_path)
+
+    annotations = ModelAnnotator.read_annotations(xlsx_path)
+    assert [a.resource for a in annotations] == ["1", "-2"]
+    assert annotator._parse_charge("1.0") == 1
+    with pytest.raises(ValueError):
+        annotator._parse_charge("0.5")
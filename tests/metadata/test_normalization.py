@@ -0,0 +1,74 @@
+"""Test cache of normalized annotations."""
+from pathlib import Path
+
+from pymetadata.identifiers.miriam import BQB, BQM
+
+from sbmlutils.factory import Compartment, Model, create_model
+from sbmlutils.metadata.normalization import (
+    AnnotationCache,
+    disable_annotation_cache,
+    enable_annotation_cache,
+    get_annotation_cache,
+)
+
+
+def test_annotation_cache_memo() -> None:
+    """Test memo of annotations keyed by qualifier and resource."""
+    cache = AnnotationCache()
+    a1 = cache.annotation(BQB.IS, "sbo/SBO:0000247")
+    a2 = cache.annotation(BQB.IS, "sbo/SBO:0000247")
+    a3 = cache.annotation(BQM.IS, "sbo/SBO:0000247")
+    assert a1 is a2
+    assert a1 is not a3
+    assert a1.collection == "sbo"
+    assert a1.term == "SBO:0000247"
+    assert (cache.hits, cache.misses, len(cache)) == (1, 2, 2)
+
+
+def test_annotation_cache_persistence(tmp_path: Path) -> None:
+    """Test persistence of valid annotations."""
+    path = tmp_path / "annotations.json"
+    cache = AnnotationCache(path=path)
+    valid = cache.annotation(BQB.IS, "chebi/CHEBI:17234")
+    cache.annotation(BQB.IS, "https://example.org/glucose")
+    cache.annotation(BQB.IS, "chebi/glucose")
+    cache.save()
+
+    cache2 = AnnotationCache(path=path)
+    cache2.load()
+    assert len(cache2) == 2
+    a = cache2.annotation(BQB.IS, "chebi/CHEBI:17234")
+    assert cache2.hits == 1
+    assert (a.qualifier, a.collection, a.term) == (
+        valid.qualifier,
+        valid.collection,
+        valid.term,
+    )
+    assert a.resource_normalized == valid.resource_normalized
+
+
+def test_annotation_cache_shared(tmp_path: Path) -> None:
+    """Test shared cache used by the factory."""
+    path = tmp_path / "annotations.json"
+    cache = enable_annotation_cache(path)
+    try:
+        assert cache is get_annotation_cache()
+        model = Model(
+            sid="test_annotation_cache",
+            compartments=[
+                Compartment(
+                    sid=f"c{k}",
+                    value=1.0,
+                    sboTerm="SBO:0000290",
+                    annotations=[(BQB.IS, "go/GO:0005829")],
+                )
+                for k in range(5)
+            ],
+        )
+        hits = cache.hits
+        create_model(model, tmp_path / "model.xml")
+        assert cache.hits >= hits + 8
+    finally:
+        disable_annotation_cache()
+    assert path.exists()
+    assert get_annotation_cache().path is None
@@ -0,0 +1,78 @@
+"""Test matching of SId patterns."""
+import re
+from typing import List
+
+import pytest
+
+from sbmlutils.metadata.patterns import PatternMatcher, PatternType, analyze_pattern
+
+
+IDS: List[str] = [
+    "S1",
+    "S10",
+    "S2",
+    "glc_ext",
+    "glc",
+    "GLCtr",
+    "R_PFK",
+    "R_PFK2",
+    "R_GLCt",
+    "atp_c",
+    "a.b",
+    "ab",
+]
+
+
+@pytest.mark.parametrize(
+    "pattern, pattern_type, prefix",
+    [
+        ("S1", PatternType.LITERAL, "S1"),
+        ("^S1$", PatternType.EXACT, "S1"),
+        ("S1$", PatternType.EXACT, "S1"),
+        ("R_PFK.*", PatternType.PREFIX, "R_PFK"),
+        ("^R_\\w+", PatternType.PREFIX, "R_"),
+        ("a\\.b$", PatternType.EXACT, "a.b"),
+        ("glcs?", PatternType.PREFIX, "glc"),
+        ("S1|S2", PatternType.REGEX, ""),
+        (".*_c$", PatternType.REGEX, ""),
+        ("(?i)glc", PatternType.REGEX, ""),
+        ("", PatternType.LITERAL, ""),
+    ],
+)
+def test_analyze_pattern(pattern: str, pattern_type: PatternType, prefix: str) -> None:
+    """Test classification of patterns."""
+    assert analyze_pattern(pattern) == (pattern_type, prefix)
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        "S1",
+        "^S1$",
+        "S1$",
+        "S",
+        "R_PFK.*",
+        "R_PFK\\d",
+        "^R_\\w+",
+        "a\\.b$",
+        "a.b",
+        "glcs?",
+        "gl[a-z]",
+        "S1|S2",
+        ".*_c$",
+        "(?i)glc",
+        "",
+        "x",
+    ],
+)
+def test_pattern_matcher(pattern: str) -> None:
+    """Test matches are identical to re.match in order of ids."""
+    matcher = PatternMatcher(IDS)
+    expected = [sid for sid in IDS if re.match(pattern, sid)]
+    assert matcher.match(pattern) == expected
+    assert matcher.match(pattern) == expected
+
+    stats = matcher.statistics[pattern]
+    assert stats.calls == 2
+    assert stats.matches == len(expected)
+    assert stats.candidates >= stats.matches
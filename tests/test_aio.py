@@ -0,0 +1,110 @@
+"""Test asynchronous interface."""
+import asyncio
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import libsbml
+import pytest
+
+from sbmlutils import aio
+from sbmlutils.io import read_sbml
+from sbmlutils.resources import COMP_ICG_BODY, DEMO_SBML, REPRESSILATOR_SBML
+from sbmlutils.validation import validate_doc
+
+
+@pytest.fixture
+def thread_pool():
+    """Thread pool executor for the asynchronous calls."""
+    yield aio.configure(max_workers=2)
+    aio.shutdown()
+
+
+def test_read_validate_write(thread_pool, tmp_path: Path) -> None:
+    """Test reading, validating and writing in thread pool."""
+
+    async def run() -> None:
+        doc = await aio.read_sbml(REPRESSILATOR_SBML, timeout=60)
+        result = await aio.validate_doc(doc, timeout=60)
+        assert result.is_valid()
+        await aio.write_sbml(doc, filepath=tmp_path / "model.xml", timeout=60)
+
+    asyncio.run(run())
+    assert read_sbml(tmp_path / "model.xml").getModel().getId() == "BIOMD0000000012"
+
+
+def test_gather(thread_pool) -> None:
+    """Test concurrent reports."""
+
+    async def run():
+        return await asyncio.gather(
+            aio.report(REPRESSILATOR_SBML), aio.report(DEMO_SBML)
+        )
+
+    infos = asyncio.run(run())
+    assert [info["model"]["id"] for info in infos] == [
+        "BIOMD0000000012",
+        "Koenig_demo_v15",
+    ]
+
+
+def test_flatten(thread_pool, tmp_path: Path) -> None:
+    """Test flattening."""
+    flat_path = tmp_path / "flat.xml"
+    doc = asyncio.run(aio.flatten_sbml(COMP_ICG_BODY, flat_path, timeout=120))
+    assert doc.getModel() is not None
+    assert flat_path.exists()
+
+
+def test_timeout(thread_pool) -> None:
+    """Test timeout and cancellation of pending calls."""
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(aio.run_in_executor(time.sleep, 1.0, timeout=0.01))
+
+
+def test_configure_executor() -> None:
+    """Test that executors of the caller are not shut down."""
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        assert aio.configure(executor=executor) is executor
+        assert aio.get_executor() is executor
+        aio.configure(max_workers=1)
+        assert aio.get_executor() is not executor
+        aio.configure(executor=executor)
+        aio.shutdown()
+        assert executor.submit(sum, [1, 2]).result() == 3
+    finally:
+        aio.shutdown()
+        executor.shutdown()
+
+
+def test_process_pool() -> None:
+    """Test validation in process pool."""
+    aio.configure(max_workers=1, processes=True)
+    try:
+        doc = read_sbml(REPRESSILATOR_SBML)
+        result = asyncio.run(aio.validate_doc(doc, timeout=120))
+        result_sbml = asyncio.run(aio.validate_sbml(REPRESSILATOR_SBML, timeout=120))
+    finally:
+        aio.shutdown()
+    assert result.all_count == result_sbml.all_count == validate_doc(doc).all_count
+    assert result.all_count > 0
+
+
+def test_pickle_document_and_errors() -> None:
+    """Test pickling of SBMLDocument and SBMLError."""
+    aio.register_pickling()
+    doc = read_sbml(DEMO_SBML)
+    doc2 = pickle.loads(pickle.dumps(doc))
+    assert libsbml.writeSBMLToString(doc2) == libsbml.writeSBMLToString(doc)
+
+    doc = read_sbml(REPRESSILATOR_SBML)
+    result = validate_doc(doc)
+    errors = result.errors + result.warnings
+    assert errors
+    for error, error2 in zip(errors, pickle.loads(pickle.dumps(errors))):
+        assert isinstance(error2, libsbml.SBMLError)
+        assert error2.getErrorId() == error.getErrorId()
+        assert error2.getSeverity() == error.getSeverity()
+        assert error2.getLine() == error.getLine()
@@ -0,0 +1,124 @@
+"""Test the build runner for factory models."""
+import sys
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from sbmlutils.build import BuildStatus, build_models, discover_models
+
+
+MODULE_A = """
+from sbmlutils.factory import *
+from sbmlutils.metadata import SBO
+
+model = Model(
+    "model_a",
+    compartments=[Compartment("c", value=1.0, name="compartment", sboTerm=SBO.PHYSICAL_COMPARTMENT)],
+)
+"""
+
+MODULE_B = """
+from sbmlutils.factory import *
+from sbmlutils.metadata import SBO
+from .a import model as model_a
+
+model = Model.merge_models(
+    [model_a, Model("model_b", parameters=[Parameter("p", 1.0, name="p", sboTerm=SBO.KINETIC_CONSTANT)])]
+)
+"""
+
+MODULE_C = """
+from sbmlutils.factory import *
+from sbmlutils.metadata import SBO
+
+model = Model(
+    "model_c",
+    packages=[Package.COMP],
+    external_model_definitions=[
+        ExternalModelDefinition(sid="emd_a", source="model_a.xml", modelRef="model_a", name="a")
+    ],
+    submodels=[Submodel(sid="sa", modelRef="emd_a", name="submodel a")],
+)
+"""
+
+
+@pytest.fixture
+def model_package(tmp_path: Path) -> Iterator[str]:
+    """Create package with model modules."""
+    package_dir = tmp_path / "sbmlutils_build_models"
+    package_dir.mkdir()
+    (package_dir / "__init__.py").write_text("")
+    (package_dir / "a.py").write_text(MODULE_A)
+    (package_dir / "b.py").write_text(MODULE_B)
+    (package_dir / "c.py").write_text(MODULE_C)
+    sys.path.insert(0, str(tmp_path))
+    yield package_dir.name
+    sys.path.remove(str(tmp_path))
+    for name in list(sys.modules):
+        if name.startswith(package_dir.name):
+            del sys.modules[name]
+
+
+def test_discover_models(model_package: str) -> None:
+    """Test discovery of model modules."""
+    targets = discover_models(model_package)
+    assert sorted(targets) == [
+        f"{model_package}.a:model",
+        f"{model_package}.b:model",
+        f"{model_package}.c:model",
+    ]
+    assert targets[f"{model_package}.b:model"].imports == {f"{model_package}.a"}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_build_models(model_package: str, tmp_path: Path, workers: int) -> None:
+    """Test parallel and incremental build of models."""
+    output_dir = tmp_path / "models"
+    key_a = f"{model_package}.a:model"
+    key_b = f"{model_package}.b:model"
+    key_c = f"{model_package}.c:model"
+
+    results = build_models(model_package, output_dir=output_dir, workers=workers)
+    assert list(results)[0] == key_a
+    for result in results.values():
+        assert result.status == BuildStatus.BUILT, result.error
+        assert result.sbml_path.exists()
+        assert result.error_count == 0
+
+    # nothing changed
+    results = build_models(model_package, output_dir=output_dir, workers=workers)
+    for result in results.values():
+        assert result.status == BuildStatus.CACHED
+
+    # change of a rebuilds all dependent models
+    path_a = tmp_path / model_package / "a.py"
+    path_a.write_text(MODULE_A + "\n# changed\n")
+    results = build_models(
+        model_package, output_dir=output_dir, workers=workers, keys=[key_b]
+    )
+    assert list(results) == [key_a, key_b]
+    assert results[key_a].status == BuildStatus.BUILT
+    assert results[key_b].status == BuildStatus.BUILT
+
+    results = build_models(model_package, output_dir=output_dir, workers=workers)
+    assert results[key_a].status == BuildStatus.CACHED
+    assert results[key_b].status == BuildStatus.CACHED
+    assert results[key_c].status == BuildStatus.BUILT
+
+
+def test_build_models_import_error(model_package: str, tmp_path: Path) -> None:
+    """Test that a failing import only fails the target and its dependents."""
+    package_dir = tmp_path / model_package
+    (package_dir / "d.py").write_text(MODULE_A.replace('"c"', "c"))
+    (package_dir / "e.py").write_text(
+        MODULE_B.replace(".a import", ".d import").replace("model_b", "model_e")
+    )
+
+    results = build_models(model_package, output_dir=tmp_path / "models", workers=1)
+    for name in ["a", "b", "c"]:
+        assert results[f"{model_package}.{name}:model"].status == BuildStatus.BUILT
+    for name in ["d", "e"]:
+        result = results[f"{model_package}.{name}:model"]
+        assert result.status == BuildStatus.FAILED
+        assert "NameError" in result.error
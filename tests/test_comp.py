@@ -1,10 +1,29 @@
 """Tests for the comp package."""
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
 import libsbml
+import pytest
 
 from sbmlutils import comp
+from sbmlutils.comp import (
+    disable_resolver_cache,
+    enable_resolver_cache,
+    flatten_sbml,
+    flatten_sbml_doc,
+)
+from sbmlutils.comp.comp import add_submodel_from_emd
+from sbmlutils.comp.flatten import flatten_external_model_definitions
+from sbmlutils.comp.resolver import CachingSBMLResolver
 from sbmlutils.factory import *
 from sbmlutils.factory import PortType, create_objects
+from sbmlutils.io import read_sbml, write_sbml
+from sbmlutils.manipulation.merge import _create_merged_doc_from_docs
 from sbmlutils.metadata.sbo import SBO
+from sbmlutils.resources import COMP_DEX_BODY, COMP_ICG_BODY, COMP_ICG_LIVER
+from sbmlutils.validation import ValidationOptions, validate_doc
 
 
 def create_port_doc() -> libsbml.SBMLDocument:
@@ -93,3 +112,186 @@ def test_create_ports_list() -> None:
     assert comp_model.getPort("EX_A_port")
     assert comp_model.getPort("EX_C_port")
     assert comp_model.getPort("tests") is None
+
+
+def test_flatten_sbml_relative_path(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test flattening with relative path without change of working dir."""
+    monkeypatch.chdir(COMP_ICG_BODY.parent.parent)
+    sbml_path = Path(COMP_ICG_BODY.parent.name) / COMP_ICG_BODY.name
+    doc = flatten_sbml(sbml_path, sbml_flat_path=tmp_path / "flat.xml")
+    assert Path.cwd() == COMP_ICG_BODY.parent.parent
+    assert doc.getModel().getNumSpecies() > 0
+    assert not doc.isPackageEnabled("comp")
+
+
+@pytest.mark.parametrize(
+    "base_uri",
+    [
+        COMP_ICG_BODY,
+        COMP_ICG_BODY.parent,
+        str(COMP_ICG_BODY.parent),
+        COMP_ICG_BODY.as_uri(),
+    ],
+)
+def test_flatten_sbml_doc_base_uri(base_uri: Any) -> None:
+    """Test flattening of document without location."""
+    doc = libsbml.readSBMLFromString(COMP_ICG_BODY.read_text())
+    flat_doc = flatten_sbml_doc(doc, base_uri=base_uri)
+    assert flat_doc.getModel().getNumSpecies() > 0
+
+
+def test_flatten_sbml_threads(tmp_path: Path) -> None:
+    """Test concurrent flattening in threads."""
+    paths = [COMP_ICG_BODY, COMP_DEX_BODY] * 2
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        docs = list(
+            executor.map(
+                lambda k: flatten_sbml(paths[k], tmp_path / f"flat_{k}.xml"),
+                range(len(paths)),
+            )
+        )
+    n_species = [doc.getModel().getNumSpecies() for doc in docs]
+    assert n_species[:2] == n_species[2:]
+    assert all(n > 0 for n in n_species)
+
+
+def test_resolver_cache(tmp_path: Path) -> None:
+    """Test cache of external documents shared between flattening runs."""
+    registry = libsbml.SBMLResolverRegistry.getInstance()
+    n_resolvers = registry.getNumResolvers()
+    cache = enable_resolver_cache()
+    try:
+        assert registry.getNumResolvers() == n_resolvers + 1
+        docs = [flatten_sbml(COMP_DEX_BODY, tmp_path / f"flat_{k}.xml") for k in (0, 1)]
+        n_external = len(
+            read_sbml(COMP_DEX_BODY)
+            .getPlugin("comp")
+            .getListOfExternalModelDefinitions()
+        )
+        assert cache.misses == n_external
+        assert cache.hits > 0
+        assert len(cache) == n_external
+        assert (
+            docs[0].getModel().getNumReactions() == docs[1].getModel().getNumReactions()
+        )
+    finally:
+        disable_resolver_cache()
+    assert registry.getNumResolvers() == n_resolvers
+
+
+def create_external_doc(
+    source: Path, submodel_id: str, model_id: str
+) -> libsbml.SBMLDocument:
+    """Create comp model with submodel of ExternalModelDefinition."""
+    sbmlns = libsbml.SBMLNamespaces(3, 1, "comp", 1)
+    doc = libsbml.SBMLDocument(sbmlns)
+    doc.setPackageRequired("comp", True)
+    doc.setLocationURI(source.parent.as_uri() + "/")
+    model = doc.createModel()
+    model.setId(model_id)
+    emd = comp.create_ExternalModelDefinition(
+        doc.getPlugin("comp"), submodel_id, source=source.name
+    )
+    add_submodel_from_emd(model.getPlugin("comp"), submodel_id, emd=emd)
+    return doc
+
+
+def test_flatten_external_model_definitions_recursive(tmp_path: Path) -> None:
+    """Test recursive conversion of ExternalModelDefinitions."""
+    liver_id = read_sbml(COMP_ICG_LIVER).getModel().getId()
+    organ_doc = _create_merged_doc_from_docs(
+        {liver_id: read_sbml(COMP_ICG_LIVER)}, merged_id="organ"
+    )
+    write_sbml(organ_doc, tmp_path / "organ.xml")
+    region_doc = create_external_doc(tmp_path / "organ.xml", "organ", "region")
+    write_sbml(region_doc, tmp_path / "region.xml")
+    body_doc = create_external_doc(tmp_path / "region.xml", "region", "body")
+
+    doc = flatten_external_model_definitions(body_doc)
+    comp_doc = doc.getPlugin("comp")
+    assert comp_doc.getNumExternalModelDefinitions() == 0
+    assert {md.getId() for md in comp_doc.getListOfModelDefinitions()} == {
+        "region",
+        "organ",
+        liver_id,
+    }
+    assert validate_doc(
+        doc, options=ValidationOptions(units_consistency=False)
+    ).is_valid()
+    flat_doc = flatten_sbml_doc(doc)
+    assert (
+        flat_doc.getModel().getNumReactions()
+        == read_sbml(COMP_ICG_LIVER).getModel().getNumReactions()
+    )
+
+
+def test_flatten_external_model_definitions_duplicate_ids(tmp_path: Path) -> None:
+    """Test renaming of different nested ModelDefinitions with the same id."""
+    for k in (1, 2):
+        organ_doc = read_sbml(COMP_ICG_LIVER)
+        organ_doc.getModel().setName(f"organ {k}")
+        region_doc = _create_merged_doc_from_docs(
+            {"organ": organ_doc}, merged_id=f"region{k}"
+        )
+        write_sbml(region_doc, tmp_path / f"region{k}.xml")
+    body_doc = create_external_doc(tmp_path / "region1.xml", "region1", "body")
+    emd = comp.create_ExternalModelDefinition(
+        body_doc.getPlugin("comp"), "region2", source="region2.xml"
+    )
+    add_submodel_from_emd(body_doc.getModel().getPlugin("comp"), "region2", emd=emd)
+
+    doc = flatten_external_model_definitions(body_doc)
+    comp_doc = doc.getPlugin("comp")
+    assert {md.getId() for md in comp_doc.getListOfModelDefinitions()} == {
+        "region1",
+        "region2",
+        "organ",
+        "region2__organ",
+    }
+    assert comp_doc.getModelDefinition("organ").getName() == "organ 1"
+    assert comp_doc.getModelDefinition("region2__organ").getName() == "organ 2"
+    submodel = comp_doc.getModelDefinition("region2").getPlugin("comp").getSubmodel(0)
+    assert submodel.getModelRef() == "region2__organ"
+
+    # organ models share metaids
+    flat_doc = flatten_sbml_doc(doc, perform_validation=False)
+    assert (
+        flat_doc.getModel().getNumReactions()
+        == 2 * read_sbml(COMP_ICG_LIVER).getModel().getNumReactions()
+    )
+
+
+def test_resolver_cache_disable_by_identity() -> None:
+    """Test that disabling removes the caching resolver at any position."""
+    registry = libsbml.SBMLResolverRegistry.getInstance()
+    n_resolvers = registry.getNumResolvers()
+    enable_resolver_cache()
+    try:
+        # move caching resolver to the end
+        resolvers = [
+            registry.getResolverByIndex(k).clone()
+            for k in range(registry.getNumResolvers())
+        ]
+        while registry.getNumResolvers() > 0:
+            registry.removeResolver(0)
+        for resolver in resolvers[1:] + resolvers[:1]:
+            registry.addResolver(resolver)
+    finally:
+        disable_resolver_cache()
+    assert registry.getNumResolvers() == n_resolvers
+    assert not any(
+        isinstance(registry.getResolverByIndex(k), CachingSBMLResolver)
+        for k in range(registry.getNumResolvers())
+    )
+
+
+def test_flatten_external_model_definitions() -> None:
+    """Test conversion of ExternalModelDefinitions of body model."""
+    doc = flatten_external_model_definitions(read_sbml(COMP_DEX_BODY))
+    comp_doc = doc.getPlugin("comp")
+    assert comp_doc.getNumExternalModelDefinitions() == 0
+    assert comp_doc.getNumModelDefinitions() == 3
+    # organ models share metaids, no validity check
+    assert validate_doc(doc).all_count > 0
@@ -0,0 +1,50 @@
+"""Test dependency graphs and their ordering."""
+import libsbml
+import pytest
+
+from sbmlutils.dependency import (
+    CyclicDependencyError,
+    find_cycle,
+    math_dependency_graph,
+    math_symbols,
+    topological_order,
+)
+
+
+def test_math_symbols() -> None:
+    assert math_symbols(libsbml.parseL3Formula("k*y + exp(x)")) == {"k", "x", "y"}
+
+
+def test_math_dependency_graph() -> None:
+    math = {
+        "y1": libsbml.parseL3Formula("k * x"),
+        "y2": libsbml.parseL3Formula("y1 + 2"),
+    }
+    graph = math_dependency_graph(math, filtered_ids={"k"})
+    assert graph == {"y1": {"x"}, "y2": {"y1"}}
+
+
+def test_topological_order() -> None:
+    graph = {"c": {"a", "b"}, "b": {"a"}, "a": set(), "d": set(), "e": {"x"}}
+    assert topological_order(graph) == ["a", "d", "e", "b", "c"]
+
+
+def test_topological_order_chain() -> None:
+    """Long chains are ordered without recursion."""
+    n = 5000
+    graph = {f"y{k}": {f"y{k - 1}"} if k > 0 else set() for k in range(n)}
+    assert topological_order(graph) == [f"y{k}" for k in range(n)]
+
+
+def test_topological_order_cyclic() -> None:
+    graph = {"a": {"b"}, "b": {"c"}, "c": {"a"}, "d": {"a"}, "e": set()}
+    with pytest.raises(CyclicDependencyError) as excinfo:
+        topological_order(graph)
+    assert excinfo.value.cycle == ["a", "b", "c"]
+    assert excinfo.value.nodes == ["a", "b", "c", "d"]
+    assert "a -> b -> c -> a" in str(excinfo.value)
+
+
+def test_find_cycle() -> None:
+    assert find_cycle({"a": {"b"}, "b": set()}) is None
+    assert find_cycle({"a": {"a"}}) == ["a"]
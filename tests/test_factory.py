@@ -201,3 +201,33 @@ def test_event2() -> None:
     assert e.getId() == "e1"
     assignments = e.getListOfEventAssignments()
     assert len(assignments) == 2
+
+
+@pytest.mark.parametrize(
+    "sbase",
+    [
+        Compartment("c", value=1.0),
+        Species("S1", initialAmount=1.0, compartment="c"),
+        Parameter(sid="p1", value=0.0, constant=False),
+        AssignmentRule("p1", "2 * p2"),
+        Reaction(sid="r1", equation="S1 => S2"),
+        ExchangeReaction(species_id="S1"),
+    ],
+)
+def test_sbase_slots(sbase: factory.Sbase) -> None:
+    """Test that factory elements have no per-instance __dict__."""
+    assert not hasattr(sbase, "__dict__")
+    with pytest.raises(AttributeError):
+        sbase.unknown_attribute = 1  # type: ignore
+
+
+def test_sbase_slots_deepcopy() -> None:
+    """Test that slotted factory elements can be copied."""
+    from copy import deepcopy
+
+    s1 = Species("S1", initialAmount=1.0, compartment="c", name="S1 species")
+    s2 = deepcopy(s1)
+    assert s2 is not s1
+    assert s2.sid == "S1"
+    assert s2.name == "S1 species"
+    assert s2.initialAmount == 1.0
@@ -30,3 +30,48 @@ def test_creator_merge() -> None:
 
     assert m_merged.creators
     assert len(m_merged.creators) == 1
+
+
+def test_merge_shares_elements() -> None:
+    """Test that merging shares the elements of the models without copying."""
+    s1 = Species("S1", compartment="c", initialConcentration=1.0)
+    s2 = Species("S2", compartment="c", initialConcentration=1.0)
+    m1 = Model("m1", species=[s1])
+    m2 = Model("m2", species=[s2])
+
+    m_merged = Model.merge_models(models=[m1, m2])
+    assert len(m_merged.species) == 2
+    assert [s.sid for s in m_merged.species] == ["S1", "S2"]
+    assert m_merged.species[0] is s1
+
+    # writing to the merged model does not change the merged models
+    m_merged.species.append(Species("S3", compartment="c", initialConcentration=1.0))
+    assert len(m_merged.species) == 3
+    assert len(m1.species) == 1
+    assert len(m2.species) == 1
+
+
+def test_merge_merged_models() -> None:
+    """Test merging of already merged models."""
+    m1 = Model("m1", parameters=[Parameter("p1", 1.0)])
+    m2 = Model("m2", parameters=[Parameter("p2", 1.0)])
+    m3 = Model("m3", parameters=[Parameter("p3", 1.0)])
+
+    m12 = Model.merge_models(models=[m1, m2])
+    m_merged = Model.merge_models(models=[m12, m3])
+    assert [p.sid for p in m_merged.parameters] == ["p1", "p2", "p3"]
+
+
+def test_merge_snapshot() -> None:
+    """Test that changing the models after merging does not change the merge."""
+    m1 = Model("m1", parameters=[Parameter("p1", 1.0)])
+    m2 = Model("m2", parameters=[Parameter("p2", 1.0)])
+    m3 = Model("m3", parameters=[Parameter("p3", 1.0)])
+
+    m12 = Model.merge_models(models=[m1, m2])
+    m_merged = Model.merge_models(models=[m12, m3])
+
+    m1.parameters.append(Parameter("pY", 1.0))
+    m12.parameters.append(Parameter("pZ", 1.0))
+    assert [p.sid for p in m12.parameters] == ["p1", "p2", "pZ"]
+    assert [p.sid for p in m_merged.parameters] == ["p1", "p2", "p3"]
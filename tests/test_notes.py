@@ -5,7 +5,7 @@ import libsbml
 import pytest
 
 from sbmlutils.factory import Parameter
-from sbmlutils.notes import Notes
+from sbmlutils.notes import Notes, _notes_xml
 
 
 @pytest.mark.parametrize(
@@ -105,3 +105,17 @@ def test_note_sbml(notes: str, expected: str) -> None:
     p_sbml: libsbml.Parameter = p.create_sbml(model=model)
     assert p_sbml
     assert p_sbml.isSetNotes()
+
+
+def test_notes_cached() -> None:
+    """Test that identical notes are only converted once."""
+    _notes_xml.cache_clear()
+    notes1 = Notes("    Shared **notes**")
+    notes2 = Notes("Shared **notes**")
+    info = _notes_xml.cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
+
+    # notes do not share the XMLNode
+    assert notes1.xml is not notes2.xml
+    assert str(notes1) == str(notes2)
@@ -1,13 +1,24 @@
 """Test parsing of SBML."""
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 
 import pytest
 from pymetadata.omex import ManifestEntry, Omex
 
 from sbmlutils.factory import Model, create_model
-from sbmlutils.parser import sbml_to_model
-from sbmlutils.resources import BIOMODELS_CURATED_PATH, sbml_paths_idfn
+from sbmlutils.io.sbml import read_sbml
+from sbmlutils.metadata import BQB
+from sbmlutils.parser import (
+    antimony_to_sbml_batch,
+    iter_model_elements,
+    sbml_to_model,
+)
+from sbmlutils.resources import (
+    BIOMODELS_CURATED_PATH,
+    GALACTOSE_SINGLECELL_SBML,
+    GZ_SBML,
+    sbml_paths_idfn,
+)
 from sbmlutils.validation import ValidationOptions
 
 
@@ -39,3 +50,80 @@ def test_model_from_biomodels_omex(omex_path: Path, tmp_path: Path) -> None:
                 sbml_version=2,
                 validation_options=ValidationOptions(units_consistency=False),
             )
+
+
+def test_sbml_to_model_annotations() -> None:
+    """Test parsing of SBO terms and annotations."""
+    m: Model = sbml_to_model(GALACTOSE_SINGLECELL_SBML)
+    assert m.sid == "galactose_30"
+    assert len(m.reactions) == 31
+    species = {s.sid: s for s in m.species}
+    assert species["e__gal"].sboTerm == "SBO:0000247"
+    assert (BQB.IS, "http://identifiers.org/chebi/CHEBI:28061") in species[
+        "e__gal"
+    ].annotations
+
+
+def test_sbml_to_model_fbc() -> None:
+    """Test parsing of model without kinetic laws."""
+    m: Model = sbml_to_model(GZ_SBML)
+    assert len(m.reactions) == 1008
+    assert all(r.formula is None for r in m.reactions)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+def test_iter_model_elements(chunk_size: int) -> None:
+    """Test chunked conversion of model elements."""
+    doc = read_sbml(GALACTOSE_SINGLECELL_SBML)
+    counts: Dict[str, int] = {}
+    for key, elements in iter_model_elements(doc.getModel(), chunk_size=chunk_size):
+        assert 0 < len(elements) <= chunk_size
+        counts[key] = counts.get(key, 0) + len(elements)
+
+    m: Model = sbml_to_model(GALACTOSE_SINGLECELL_SBML)
+    assert counts == {key: len(getattr(m, key)) for key in counts if getattr(m, key)}
+    assert counts["reactions"] == 31
+
+
+antimony_template = """
+model variant
+    S1 = 10; S2 = 0; k1 = {k1};
+    R1: S1 -> S2; k1 * S1;
+end
+"""
+
+
+def test_antimony_to_sbml_batch() -> None:
+    """Test parallel conversion of antimony strings."""
+    sources = [antimony_template.format(k1=k) for k in range(1, 5)]
+    sources.append("model broken\n S1 -> ; k1 * ; end")
+    results = antimony_to_sbml_batch(sources, workers=2, to_model=True)
+
+    assert len(results) == 5
+    for k, result in enumerate(results[:4]):
+        assert result.success
+        assert result.sbml and "<sbml" in result.sbml
+        assert result.model
+        assert result.model.sid == "variant"
+        assert [p.value for p in result.model.parameters] == [k + 1.0]
+
+    assert not results[4].success
+    assert results[4].error
+    assert results[4].sbml is None
+
+
+def test_antimony_to_sbml_batch_files(tmp_path: Path) -> None:
+    """Test parallel conversion of antimony files."""
+    sources: List[Path] = []
+    for k in range(3):
+        path = tmp_path / f"variant_{k}.ant"
+        with open(path, "w") as f_ant:
+            f_ant.write(antimony_template.format(k1=k))
+        sources.append(path)
+
+    results = antimony_to_sbml_batch(sources, output_dir=tmp_path / "sbml", workers=2)
+    for k, result in enumerate(results):
+        assert result.success
+        assert result.sbml is None
+        assert result.sbml_path == tmp_path / "sbml" / f"variant_{k}.xml"
+        assert result.sbml_path.exists()